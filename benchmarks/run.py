@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# Times and memory-profiles each stage of the SAV > JSON > SAV pipeline
+# Usage: python -m benchmarks [.sav files...] [--scale N] [--repeat N] [--output results.json]
+
+import argparse
+import gc
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional
+
+from loguru import logger
+from palworld_save_tools import json_tools
+from palworld_save_tools.gvas import GvasFile
+from palworld_save_tools.palsav import compress_gvas_to_sav, decompress_sav_to_gvas
+from palworld_save_tools.paltypes import (
+    DISABLED_PROPERTIES,
+    PALWORLD_CUSTOM_PROPERTIES,
+    PALWORLD_TYPE_HINTS,
+)
+
+from benchmarks.synthetic import generate_world
+
+STAGES = ["decompress", "read", "dump", "load", "write", "compress"]
+DEFAULT_SYNTHETIC_BASE = "tests/testdata/Level.sav"
+
+
+def measure(
+    func: Callable[[Any], Any],
+    setup: Callable[[], Any],
+    repeat: int,
+    memory: bool,
+) -> tuple[Any, dict[str, Any]]:
+    """Run ``func(setup())`` ``repeat`` times, timing only ``func``.
+
+    With ``memory``, one extra run is made under tracemalloc to record the
+    peak Python allocation of the stage; it is kept separate as tracing
+    slows everything down.
+    """
+    timings = []
+    result = None
+    for _ in range(repeat):
+        arg = setup()
+        # Drop the previous run's output before measuring the next one
+        result = None
+        gc.collect()
+        start = time.perf_counter()
+        result = func(arg)
+        timings.append(time.perf_counter() - start)
+    stats: dict[str, Any] = {
+        "seconds": min(timings),
+        "mean_seconds": sum(timings) / len(timings),
+    }
+    if memory:
+        arg = setup()
+        gc.collect()
+        tracemalloc.start()
+        func(arg)
+        stats["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result, stats
+
+
+def custom_properties_error(gvas: bytes, custom_properties: dict) -> Optional[str]:
+    """Return why ``custom_properties`` cannot decode ``gvas``, if they cannot."""
+    try:
+        GvasFile.read(gvas, PALWORLD_TYPE_HINTS, custom_properties)
+    except Exception as e:
+        return str(e)
+    return None
+
+
+def benchmark_save(
+    name: str,
+    sav: bytes,
+    custom_properties: dict,
+    repeat: int,
+    memory: bool,
+    tmp_dir: str,
+) -> dict[str, Any]:
+    result: dict[str, Any] = {"name": name, "sav_bytes": len(sav), "stages": {}}
+    stages = result["stages"]
+    json_path = os.path.join(tmp_dir, "benchmark.json")
+    try:
+        (gvas, save_type), stages["decompress"] = measure(
+            lambda _: decompress_sav_to_gvas(sav), lambda: None, repeat, memory
+        )
+        result["gvas_bytes"] = len(gvas)
+        error = custom_properties_error(gvas, custom_properties)
+        if error is not None:
+            # Fall back to the generic tree rather than skipping the save
+            result["custom_properties_error"] = error
+            custom_properties = {}
+        result["custom_properties"] = sorted(custom_properties)
+        gvas_file, stages["read"] = measure(
+            lambda _: GvasFile.read(gvas, PALWORLD_TYPE_HINTS, custom_properties),
+            lambda: None,
+            repeat,
+            memory,
+        )
+        _, stages["dump"] = measure(
+            lambda _: json_tools.dump(gvas_file.dump(), json_path),
+            lambda: None,
+            repeat,
+            memory,
+        )
+        result["json_bytes"] = os.path.getsize(json_path)
+        del gvas_file
+        _, stages["load"] = measure(
+            lambda _: GvasFile.load(json_tools.load(json_path)),
+            lambda: None,
+            repeat,
+            memory,
+        )
+        # Custom encoders rewrite the tree as they go, so every write
+        # gets a freshly loaded one
+        written, stages["write"] = measure(
+            lambda loaded: loaded.write(custom_properties),
+            lambda: GvasFile.load(json_tools.load(json_path)),
+            repeat,
+            memory,
+        )
+        result["roundtrip_identical"] = written == gvas
+        _, stages["compress"] = measure(
+            lambda _: compress_gvas_to_sav(written, save_type),
+            lambda: None,
+            repeat,
+            memory,
+        )
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(results: list[dict[str, Any]]):
+    width = max(len(result["name"]) for result in results)
+    print(
+        f"{'save':<{width}} {'stage':<11} {'seconds':>9} {'peak MB':>9}",
+        file=sys.stderr,
+    )
+    for result in results:
+        for stage in STAGES:
+            stats = result["stages"].get(stage)
+            if stats is None:
+                continue
+            peak = stats.get("peak_bytes")
+            peak_mb = f"{peak / 1e6:>9.1f}" if peak is not None else f"{'-':>9}"
+            print(
+                f"{result['name']:<{width}} {stage:<11} {stats['seconds']:>9.3f} {peak_mb}",
+                file=sys.stderr,
+            )
+        if "error" in result:
+            print(
+                f"{result['name']:<{width}} error: {result['error']}", file=sys.stderr
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="benchmarks",
+        description="Times and memory-profiles each stage of the SAV > JSON > SAV pipeline",
+    )
+    parser.add_argument(
+        "saves",
+        nargs="*",
+        help="Save files to benchmark (default: tests/testdata/*.sav)",
+    )
+    parser.add_argument(
+        "--scale",
+        type=int,
+        default=4,
+        help=f"Also benchmark a synthetic world with every map and struct array in {DEFAULT_SYNTHETIC_BASE} repeated this many times, 0 to disable (default: 4)",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Timed runs per stage, the fastest is reported (default: 3)",
+    )
+    parser.add_argument(
+        "--no-memory",
+        action="store_true",
+        help="Skip the extra tracemalloc run per stage",
+    )
+    parser.add_argument(
+        "--custom-properties",
+        default=",".join(set(PALWORLD_CUSTOM_PROPERTIES.keys()) - DISABLED_PROPERTIES),
+        type=lambda t: [s.strip() for s in t.split(",")],
+        help="Comma-separated list of custom properties to decode, or 'all' (default: same as the convert command)",
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        help="Write JSON results to this file instead of stdout",
+    )
+    args = parser.parse_args()
+
+    # Keep stdout clean for the JSON results
+    logger.disable("palworld_save_tools")
+
+    if args.custom_properties == ["all"]:
+        custom_properties = PALWORLD_CUSTOM_PROPERTIES
+    else:
+        custom_properties = {
+            prop: PALWORLD_CUSTOM_PROPERTIES[prop]
+            for prop in PALWORLD_CUSTOM_PROPERTIES
+            if prop in args.custom_properties
+        }
+
+    saves = []
+    for path in args.saves or sorted(glob.glob("tests/testdata/*.sav")):
+        with open(path, "rb") as f:
+            saves.append((path, f.read()))
+    if args.scale > 0:
+        with open(DEFAULT_SYNTHETIC_BASE, "rb") as f:
+            saves.append(
+                (f"synthetic x{args.scale}", generate_world(f.read(), args.scale))
+            )
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, sav in saves:
+            print(f"Benchmarking {name}", file=sys.stderr)
+            results.append(
+                benchmark_save(
+                    name,
+                    sav,
+                    custom_properties,
+                    args.repeat,
+                    not args.no_memory,
+                    tmp_dir,
+                )
+            )
+    print_table(results)
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+from palworld_save_tools.gvas import GvasFile
+from palworld_save_tools.palsav import decompress_sav_to_gvas, z_lib
+from palworld_save_tools.paltypes import PALWORLD_TYPE_HINTS
+
+PLZ_SAVE_TYPE = 0x32
+
+
+def scale_world(gvas_file: GvasFile, scale: int) -> GvasFile:
+    """Repeat every map entry and struct array element in worldSaveData.
+
+    Entries are repeated by reference, so the tree must only be written with
+    the generic (non-custom) property writers, which do not modify it.
+    """
+    world = gvas_file.properties["worldSaveData"]["value"]
+    for prop in world.values():
+        if prop["type"] == "MapProperty":
+            prop["value"] = prop["value"] * scale
+        elif prop["type"] == "ArrayProperty" and prop["array_type"] == "StructProperty":
+            prop["value"]["values"] = prop["value"]["values"] * scale
+    return gvas_file
+
+
+def generate_world(base_sav: bytes, scale: int) -> bytes:
+    """Build a PLZ .sav roughly ``scale`` times the size of a Level.sav."""
+    gvas, _ = decompress_sav_to_gvas(base_sav)
+    gvas_file = scale_world(GvasFile.read(gvas, PALWORLD_TYPE_HINTS), scale)
+    return z_lib.compress(gvas_file.write(), PLZ_SAVE_TYPE)
@@ -0,0 +1,71 @@
+"""Build hook compiling the optional C accelerator, palworld_save_tools._speedups.
+
+The package works without it, so wheels are still built as pure Python when
+there is no C compiler or PALWORLD_SAVE_TOOLS_NO_SPEEDUPS is set. Run this
+file directly to build the extension in place for development.
+"""
+
+import os
+import sys
+import tempfile
+
+SOURCE = "palworld_save_tools/_speedups.c"
+
+
+def build_speedups(root: str, build_dir: str, inplace: bool = False) -> str:
+    """Compile the extension and return the path of the built module."""
+    from setuptools import Distribution, Extension
+    from setuptools.command.build_ext import build_ext
+
+    distribution = Distribution(
+        {
+            "name": "palworld-save-tools",
+            "ext_modules": [
+                Extension("palworld_save_tools._speedups", [os.path.join(root, SOURCE)])
+            ],
+        }
+    )
+    command = build_ext(distribution)
+    command.inplace = inplace
+    command.build_lib = build_dir
+    command.build_temp = os.path.join(build_dir, "temp")
+    command.ensure_finalized()
+    command.run()
+    return command.get_ext_fullpath("palworld_save_tools._speedups")
+
+
+try:
+    from hatchling.builders.hooks.plugin.interface import BuildHookInterface
+except ImportError:
+    BuildHookInterface = None  # type: ignore[assignment,misc]
+
+if BuildHookInterface is not None:
+
+    class SpeedupsBuildHook(BuildHookInterface):
+        PLUGIN_NAME = "custom"
+
+        def initialize(self, version, build_data):
+            if self.target_name != "wheel" or os.getenv(
+                "PALWORLD_SAVE_TOOLS_NO_SPEEDUPS"
+            ):
+                return
+            build_dir = tempfile.mkdtemp(prefix="palworld-save-tools-build-")
+            try:
+                path = build_speedups(self.root, build_dir)
+            except Exception as e:
+                self.app.display_warning(
+                    f"Not building the C accelerator, using pure Python: {e}"
+                )
+                return
+            build_data["force_include"][path] = (
+                "palworld_save_tools/" + os.path.basename(path)
+            )
+            build_data["pure_python"] = False
+            build_data["infer_tag"] = True
+
+
+if __name__ == "__main__":
+    root = os.path.dirname(os.path.abspath(__file__))
+    os.chdir(root)
+    with tempfile.TemporaryDirectory() as build_dir:
+        print(build_speedups(root, build_dir, inplace=True), file=sys.stderr)
@@ -0,0 +1,1487 @@
+/*
+ * Optional C implementation of the property loops of FArchiveReader and
+ * FArchiveWriter (archive.py).
+ *
+ * read_properties() and write_properties() walk one level of a property list
+ * and decode or encode scalar properties and the fixed-layout structs inline.
+ * Everything else (arrays, maps, sets, custom properties, nested property
+ * lists) goes back through the reader or writer's Python methods, so
+ * subclasses and custom decoders behave exactly as with the pure-Python
+ * loops.
+ *
+ * Whenever the data or a value is not the plain case (a read past the end of
+ * the buffer, a string that fails to decode, a non-finite float, a value of
+ * an unexpected type, ...), the property is left to the Python
+ * implementation instead, so the output and any error are the same as
+ * without this module.
+ */
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+
+#include <math.h>
+#include <stdint.h>
+#include <string.h>
+
+static PyObject *UUID_type = NULL;
+static PyObject *read_dispatch = NULL;
+/* archive._fstring_cache and its limits, shared with FArchiveReader.fstring */
+static PyObject *fstring_cache = NULL;
+static Py_ssize_t fstring_cache_max_length = 0;
+static Py_ssize_t fstring_cache_size = 0;
+static double nan_value;
+
+static PyObject *s_data, *s_offset, *s_size, *s_allow_nan, *s_children, *s_custom,
+    *s_child, *s_property, *s_properties_until_end, *s_property_inner,
+    *s_properties, *s_fstring, *s_guid, *s_raw_bytes, *s_parsed_str, *s_id,
+    *s_value, *s_type, *s_struct_type, *s_struct_id, *s_custom_type, *s_x, *s_y,
+    *s_z, *s_w, *s_r, *s_g, *s_b, *s_a, *s_None, *s_empty;
+
+enum {
+    T_OTHER = 0,
+    T_INT,
+    T_UINT16,
+    T_UINT32,
+    T_UINT64,
+    T_INT64,
+    T_FIXED64,
+    T_FLOAT,
+    T_STR,
+    T_NAME,
+    T_ENUM,
+    T_BOOL,
+    T_BYTE,
+    T_STRUCT,
+};
+
+enum {
+    S_OTHER = 0,
+    S_VECTOR,
+    S_DATETIME,
+    S_GUID,
+    S_QUAT,
+    S_LINEAR_COLOR,
+    S_COLOR,
+};
+
+typedef struct {
+    const char *name;
+    int code;
+} NameCode;
+
+static const NameCode property_types[] = {
+    {"IntProperty", T_INT},
+    {"UInt16Property", T_UINT16},
+    {"UInt32Property", T_UINT32},
+    {"UInt64Property", T_UINT64},
+    {"Int64Property", T_INT64},
+    {"FixedPoint64Property", T_FIXED64},
+    {"FloatProperty", T_FLOAT},
+    {"StrProperty", T_STR},
+    {"NameProperty", T_NAME},
+    {"EnumProperty", T_ENUM},
+    {"BoolProperty", T_BOOL},
+    {"ByteProperty", T_BYTE},
+    {"StructProperty", T_STRUCT},
+    {NULL, 0},
+};
+
+static const NameCode struct_types[] = {
+    {"Vector", S_VECTOR},
+    {"DateTime", S_DATETIME},
+    {"Guid", S_GUID},
+    {"Quat", S_QUAT},
+    {"LinearColor", S_LINEAR_COLOR},
+    {"Color", S_COLOR},
+    {NULL, 0},
+};
+
+static int
+lookup_code(const NameCode *table, PyObject *name)
+{
+    if (!PyUnicode_CheckExact(name) || !PyUnicode_IS_ASCII(name)) {
+        return 0;
+    }
+    const char *s = (const char *)PyUnicode_1BYTE_DATA(name);
+    Py_ssize_t n = PyUnicode_GET_LENGTH(name);
+    for (; table->name != NULL; table++) {
+        if ((Py_ssize_t)strlen(table->name) == n && memcmp(table->name, s, n) == 0) {
+            return table->code;
+        }
+    }
+    return 0;
+}
+
+static int
+is_none_string(PyObject *s)
+{
+    return PyUnicode_CheckExact(s) && PyUnicode_IS_ASCII(s) &&
+           PyUnicode_GET_LENGTH(s) == 4 &&
+           memcmp(PyUnicode_1BYTE_DATA(s), "None", 4) == 0;
+}
+
+/* Reader */
+
+typedef struct {
+    PyObject *reader;
+    PyObject *data;
+    Py_buffer view;
+    const unsigned char *buf;
+    Py_ssize_t len;
+    Py_ssize_t offset;
+    int allow_nan;
+} Reader;
+
+/* Functions returning PyObject * return NULL with an exception set on
+   error, or NULL without one to leave the property to Python (BAIL). */
+#define BAIL NULL
+
+static int
+reader_acquire(Reader *r)
+{
+    PyObject *data = PyObject_GetAttr(r->reader, s_data);
+    if (data == NULL) {
+        return -1;
+    }
+    if (data == r->data) {
+        Py_DECREF(data);
+        return 0;
+    }
+    if (r->data != NULL) {
+        PyBuffer_Release(&r->view);
+        Py_CLEAR(r->data);
+    }
+    if (PyObject_GetBuffer(data, &r->view, PyBUF_SIMPLE) < 0) {
+        Py_DECREF(data);
+        return -1;
+    }
+    r->data = data;
+    r->buf = (const unsigned char *)r->view.buf;
+    r->len = r->view.len;
+    return 0;
+}
+
+static void
+reader_release(Reader *r)
+{
+    if (r->data != NULL) {
+        PyBuffer_Release(&r->view);
+        Py_CLEAR(r->data);
+    }
+}
+
+static int
+reader_store_offset(Reader *r)
+{
+    PyObject *offset = PyLong_FromSsize_t(r->offset);
+    if (offset == NULL) {
+        return -1;
+    }
+    int result = PyObject_SetAttr(r->reader, s_offset, offset);
+    Py_DECREF(offset);
+    return result;
+}
+
+static int
+reader_load_offset(Reader *r)
+{
+    PyObject *offset = PyObject_GetAttr(r->reader, s_offset);
+    if (offset == NULL) {
+        return -1;
+    }
+    r->offset = PyLong_AsSsize_t(offset);
+    Py_DECREF(offset);
+    if (r->offset == -1 && PyErr_Occurred()) {
+        return -1;
+    }
+    if (reader_acquire(r) < 0) {
+        return -1;
+    }
+    /* Sub-readers share their parent's buffer but end at their own size */
+    PyObject *size = PyObject_GetAttr(r->reader, s_size);
+    if (size == NULL) {
+        return -1;
+    }
+    Py_ssize_t len = PyLong_AsSsize_t(size);
+    Py_DECREF(size);
+    if (len == -1 && PyErr_Occurred()) {
+        return -1;
+    }
+    r->len = len < r->view.len ? len : r->view.len;
+    return 0;
+}
+
+/* Take the cursor back from Python code called after reader_store_offset */
+static PyObject *
+reader_after_call(Reader *r, PyObject *result)
+{
+    if (result != NULL && reader_load_offset(r) < 0) {
+        Py_CLEAR(result);
+    }
+    return result;
+}
+
+static int
+need(Reader *r, Py_ssize_t n)
+{
+    return r->offset >= 0 && r->offset <= r->len - n;
+}
+
+static PyObject *
+read_cached_fstring(Reader *r, Py_ssize_t start, Py_ssize_t end)
+{
+    const char *raw = (const char *)r->buf + start;
+    PyObject *key = PyBytes_FromStringAndSize(raw, end - 1 - start);
+    if (key == NULL) {
+        return NULL;
+    }
+    PyObject *s = PyDict_GetItemWithError(fstring_cache, key);
+    if (s != NULL) {
+        Py_DECREF(key);
+        r->offset = end;
+        return Py_NewRef(s);
+    }
+    if (PyErr_Occurred()) {
+        Py_DECREF(key);
+        return NULL;
+    }
+    s = PyUnicode_DecodeASCII(raw, end - 1 - start, "strict");
+    if (s == NULL) {
+        /* Left to FArchiveReader.fstring, as in read_fstring */
+        Py_DECREF(key);
+        PyErr_Clear();
+        return BAIL;
+    }
+    if (PyDict_GET_SIZE(fstring_cache) < fstring_cache_size) {
+        PyUnicode_InternInPlace(&s);
+        if (PyDict_SetItem(fstring_cache, key, s) < 0) {
+            Py_DECREF(key);
+            Py_DECREF(s);
+            return NULL;
+        }
+    }
+    Py_DECREF(key);
+    r->offset = end;
+    return s;
+}
+
+static PyObject *
+read_fstring(Reader *r)
+{
+    if (!need(r, 4)) {
+        return BAIL;
+    }
+    int32_t size;
+    memcpy(&size, r->buf + r->offset, 4);
+    Py_ssize_t start = r->offset + 4;
+    if (size == 0) {
+        r->offset = start;
+        return Py_NewRef(s_empty);
+    }
+    PyObject *s;
+    Py_ssize_t end;
+    if (size < 0) {
+        int64_t chars = -(int64_t)size;
+        if (chars > (r->len - start) / 2) {
+            return BAIL;
+        }
+        end = start + (Py_ssize_t)chars * 2;
+        int byteorder = -1;
+        s = PyUnicode_DecodeUTF16((const char *)r->buf + start, end - 2 - start,
+                                  "strict", &byteorder);
+    }
+    else {
+        if (size > r->len - start) {
+            return BAIL;
+        }
+        end = start + size;
+        if (fstring_cache != NULL && size - 1 <= fstring_cache_max_length) {
+            return read_cached_fstring(r, start, end);
+        }
+        s = PyUnicode_DecodeASCII((const char *)r->buf + start, size - 1, "strict");
+    }
+    if (s == NULL) {
+        /* Python logs and decodes with surrogatepass, or raises */
+        PyErr_Clear();
+        return BAIL;
+    }
+    r->offset = end;
+    return s;
+}
+
+static PyObject *
+read_guid(Reader *r)
+{
+    if (!need(r, 16)) {
+        return BAIL;
+    }
+    PyObject *raw = PyBytes_FromStringAndSize((const char *)r->buf + r->offset, 16);
+    if (raw == NULL) {
+        return NULL;
+    }
+    r->offset += 16;
+    PyObject *guid = PyObject_CallOneArg(UUID_type, raw);
+    Py_DECREF(raw);
+    return guid;
+}
+
+static PyObject *
+read_optional_guid(Reader *r)
+{
+    if (!need(r, 1)) {
+        return BAIL;
+    }
+    if (r->buf[r->offset]) {
+        if (!need(r, 17)) {
+            return BAIL;
+        }
+        r->offset += 1;
+        return read_guid(r);
+    }
+    r->offset += 1;
+    Py_RETURN_NONE;
+}
+
+#define READ_INT(name, ctype, convert)                             \
+    static PyObject *name(Reader *r)                               \
+    {                                                              \
+        ctype v;                                                   \
+        if (!need(r, sizeof v)) {                                  \
+            return BAIL;                                           \
+        }                                                          \
+        memcpy(&v, r->buf + r->offset, sizeof v);                  \
+        r->offset += sizeof v;                                     \
+        return convert(v);                                         \
+    }
+
+READ_INT(read_byte, uint8_t, PyLong_FromLong)
+READ_INT(read_i32, int32_t, PyLong_FromLong)
+READ_INT(read_u16, uint16_t, PyLong_FromLong)
+READ_INT(read_u32, uint32_t, PyLong_FromUnsignedLong)
+READ_INT(read_i64, int64_t, PyLong_FromLongLong)
+READ_INT(read_u64, uint64_t, PyLong_FromUnsignedLongLong)
+
+static PyObject *
+read_float(Reader *r)
+{
+    float v;
+    if (!need(r, 4)) {
+        return BAIL;
+    }
+    memcpy(&v, r->buf + r->offset, 4);
+    if (!isfinite(v)) {
+        /* NaN payloads are converted as Python converts them */
+        return BAIL;
+    }
+    r->offset += 4;
+    return PyFloat_FromDouble(v);
+}
+
+static PyObject *
+read_double(Reader *r)
+{
+    double v;
+    if (!need(r, 8)) {
+        return BAIL;
+    }
+    memcpy(&v, r->buf + r->offset, 8);
+    r->offset += 8;
+    if (!r->allow_nan && !isfinite(v)) {
+        Py_RETURN_NONE;
+    }
+    return PyFloat_FromDouble(v);
+}
+
+/* Build a dict from alternating key, value pairs, stealing the values. Any
+   NULL value is returned as-is (error or BAIL) after dropping the rest. */
+static PyObject *
+build_dict(int n, PyObject **keys, PyObject **values)
+{
+    PyObject *result = NULL;
+    for (int i = 0; i < n; i++) {
+        if (values[i] == NULL) {
+            goto done;
+        }
+    }
+    result = PyDict_New();
+    if (result == NULL) {
+        goto done;
+    }
+    for (int i = 0; i < n; i++) {
+        if (PyDict_SetItem(result, keys[i], values[i]) < 0) {
+            Py_CLEAR(result);
+            goto done;
+        }
+    }
+done:
+    for (int i = 0; i < n; i++) {
+        Py_XDECREF(values[i]);
+    }
+    return result;
+}
+
+/* Read values one after the other, stopping at the first NULL */
+#define READ_ALL(values, n, expr)                  \
+    for (int _i = 0; _i < (n); _i++) {             \
+        values[_i] = (_i == 0 || values[_i - 1] != NULL) ? (expr) : NULL; \
+    }
+
+static PyObject *
+read_fields(Reader *r, int n, PyObject **keys, PyObject *(*read)(Reader *))
+{
+    PyObject *values[4];
+    READ_ALL(values, n, read(r));
+    return build_dict(n, keys, values);
+}
+
+static PyObject *
+read_struct_value(Reader *r, PyObject *struct_type, PyObject *node)
+{
+    switch (lookup_code(struct_types, struct_type)) {
+    case S_VECTOR: {
+        PyObject *keys[] = {s_x, s_y, s_z};
+        return read_fields(r, 3, keys, read_double);
+    }
+    case S_DATETIME:
+        return read_u64(r);
+    case S_GUID:
+        return read_guid(r);
+    case S_QUAT: {
+        PyObject *keys[] = {s_x, s_y, s_z, s_w};
+        return read_fields(r, 4, keys, read_double);
+    }
+    case S_LINEAR_COLOR: {
+        PyObject *keys[] = {s_r, s_g, s_b, s_a};
+        return read_fields(r, 4, keys, read_float);
+    }
+    case S_COLOR: {
+        PyObject *keys[] = {s_b, s_g, s_r, s_a};
+        return read_fields(r, 4, keys, read_byte);
+    }
+    default:
+        if (reader_store_offset(r) < 0) {
+            return NULL;
+        }
+        return reader_after_call(
+            r, PyObject_CallMethodOneArg(r->reader, s_properties_until_end, node));
+    }
+}
+
+static PyObject *
+read_id_value(Reader *r, PyObject *(*read)(Reader *))
+{
+    PyObject *keys[] = {s_id, s_value};
+    PyObject *values[2];
+    values[0] = read_optional_guid(r);
+    values[1] = values[0] != NULL ? read(r) : NULL;
+    return build_dict(2, keys, values);
+}
+
+static PyObject *
+read_enum_value(Reader *r, int byte_property)
+{
+    PyObject *keys[] = {s_type, s_value};
+    PyObject *values[2];
+    PyObject *id;
+    values[0] = read_fstring(r);
+    if (values[0] == NULL) {
+        return NULL;
+    }
+    id = read_optional_guid(r);
+    if (id == NULL) {
+        Py_DECREF(values[0]);
+        return NULL;
+    }
+    if (byte_property && is_none_string(values[0])) {
+        values[1] = read_byte(r);
+    }
+    else {
+        values[1] = read_fstring(r);
+    }
+    PyObject *value = build_dict(2, keys, values);
+    PyObject *outer_keys[] = {s_id, s_value};
+    PyObject *outer_values[] = {id, value};
+    return build_dict(2, outer_keys, outer_values);
+}
+
+/* The value of a property of one of the T_* types besides T_OTHER */
+static PyObject *
+read_value(Reader *r, int code, PyObject *node)
+{
+    switch (code) {
+    case T_INT:
+    case T_FIXED64:
+        return read_id_value(r, read_i32);
+    case T_UINT16:
+        return read_id_value(r, read_u16);
+    case T_UINT32:
+        return read_id_value(r, read_u32);
+    case T_UINT64:
+        return read_id_value(r, read_u64);
+    case T_INT64:
+        return read_id_value(r, read_i64);
+    case T_FLOAT:
+        return read_id_value(r, read_float);
+    case T_STR:
+    case T_NAME:
+        return read_id_value(r, read_fstring);
+    case T_ENUM:
+        return read_enum_value(r, 0);
+    case T_BYTE:
+        return read_enum_value(r, 1);
+    case T_BOOL: {
+        if (!need(r, 1)) {
+            return BAIL;
+        }
+        PyObject *keys[] = {s_value, s_id};
+        PyObject *values[2];
+        values[0] = PyBool_FromLong(r->buf[r->offset] > 0);
+        r->offset += 1;
+        values[1] = read_optional_guid(r);
+        return build_dict(2, keys, values);
+    }
+    case T_STRUCT: {
+        PyObject *keys[] = {s_struct_type, s_struct_id, s_id, s_value};
+        PyObject *values[4];
+        values[0] = read_fstring(r);
+        values[1] = values[0] != NULL ? read_guid(r) : NULL;
+        values[2] = values[1] != NULL ? read_optional_guid(r) : NULL;
+        values[3] = values[2] != NULL ? read_struct_value(r, values[0], node) : NULL;
+        return build_dict(4, keys, values);
+    }
+    }
+    PyErr_SetString(PyExc_SystemError, "unexpected property type code");
+    return NULL;
+}
+
+static PyObject *
+speedups_read_properties(PyObject *module, PyObject *const *args, Py_ssize_t nargs)
+{
+    if (nargs != 3) {
+        PyErr_SetString(PyExc_TypeError,
+                        "read_properties(reader, node, properties) takes 3 arguments");
+        return NULL;
+    }
+    PyObject *node = args[1];
+    PyObject *properties = args[2];
+    Reader r;
+    memset(&r, 0, sizeof r);
+    r.reader = args[0];
+    PyObject *children = NULL;
+    PyObject *result = NULL;
+    int done = 0;
+
+    PyObject *allow_nan = PyObject_GetAttr(r.reader, s_allow_nan);
+    if (allow_nan == NULL) {
+        return NULL;
+    }
+    r.allow_nan = PyObject_IsTrue(allow_nan);
+    Py_DECREF(allow_nan);
+    if (r.allow_nan < 0 || reader_load_offset(&r) < 0) {
+        goto error;
+    }
+    children = PyObject_GetAttr(node, s_children);
+    if (children == NULL) {
+        goto error;
+    }
+    if (!PyDict_Check(children)) {
+        PyErr_SetString(PyExc_TypeError, "node children must be a dict");
+        goto error;
+    }
+
+    for (;;) {
+        Py_ssize_t start = r.offset;
+        PyObject *name = NULL, *type_name = NULL, *child = NULL, *value = NULL;
+        PyObject *custom = NULL, *size = NULL;
+        uint64_t size_value;
+        int code;
+
+        name = read_fstring(&r);
+        if (name == NULL) {
+            goto bail_or_error;
+        }
+        if (is_none_string(name)) {
+            Py_DECREF(name);
+            done = 1;
+            break;
+        }
+        type_name = read_fstring(&r);
+        if (type_name == NULL) {
+            goto bail_or_error;
+        }
+        if (!need(&r, 8)) {
+            goto bail_or_error;
+        }
+        memcpy(&size_value, r.buf + r.offset, 8);
+        r.offset += 8;
+        child = PyDict_GetItemWithError(children, name);
+        if (child != NULL) {
+            Py_INCREF(child);
+        }
+        else if (PyErr_Occurred()) {
+            goto bail_or_error;
+        }
+        else {
+            child = PyObject_CallMethodOneArg(node, s_child, name);
+            if (child == NULL) {
+                goto bail_or_error;
+            }
+        }
+        custom = PyObject_GetAttr(child, s_custom);
+        if (custom == NULL) {
+            goto bail_or_error;
+        }
+        code = custom == Py_None ? lookup_code(property_types, type_name) : T_OTHER;
+        if (code == T_OTHER) {
+            size = PyLong_FromUnsignedLongLong(size_value);
+            if (size == NULL) {
+                goto bail_or_error;
+            }
+        }
+        if (custom != Py_None) {
+            if (reader_store_offset(&r) < 0) {
+                goto bail_or_error;
+            }
+            value = reader_after_call(
+                &r, PyObject_CallMethodObjArgs(r.reader, s_property, type_name,
+                                               size, child, NULL));
+            if (value == NULL) {
+                goto bail_or_error;
+            }
+        }
+        else {
+            if (code == T_OTHER) {
+                PyObject *handler = PyDict_GetItemWithError(read_dispatch, type_name);
+                if (handler == NULL) {
+                    if (!PyErr_Occurred()) {
+                        PyErr_Format(PyExc_Exception, "Unknown type: %U (%S)",
+                                     type_name, child);
+                    }
+                    goto bail_or_error;
+                }
+                if (reader_store_offset(&r) < 0) {
+                    goto bail_or_error;
+                }
+                value = reader_after_call(
+                    &r, PyObject_CallFunctionObjArgs(handler, r.reader, size,
+                                                     child, NULL));
+            }
+            else {
+                value = read_value(&r, code, child);
+            }
+            if (value == NULL || PyObject_SetItem(value, s_type, type_name) < 0) {
+                goto bail_or_error;
+            }
+        }
+        if (PyObject_SetItem(properties, name, value) < 0) {
+            goto bail_or_error;
+        }
+        Py_DECREF(name);
+        Py_DECREF(type_name);
+        Py_DECREF(child);
+        Py_DECREF(custom);
+        Py_XDECREF(size);
+        Py_DECREF(value);
+        continue;
+
+    bail_or_error:
+        Py_XDECREF(name);
+        Py_XDECREF(type_name);
+        Py_XDECREF(child);
+        Py_XDECREF(custom);
+        Py_XDECREF(size);
+        Py_XDECREF(value);
+        if (PyErr_Occurred()) {
+            goto error;
+        }
+        /* Leave the rest of this property list to the Python loop */
+        r.offset = start;
+        break;
+    }
+    if (reader_store_offset(&r) < 0) {
+        goto error;
+    }
+    result = PyBool_FromLong(done);
+error:
+    Py_XDECREF(children);
+    reader_release(&r);
+    return result;
+}
+
+/* Writer */
+
+typedef struct {
+    PyObject *writer;
+    PyObject *data; /* bytearray, borrowed from the writer */
+} Writer;
+
+/* Functions returning a size return -1 on error, or DELEGATE to have the
+   property encoded by Python (only before any Python code was called). */
+#define DELEGATE (-2)
+
+static int
+writer_refresh(Writer *w)
+{
+    PyObject *data = PyObject_GetAttr(w->writer, s_data);
+    if (data == NULL) {
+        return -1;
+    }
+    if (!PyByteArray_CheckExact(data)) {
+        Py_DECREF(data);
+        PyErr_SetString(PyExc_TypeError, "writer data must be a bytearray");
+        return -1;
+    }
+    /* The writer keeps it alive */
+    Py_DECREF(data);
+    w->data = data;
+    return 0;
+}
+
+static Py_ssize_t
+writer_call_size(Writer *w, PyObject *result)
+{
+    if (result == NULL) {
+        return -1;
+    }
+    Py_ssize_t size = PyLong_AsSsize_t(result);
+    Py_DECREF(result);
+    if (size == -1 && PyErr_Occurred()) {
+        return -1;
+    }
+    if (writer_refresh(w) < 0) {
+        return -1;
+    }
+    return size;
+}
+
+static int
+append(Writer *w, const void *p, Py_ssize_t n)
+{
+    Py_ssize_t len = PyByteArray_GET_SIZE(w->data);
+    if (PyByteArray_Resize(w->data, len + n) < 0) {
+        return -1;
+    }
+    memcpy(PyByteArray_AS_STRING(w->data) + len, p, n);
+    return 0;
+}
+
+static int
+writer_truncate(Writer *w, Py_ssize_t len)
+{
+    return PyByteArray_Resize(w->data, len);
+}
+
+static Py_ssize_t
+write_fstring(Writer *w, PyObject *s)
+{
+    if (!PyUnicode_CheckExact(s)) {
+        return writer_call_size(w, PyObject_CallMethodOneArg(w->writer, s_fstring, s));
+    }
+    Py_ssize_t n = PyUnicode_GET_LENGTH(s);
+    int32_t size;
+    if (n == 0) {
+        size = 0;
+        return append(w, &size, 4) < 0 ? -1 : 4;
+    }
+    if (n >= INT32_MAX / 2) {
+        return writer_call_size(w, PyObject_CallMethodOneArg(w->writer, s_fstring, s));
+    }
+    if (PyUnicode_IS_ASCII(s)) {
+        size = (int32_t)n + 1;
+        if (append(w, &size, 4) < 0 || append(w, PyUnicode_1BYTE_DATA(s), n) < 0 ||
+            append(w, "", 1) < 0) {
+            return -1;
+        }
+        return 4 + n + 1;
+    }
+    PyObject *encoded = PyUnicode_AsEncodedString(s, "utf-16-le", "surrogatepass");
+    if (encoded == NULL) {
+        return -1;
+    }
+    Py_ssize_t len = PyBytes_GET_SIZE(encoded);
+    size = -(int32_t)(len / 2 + 1);
+    int failed = append(w, &size, 4) < 0 ||
+                 append(w, PyBytes_AS_STRING(encoded), len) < 0 ||
+                 append(w, "\0", 2) < 0;
+    Py_DECREF(encoded);
+    return failed ? -1 : 4 + len + 2;
+}
+
+static int
+write_guid(Writer *w, PyObject *u)
+{
+    if ((PyObject *)Py_TYPE(u) == UUID_type) {
+        PyObject *raw = PyObject_GetAttr(u, s_raw_bytes);
+        if (raw == NULL) {
+            return -1;
+        }
+        if (PyBytes_CheckExact(raw)) {
+            int result = append(w, PyBytes_AS_STRING(raw), PyBytes_GET_SIZE(raw));
+            Py_DECREF(raw);
+            return result;
+        }
+        Py_DECREF(raw);
+    }
+    /* GUID strings and uuid.UUID go through uuid_writer */
+    PyObject *result = PyObject_CallMethodOneArg(w->writer, s_guid, u);
+    if (result == NULL) {
+        return -1;
+    }
+    Py_DECREF(result);
+    return writer_refresh(w);
+}
+
+static int
+write_optional_guid(Writer *w, PyObject *u)
+{
+    if (u == NULL || u == Py_None) {
+        return append(w, "", 1);
+    }
+    if (append(w, "\1", 1) < 0) {
+        return -1;
+    }
+    return write_guid(w, u);
+}
+
+/* Fetch a key of a dict, DELEGATE unless it is there */
+static int
+get_item(PyObject *dict, PyObject *key, PyObject **value)
+{
+    if (!PyDict_CheckExact(dict)) {
+        return DELEGATE;
+    }
+    *value = PyDict_GetItemWithError(dict, key);
+    if (*value == NULL) {
+        return PyErr_Occurred() ? -1 : DELEGATE;
+    }
+    return 0;
+}
+
+/* Integers that pack as they are, DELEGATE otherwise */
+static int
+get_int(PyObject *v, long long min, long long max, long long *out)
+{
+    if (!PyLong_CheckExact(v)) {
+        return DELEGATE;
+    }
+    int overflow;
+    *out = PyLong_AsLongLongAndOverflow(v, &overflow);
+    if (*out == -1 && PyErr_Occurred()) {
+        return -1;
+    }
+    if (overflow || *out < min || *out > max) {
+        return DELEGATE;
+    }
+    return 0;
+}
+
+static int
+write_int(Writer *w, PyObject *v, int code)
+{
+    long long i;
+    int status;
+    switch (code) {
+    case T_INT:
+    case T_FIXED64: {
+        if ((status = get_int(v, INT32_MIN, INT32_MAX, &i)) < 0) {
+            return status;
+        }
+        int32_t x = (int32_t)i;
+        return append(w, &x, 4);
+    }
+    case T_UINT16: {
+        if ((status = get_int(v, 0, UINT16_MAX, &i)) < 0) {
+            return status;
+        }
+        uint16_t x = (uint16_t)i;
+        return append(w, &x, 2);
+    }
+    case T_UINT32: {
+        if ((status = get_int(v, 0, UINT32_MAX, &i)) < 0) {
+            return status;
+        }
+        uint32_t x = (uint32_t)i;
+        return append(w, &x, 4);
+    }
+    case T_INT64: {
+        if ((status = get_int(v, INT64_MIN, INT64_MAX, &i)) < 0) {
+            return status;
+        }
+        int64_t x = (int64_t)i;
+        return append(w, &x, 8);
+    }
+    case T_UINT64: {
+        if (!PyLong_CheckExact(v)) {
+            return DELEGATE;
+        }
+        uint64_t x = PyLong_AsUnsignedLongLong(v);
+        if (x == (uint64_t)-1 && PyErr_Occurred()) {
+            PyErr_Clear();
+            return DELEGATE;
+        }
+        return append(w, &x, 8);
+    }
+    case T_BYTE: {
+        if ((status = get_int(v, 0, UINT8_MAX, &i)) < 0) {
+            return status;
+        }
+        uint8_t x = (uint8_t)i;
+        return append(w, &x, 1);
+    }
+    }
+    PyErr_SetString(PyExc_SystemError, "unexpected integer type code");
+    return -1;
+}
+
+/* Finite floats within range, DELEGATE for None, NaN and anything else */
+static int
+write_float(Writer *w, PyObject *v)
+{
+    if (!PyFloat_CheckExact(v)) {
+        return DELEGATE;
+    }
+    double d = PyFloat_AS_DOUBLE(v);
+    float f = (float)d;
+    if (!isfinite(d) || !isfinite(f)) {
+        return DELEGATE;
+    }
+    return append(w, &f, 4);
+}
+
+static int
+write_double(Writer *w, PyObject *v)
+{
+    double d;
+    if (v == Py_None) {
+        d = nan_value;
+    }
+    else if (PyFloat_CheckExact(v)) {
+        d = PyFloat_AS_DOUBLE(v);
+    }
+    else {
+        return DELEGATE;
+    }
+    return append(w, &d, 8);
+}
+
+static int
+write_fields(Writer *w, PyObject *value, int n, PyObject **keys,
+             int (*write)(Writer *, PyObject *))
+{
+    for (int i = 0; i < n; i++) {
+        PyObject *v;
+        int status = get_item(value, keys[i], &v);
+        if (status == 0) {
+            status = write(w, v);
+        }
+        if (status < 0) {
+            return status;
+        }
+    }
+    return 0;
+}
+
+static int
+write_byte_field(Writer *w, PyObject *v)
+{
+    return write_int(w, v, T_BYTE);
+}
+
+static int
+write_u64_field(Writer *w, PyObject *v)
+{
+    return write_int(w, v, T_UINT64);
+}
+
+static int write_properties(Writer *w, PyObject *properties);
+
+static int
+write_struct_value(Writer *w, int struct_code, PyObject *value)
+{
+    switch (struct_code) {
+    case S_VECTOR: {
+        PyObject *keys[] = {s_x, s_y, s_z};
+        return write_fields(w, value, 3, keys, write_double);
+    }
+    case S_DATETIME:
+        return write_u64_field(w, value);
+    case S_GUID:
+        return write_guid(w, value);
+    case S_QUAT: {
+        PyObject *keys[] = {s_x, s_y, s_z, s_w};
+        return write_fields(w, value, 4, keys, write_double);
+    }
+    case S_LINEAR_COLOR: {
+        PyObject *keys[] = {s_r, s_g, s_b, s_a};
+        return write_fields(w, value, 4, keys, write_float);
+    }
+    case S_COLOR: {
+        PyObject *keys[] = {s_b, s_g, s_r, s_a};
+        return write_fields(w, value, 4, keys, write_byte_field);
+    }
+    }
+    if (PyDict_CheckExact(value)) {
+        return write_properties(w, value) < 0 || write_fstring(w, s_None) < 0 ? -1 : 0;
+    }
+    PyObject *result = PyObject_CallMethodOneArg(w->writer, s_properties, value);
+    if (result == NULL) {
+        return -1;
+    }
+    Py_DECREF(result);
+    return writer_refresh(w);
+}
+
+/* Same as FArchiveWriter.property_inner for the T_* types besides T_OTHER */
+static Py_ssize_t
+write_value(Writer *w, int code, PyObject *property)
+{
+    PyObject *value, *id = NULL, *inner, *enum_type;
+    int status;
+    Py_ssize_t start, size;
+
+    if (code != T_STRUCT && (status = get_item(property, s_value, &value)) < 0) {
+        return status;
+    }
+    if (code != T_ENUM && code != T_BYTE && code != T_BOOL && code != T_STRUCT) {
+        id = PyDict_GetItemWithError(property, s_id);
+        if (id == NULL && PyErr_Occurred()) {
+            return -1;
+        }
+        if (write_optional_guid(w, id) < 0) {
+            return -1;
+        }
+    }
+    switch (code) {
+    case T_INT:
+    case T_FIXED64:
+    case T_UINT32:
+        status = write_int(w, value, code);
+        return status < 0 ? status : 4;
+    case T_UINT16:
+        status = write_int(w, value, code);
+        return status < 0 ? status : 2;
+    case T_UINT64:
+    case T_INT64:
+        status = write_int(w, value, code);
+        return status < 0 ? status : 8;
+    case T_FLOAT:
+        status = write_float(w, value);
+        return status < 0 ? status : 4;
+    case T_STR:
+    case T_NAME:
+        return write_fstring(w, value);
+    case T_BOOL: {
+        int truth = PyObject_IsTrue(value);
+        if (truth < 0) {
+            return -1;
+        }
+        if (append(w, truth ? "\1" : "", 1) < 0) {
+            return -1;
+        }
+        id = PyDict_GetItemWithError(property, s_id);
+        if (id == NULL && PyErr_Occurred()) {
+            return -1;
+        }
+        return write_optional_guid(w, id) < 0 ? -1 : 0;
+    }
+    case T_ENUM:
+    case T_BYTE: {
+        if ((status = get_item(value, s_type, &enum_type)) < 0 ||
+            (status = get_item(value, s_value, &inner)) < 0) {
+            return status;
+        }
+        if (write_fstring(w, enum_type) < 0) {
+            return -1;
+        }
+        id = PyDict_GetItemWithError(property, s_id);
+        if (id == NULL && PyErr_Occurred()) {
+            return -1;
+        }
+        if (write_optional_guid(w, id) < 0) {
+            return -1;
+        }
+        if (code == T_BYTE) {
+            int is_none = PyObject_RichCompareBool(enum_type, s_None, Py_EQ);
+            if (is_none < 0) {
+                return -1;
+            }
+            if (is_none) {
+                status = write_int(w, inner, T_BYTE);
+                return status < 0 ? status : 1;
+            }
+        }
+        return write_fstring(w, inner);
+    }
+    case T_STRUCT: {
+        PyObject *struct_type, *struct_id;
+        if ((status = get_item(property, s_struct_type, &struct_type)) < 0 ||
+            (status = get_item(property, s_struct_id, &struct_id)) < 0 ||
+            (status = get_item(property, s_value, &value)) < 0) {
+            return status;
+        }
+        if (!PyUnicode_CheckExact(struct_type)) {
+            return DELEGATE;
+        }
+        if (write_fstring(w, struct_type) < 0 || write_guid(w, struct_id) < 0) {
+            return -1;
+        }
+        id = PyDict_GetItemWithError(property, s_id);
+        if (id == NULL && PyErr_Occurred()) {
+            return -1;
+        }
+        if (write_optional_guid(w, id) < 0) {
+            return -1;
+        }
+        start = PyByteArray_GET_SIZE(w->data);
+        status = write_struct_value(w, lookup_code(struct_types, struct_type), value);
+        if (status < 0) {
+            return status;
+        }
+        size = PyByteArray_GET_SIZE(w->data) - start;
+        return size;
+    }
+    }
+    PyErr_SetString(PyExc_SystemError, "unexpected property type code");
+    return -1;
+}
+
+static int
+write_property(Writer *w, PyObject *property)
+{
+    if (!PyDict_CheckExact(property)) {
+        PyObject *result = PyObject_CallMethodOneArg(w->writer, s_property, property);
+        if (result == NULL) {
+            return -1;
+        }
+        Py_DECREF(result);
+        return writer_refresh(w);
+    }
+    PyObject *type_name = PyDict_GetItemWithError(property, s_type);
+    if (type_name == NULL) {
+        if (!PyErr_Occurred()) {
+            PyErr_SetObject(PyExc_KeyError, s_type);
+        }
+        return -1;
+    }
+    Py_INCREF(type_name);
+    Py_ssize_t size = -1;
+    if (write_fstring(w, type_name) < 0) {
+        goto done;
+    }
+    Py_ssize_t size_pos = PyByteArray_GET_SIZE(w->data);
+    uint64_t placeholder = 0;
+    if (append(w, &placeholder, 8) < 0) {
+        goto done;
+    }
+    int code = T_OTHER;
+    int has_custom = PyDict_Contains(property, s_custom_type);
+    if (has_custom < 0) {
+        goto done;
+    }
+    if (!has_custom) {
+        code = lookup_code(property_types, type_name);
+    }
+    size = code == T_OTHER ? DELEGATE : write_value(w, code, property);
+    if (size == DELEGATE) {
+        if (writer_truncate(w, size_pos + 8) < 0) {
+            size = -1;
+            goto done;
+        }
+        size = writer_call_size(
+            w, PyObject_CallMethodObjArgs(w->writer, s_property_inner, type_name,
+                                          property, NULL));
+    }
+    if (size < 0) {
+        goto done;
+    }
+    uint64_t size_value = (uint64_t)size;
+    memcpy(PyByteArray_AS_STRING(w->data) + size_pos, &size_value, 8);
+done:
+    Py_DECREF(type_name);
+    return size < 0 ? -1 : 0;
+}
+
+static int
+write_properties(Writer *w, PyObject *properties)
+{
+    Py_ssize_t pos = 0, count = PyDict_GET_SIZE(properties);
+    PyObject *key, *value;
+    while (PyDict_Next(properties, &pos, &key, &value)) {
+        Py_INCREF(key);
+        Py_INCREF(value);
+        int failed = write_fstring(w, key) < 0 || write_property(w, value) < 0;
+        Py_DECREF(key);
+        Py_DECREF(value);
+        if (failed) {
+            return -1;
+        }
+        if (PyDict_GET_SIZE(properties) != count) {
+            PyErr_SetString(PyExc_RuntimeError,
+                            "dictionary changed size during iteration");
+            return -1;
+        }
+    }
+    return 0;
+}
+
+static PyObject *
+speedups_write_properties(PyObject *module, PyObject *const *args, Py_ssize_t nargs)
+{
+    if (nargs != 2) {
+        PyErr_SetString(PyExc_TypeError,
+                        "write_properties(writer, properties) takes 2 arguments");
+        return NULL;
+    }
+    if (!PyDict_CheckExact(args[1])) {
+        PyErr_SetString(PyExc_TypeError, "properties must be a dict");
+        return NULL;
+    }
+    Writer w = {args[0], NULL};
+    if (writer_refresh(&w) < 0 || write_properties(&w, args[1]) < 0) {
+        return NULL;
+    }
+    Py_RETURN_NONE;
+}
+
+/* Byte order of the hex digits of str(UUID), as in UUID.__str__ */
+static const unsigned char guid_order[16] = {3, 2, 1, 0, 7, 6, 5, 4,
+                                             11, 10, 9, 8, 15, 14, 13, 12};
+
+static PyObject *
+format_guid(const unsigned char *b)
+{
+    static const char hex[] = "0123456789abcdef";
+    PyObject *s = PyUnicode_New(36, 127);
+    if (s == NULL) {
+        return NULL;
+    }
+    Py_UCS1 *out = PyUnicode_1BYTE_DATA(s);
+    for (int i = 0; i < 16; i++) {
+        if (i == 4 || i == 6 || i == 8 || i == 10) {
+            *out++ = '-';
+        }
+        unsigned char c = b[guid_order[i]];
+        *out++ = hex[c >> 4];
+        *out++ = hex[c & 15];
+    }
+    return s;
+}
+
+static PyObject *
+speedups_format_guids(PyObject *module, PyObject *arg)
+{
+    Py_buffer view;
+    if (PyObject_GetBuffer(arg, &view, PyBUF_SIMPLE) < 0) {
+        return NULL;
+    }
+    if (view.len % 16 != 0) {
+        PyBuffer_Release(&view);
+        PyErr_SetString(PyExc_ValueError,
+                        "GUID data must be a multiple of 16 bytes");
+        return NULL;
+    }
+    Py_ssize_t count = view.len / 16;
+    PyObject *result = PyList_New(count);
+    if (result != NULL) {
+        const unsigned char *b = view.buf;
+        for (Py_ssize_t i = 0; i < count; i++) {
+            PyObject *s = format_guid(b + i * 16);
+            if (s == NULL) {
+                Py_CLEAR(result);
+                break;
+            }
+            PyList_SET_ITEM(result, i, s);
+        }
+    }
+    PyBuffer_Release(&view);
+    return result;
+}
+
+static int
+cache_uuid_strings(PyObject *obj)
+{
+    if (Py_IS_TYPE(obj, (PyTypeObject *)UUID_type)) {
+        PyObject *cached = PyObject_GetAttr(obj, s_parsed_str);
+        if (cached == NULL) {
+            return -1;
+        }
+        int done = PyObject_IsTrue(cached);
+        Py_DECREF(cached);
+        if (done != 0) {
+            return done < 0 ? -1 : 0;
+        }
+        PyObject *raw = PyObject_GetAttr(obj, s_raw_bytes);
+        if (raw == NULL) {
+            return -1;
+        }
+        int status = 0;
+        /* Anything but 16 bytes is left to UUID.__str__ */
+        if (PyBytes_CheckExact(raw) && PyBytes_GET_SIZE(raw) == 16) {
+            const char *b = PyBytes_AS_STRING(raw);
+            PyObject *s = format_guid((const unsigned char *)b);
+            if (s == NULL) {
+                status = -1;
+            }
+            else {
+                status = PyObject_SetAttr(obj, s_parsed_str, s);
+                Py_DECREF(s);
+            }
+        }
+        Py_DECREF(raw);
+        return status;
+    }
+    PyObject *const *items;
+    Py_ssize_t count;
+    if (PyDict_CheckExact(obj)) {
+        if (Py_EnterRecursiveCall(" while caching UUID strings")) {
+            return -1;
+        }
+        Py_ssize_t pos = 0;
+        PyObject *key, *value;
+        int status = 0;
+        while (PyDict_Next(obj, &pos, &key, &value)) {
+            if ((status = cache_uuid_strings(value)) < 0) {
+                break;
+            }
+        }
+        Py_LeaveRecursiveCall();
+        return status;
+    }
+    else if (PyList_CheckExact(obj)) {
+        items = ((PyListObject *)obj)->ob_item;
+        count = PyList_GET_SIZE(obj);
+    }
+    else if (PyTuple_CheckExact(obj)) {
+        items = ((PyTupleObject *)obj)->ob_item;
+        count = PyTuple_GET_SIZE(obj);
+    }
+    else {
+        return 0;
+    }
+    if (Py_EnterRecursiveCall(" while caching UUID strings")) {
+        return -1;
+    }
+    int status = 0;
+    for (Py_ssize_t i = 0; i < count; i++) {
+        if ((status = cache_uuid_strings(items[i])) < 0) {
+            break;
+        }
+    }
+    Py_LeaveRecursiveCall();
+    return status;
+}
+
+static PyObject *
+speedups_cache_uuid_strings(PyObject *module, PyObject *arg)
+{
+    if (UUID_type == NULL) {
+        PyErr_SetString(PyExc_RuntimeError, "setup() has not been called");
+        return NULL;
+    }
+    if (cache_uuid_strings(arg) < 0) {
+        return NULL;
+    }
+    Py_RETURN_NONE;
+}
+
+static PyObject *
+speedups_setup(PyObject *module, PyObject *args)
+{
+    PyObject *uuid_type, *dispatch, *cache;
+    Py_ssize_t max_length, cache_size;
+    if (!PyArg_ParseTuple(args, "OO!O!nn:setup", &uuid_type, &PyDict_Type,
+                          &dispatch, &PyDict_Type, &cache, &max_length,
+                          &cache_size)) {
+        return NULL;
+    }
+    Py_XSETREF(UUID_type, Py_NewRef(uuid_type));
+    Py_XSETREF(read_dispatch, Py_NewRef(dispatch));
+    Py_XSETREF(fstring_cache, Py_NewRef(cache));
+    fstring_cache_max_length = max_length;
+    fstring_cache_size = cache_size;
+    Py_RETURN_NONE;
+}
+
+static PyMethodDef speedups_methods[] = {
+    {"setup", speedups_setup, METH_VARARGS,
+     "setup(UUID, read_dispatch, fstring_cache, max_length, cache_size)\n\n"
+     "Set the UUID class, the reader's property handlers and the fstring "
+     "cache shared with FArchiveReader.fstring."},
+    {"read_properties", (PyCFunction)(void (*)(void))speedups_read_properties,
+     METH_FASTCALL,
+     "read_properties(reader, node, properties) -> bool\n\nRead properties into "
+     "the dict until the None terminator. Returns False with the reader at the "
+     "property it stopped at if the rest has to be read in Python."},
+    {"write_properties", (PyCFunction)(void (*)(void))speedups_write_properties,
+     METH_FASTCALL,
+     "write_properties(writer, properties)\n\nWrite the properties of a dict, "
+     "without the None terminator."},
+    {"format_guids", speedups_format_guids, METH_O,
+     "format_guids(data) -> list[str]\n\nFormat consecutive 16-byte GUIDs as "
+     "str(UUID(...)) does."},
+    {"cache_uuid_strings", speedups_cache_uuid_strings, METH_O,
+     "cache_uuid_strings(obj)\n\nStore the string of every UUID in nested "
+     "dicts, lists and tuples in its parsed_str."},
+    {NULL, NULL, 0, NULL},
+};
+
+static struct PyModuleDef speedups_module = {
+    PyModuleDef_HEAD_INIT,
+    "palworld_save_tools._speedups",
+    "C implementation of the FArchiveReader and FArchiveWriter property loops.",
+    -1,
+    speedups_methods,
+};
+
+PyMODINIT_FUNC
+PyInit__speedups(void)
+{
+#define INTERN(var, s)                                   \
+    if ((var = PyUnicode_InternFromString(s)) == NULL) { \
+        return NULL;                                     \
+    }
+    INTERN(s_data, "data");
+    INTERN(s_offset, "offset");
+    INTERN(s_size, "size");
+    INTERN(s_allow_nan, "allow_nan");
+    INTERN(s_children, "children");
+    INTERN(s_custom, "custom");
+    INTERN(s_child, "child");
+    INTERN(s_property, "property");
+    INTERN(s_properties_until_end, "properties_until_end");
+    INTERN(s_property_inner, "property_inner");
+    INTERN(s_properties, "properties");
+    INTERN(s_fstring, "fstring");
+    INTERN(s_guid, "guid");
+    INTERN(s_raw_bytes, "raw_bytes");
+    INTERN(s_parsed_str, "parsed_str");
+    INTERN(s_id, "id");
+    INTERN(s_value, "value");
+    INTERN(s_type, "type");
+    INTERN(s_struct_type, "struct_type");
+    INTERN(s_struct_id, "struct_id");
+    INTERN(s_custom_type, "custom_type");
+    INTERN(s_x, "x");
+    INTERN(s_y, "y");
+    INTERN(s_z, "z");
+    INTERN(s_w, "w");
+    INTERN(s_r, "r");
+    INTERN(s_g, "g");
+    INTERN(s_b, "b");
+    INTERN(s_a, "a");
+    INTERN(s_None, "None");
+    INTERN(s_empty, "");
+#undef INTERN
+    /* The same NaN as float("nan"), which FArchiveWriter.double writes for None */
+    PyObject *nan_string = PyUnicode_FromString("nan");
+    if (nan_string == NULL) {
+        return NULL;
+    }
+    PyObject *nan = PyFloat_FromString(nan_string);
+    Py_DECREF(nan_string);
+    if (nan == NULL) {
+        return NULL;
+    }
+    nan_value = PyFloat_AS_DOUBLE(nan);
+    Py_DECREF(nan);
+    return PyModule_Create(&speedups_module);
+}
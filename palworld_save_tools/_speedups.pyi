@@ -0,0 +1,17 @@
+from typing import Any, Callable, Union
+
+from palworld_save_tools.archive import FArchiveReader, FArchiveWriter
+
+def setup(
+    uuid_class: type,
+    read_dispatch: dict[str, Callable],
+    fstring_cache: dict[bytes, str],
+    max_length: int,
+    cache_size: int,
+) -> None: ...
+def read_properties(
+    reader: FArchiveReader, node: Any, properties: dict[str, Any]
+) -> bool: ...
+def write_properties(writer: FArchiveWriter, properties: dict[str, Any]) -> None: ...
+def format_guids(data: Union[bytes, bytearray, memoryview]) -> list[str]: ...
+def cache_uuid_strings(obj: Any) -> None: ...
@@ -1,14 +1,18 @@
+import array
 import base64
-import io
 import math
+import mmap
 import os
 import struct
 import sys
 import uuid
-from typing import Any, Callable, Optional, Sequence, Union
+from collections.abc import Mapping, MutableMapping
+from typing import Any, Callable, NamedTuple, NoReturn, Optional, Sequence, Union
 
 from loguru import logger
 
+from palworld_save_tools import nodes
+
 
 def coerce_bytes(value) -> bytes:
     """Normalize raw-byte-blob fields into ``bytes``.
@@ -36,6 +40,21 @@ try:
 except ImportError:
     pass
 
+try:
+    from palworld_save_tools import _speedups
+except ImportError:
+    _speedups = None  # type: ignore[assignment]
+
+if os.getenv("FORCE_STDLIB_ONLY"):
+    _speedups = None  # type: ignore[assignment]
+elif _speedups is not None and os.getenv("DEBUG"):
+    logger.debug("Using C property loops")
+
+# The groups of a GUID string are little-endian words of its raw bytes, with
+# the two middle u16 pairs swapped
+_unpack_guid = struct.Struct("<IHHHHI").unpack
+_GUID_FORMAT = "%08x-%04x-%04x-%04x-%04x%08x"
+
 if os.getenv("FORCE_STDLIB_ONLY") or "recordclass" not in sys.modules:
     if os.getenv("DEBUG"):
         logger.debug("Using stdlib-compatible UUID class")
@@ -81,15 +100,8 @@ if os.getenv("FORCE_STDLIB_ONLY") or "recordclass" not in sys.modules:
 
         def __str__(self) -> str:
             if not self.parsed_str:
-                b = self.raw_bytes
-                self.parsed_str = "%08x-%04x-%04x-%04x-%04x%08x" % (
-                    (b[3] << 24) | (b[2] << 16) | (b[1] << 8) | (b[0]),
-                    (b[7] << 8) | (b[6]),
-                    (b[5] << 8) | (b[4]),
-                    (b[0xB] << 8) | (b[0xA]),
-                    (b[9] << 8) | (b[8]),
-                    (b[0xF] << 24) | (b[0xE] << 16) | (b[0xD] << 8) | (b[0xC]),
-                )
+                a, b, c, d, e, f = _unpack_guid(self.raw_bytes)
+                self.parsed_str = _GUID_FORMAT % (a, c, b, e, d, f)
             return self.parsed_str
 
         def UUID(self) -> uuid.UUID:
@@ -125,6 +137,8 @@ if os.getenv("FORCE_STDLIB_ONLY") or "recordclass" not in sys.modules:
             return "%s.UUID('%s')" % (self.__module__, str(self))
 
         def __hash__(self) -> int:
+            # Equal to its string form, so it must hash as it; the string is
+            # formatted once and cached in parsed_str
             return hash(str(self))
 
 else:
@@ -163,15 +177,8 @@ else:
             )
 
         def __str__(self) -> str:
-            b = self.raw_bytes
-            return "%08x-%04x-%04x-%04x-%04x%08x" % (
-                (b[3] << 24) | (b[2] << 16) | (b[1] << 8) | (b[0]),
-                (b[7] << 8) | (b[6]),
-                (b[5] << 8) | (b[4]),
-                (b[0xB] << 8) | (b[0xA]),
-                (b[9] << 8) | (b[8]),
-                (b[0xF] << 24) | (b[0xE] << 16) | (b[0xD] << 8) | (b[0xC]),
-            )
+            a, b, c, d, e, f = _unpack_guid(self.raw_bytes)
+            return _GUID_FORMAT % (a, c, b, e, d, f)
 
         def UUID(self) -> uuid.UUID:
             b = self.raw_bytes
@@ -209,6 +216,38 @@ else:
             return "%s.UUID('%s')" % (self.__module__, str(self))
 
 
+def format_guids(data: bytes) -> list[str]:
+    """Format consecutive 16-byte raw GUIDs as ``str(UUID(...))`` does each.
+
+    The bytes of each GUID are reordered and hex encoded for the whole
+    buffer at once, instead of one UUID at a time.
+    """
+    if _speedups is not None:
+        return _speedups.format_guids(data)
+    if len(data) % 16:
+        raise ValueError("GUID data must be a multiple of 16 bytes")
+    words = array.array("I", data)
+    words.byteswap()
+    h = words.tobytes().hex()
+    guids = []
+    for i in range(0, len(h), 32):
+        g = h[i : i + 32]
+        guids.append(f"{g[:8]}-{g[8:12]}-{g[12:16]}-{g[16:20]}-{g[20:]}")
+    return guids
+
+
+def cache_uuid_strings(data: Any) -> None:
+    """Format every UUID in nested dicts and lists up front, in one pass.
+
+    Their ``str()`` is then a cached lookup, e.g. when dumping to JSON.
+    Needs the C accelerator and the stdlib-compatible UUID, which caches its
+    string; otherwise this does nothing, as walking the tree in Python costs
+    about as much as it saves.
+    """
+    if _speedups is not None and hasattr(UUID, "parsed_str"):
+        _speedups.cache_uuid_strings(data)
+
+
 # Specify a type for JSON-serializable objects
 JSON = Union[
     None, bool, int, float, str, list["JSON"], dict[str, "JSON"], UUID, uuid.UUID
@@ -229,8 +268,104 @@ def uuid_reader(reader: "FArchiveReader") -> UUID:
     return UUID(b)
 
 
+# Short ASCII fstrings (property, type and enum names) repeat throughout a
+# save, so each is decoded and interned once and the same str is shared by
+# every later read of it, looked up by its raw bytes. Once the cache holds
+# FSTRING_CACHE_SIZE strings, new ones are decoded without being cached.
+FSTRING_CACHE_MAX_LENGTH = 64
+FSTRING_CACHE_SIZE = 1 << 16
+_fstring_cache: dict[bytes, str] = {}
+# Hits and misses, only counted by debug readers
+fstring_cache_stats = [0, 0]
+
+
+# Property types whose header before the sized value is a single fstring
+_SKIP_FSTRING_HEADER_TYPES = frozenset(
+    ("ArrayProperty", "ByteProperty", "EnumProperty", "SetProperty")
+)
+
+
+# Reserved in front of values whose u64 size is only known once written
+_SIZE_PLACEHOLDER = b"\x00" * 8
+
+# Struct types every element of which has the same width, so struct arrays of
+# them are read and written in one go; the array typecodes are the per-field
+# formats of the struct layouts
+_FIXED_STRUCT_LAYOUTS = {
+    "Vector": struct.Struct("3d"),
+    "Quat": struct.Struct("4d"),
+    "LinearColor": struct.Struct("4f"),
+    "Color": struct.Struct("4B"),
+    "DateTime": struct.Struct("Q"),
+}
+_FIXED_STRUCT_TYPECODES = {
+    "Vector": "d",
+    "Quat": "d",
+    "LinearColor": "f",
+    "Color": "B",
+    "DateTime": "Q",
+}
+_FLOAT_STRUCT_TYPES = frozenset(("Vector", "Quat", "LinearColor"))
+
+
+class DecodePlan:
+    """Node of the property path trie the reader walks instead of path strings.
+
+    ``compile`` builds the trie from the type hints and custom properties
+    once per read, so a property's hint and decoder are attributes of its
+    node rather than lookups keyed by its full dotted path. Children for
+    any other name are added on first visit and reused after that, and the
+    dotted path itself is only built when asked for with ``str()``, e.g.
+    for error messages, debug logs and ``custom_type``.
+    """
+
+    __slots__ = ("parent", "name", "children", "type_hint", "custom", "_path")
+
+    def __init__(self, parent: Optional["DecodePlan"] = None, name: str = ""):
+        self.parent = parent
+        self.name = name
+        self.children: dict[str, DecodePlan] = {}
+        self.type_hint: Optional[str] = None
+        self.custom: Optional[tuple[Callable, Callable]] = None
+        self._path: Optional[str] = None if parent is not None else ""
+
+    @staticmethod
+    def compile(
+        type_hints: dict[str, str],
+        custom_properties: dict[str, tuple[Callable, Callable]],
+    ) -> "DecodePlan":
+        root = DecodePlan()
+        for path, type_hint in type_hints.items():
+            root.lookup(path).type_hint = type_hint
+        for path, custom in custom_properties.items():
+            root.lookup(path).custom = custom
+        return root
+
+    def child(self, name: str) -> "DecodePlan":
+        node = self.children.get(name)
+        if node is None:
+            node = self.children[name] = DecodePlan(self, name)
+        return node
+
+    def lookup(self, path: str) -> "DecodePlan":
+        """Return the node for a dotted path relative to this one."""
+        node = self
+        for name in path.split(".")[1:]:
+            node = node.child(name)
+        return node
+
+    def __str__(self) -> str:
+        if self._path is None:
+            self._path = f"{self.parent}.{self.name}"
+        return self._path
+
+    def __repr__(self) -> str:
+        return "%s.DecodePlan(%r)" % (self.__module__, str(self))
+
+
 class FArchiveReader:
-    data: io.BytesIO
+    data: Union[bytes, mmap.mmap]
+    offset: int
     size: int
     type_hints: dict[str, str]
     custom_properties: dict[str, tuple[Callable, Callable]]
@@ -243,20 +378,44 @@ class FArchiveReader:
         custom_properties: dict[str, tuple[Callable, Callable]] = {},
         debug: bool = os.environ.get("DEBUG", "0") == "1",
         allow_nan: bool = True,
+        plan: Optional[DecodePlan] = None,
     ):
-        self.data = io.BytesIO(data)
+        # Reads unpack in place from the underlying buffer with an integer
+        # cursor. bytes and mmap are used as-is since slicing them yields
+        # bytes; any other buffer is copied once up front.
+        if not isinstance(data, (bytes, mmap.mmap)):
+            data = bytes(data)
+        self.data = data
+        self.offset = 0
         self.size = len(data)
         self.type_hints = type_hints
         self.custom_properties = custom_properties
         self.debug = debug
+        if debug:
+            self.fstring = self._counted_fstring  # type: ignore[method-assign]
         self.allow_nan = allow_nan
+        # Compiled on first use, readers over RawData blobs share their
+        # parent's
+        self._plan = plan
+
+    @property
+    def plan(self) -> DecodePlan:
+        if self._plan is None:
+            self._plan = DecodePlan.compile(self.type_hints, self.custom_properties)
+        return self._plan
+
+    def plan_node(self, path: Union[str, DecodePlan]) -> DecodePlan:
+        """Return the trie node for ``path``, given as a node or dotted path."""
+        if type(path) is str:
+            return self.plan.lookup(path)
+        return path  # type: ignore[return-value]
 
     def __enter__(self):
-        self.data.seek(0)
+        self.offset = 0
         return self
 
     def __exit__(self, type, value, traceback):
-        self.data.close()
+        pass
 
     def internal_copy(self, data, debug: bool) -> "FArchiveReader":
         return FArchiveReader(
@@ -265,129 +424,277 @@ class FArchiveReader:
             self.custom_properties,
             debug=debug,
             allow_nan=self.allow_nan,
+            plan=self.plan,
         )
 
-    def get_type_or(self, path: str, default: str):
-        if path in self.type_hints:
-            return self.type_hints[path]
+    def sub_reader(self, size: int, debug: bool = False) -> "FArchiveReader":
+        """Return a reader over the next ``size`` bytes without copying them.
+
+        The sub-reader shares this reader's buffer and its ``eof``, ``read``
+        and ``read_to_end`` are bounded to the window; this reader's cursor
+        advances past the window.
+        """
+        reader = self.internal_copy(b"", debug=debug)
+        reader.data = self.data
+        reader.offset = self.offset
+        reader.size = min(self.offset + size, self.size)
+        self.offset = reader.size
+        return reader
+
+    def byte_array_reader(
+        self, type_name: str, size: int, path: Union[str, DecodePlan]
+    ) -> tuple[dict[str, Any], "FArchiveReader"]:
+        """Read the header of a byte array property, e.g. a RawData blob.
+
+        Returns the property as ``property`` would without its ``value``,
+        which is left to the caller to decode from the returned sub-reader
+        over the bytes.
+        """
+        if type_name != "ArrayProperty":
+            raise Exception(f"Expected ArrayProperty, got {type_name}")
+        array_type = self.fstring()
+        value = {
+            "array_type": array_type,
+            "id": self.optional_guid(),
+            "value": None,
+            "type": type_name,
+        }
+        count = self.u32()
+        if array_type != "ByteProperty":
+            raise Exception(f"Expected ByteProperty array, got {array_type} ({path})")
+        if size - 4 != count:
+            raise Exception("Labelled ByteProperty not implemented")
+        return value, self.sub_reader(count)
+
+    def get_type_or(self, path: Union[str, DecodePlan], default: str):
+        type_hint = self.plan_node(path).type_hint
+        if type_hint is not None:
+            return type_hint
         else:
             if self.debug:
                 logger.debug(f"Struct type for {path} not found, assuming {default}")
             return default
 
     def eof(self) -> bool:
-        return self.data.tell() >= self.size
+        return self.offset >= self.size
+
+    def tell(self) -> int:
+        return self.offset
+
+    def seek(self, offset: int) -> None:
+        self.offset = offset
 
     def read(self, size: int) -> bytes:
-        return self.data.read(size)
+        offset = self.offset
+        end = min(offset + size, self.size)
+        self.offset = end
+        return self.data[offset:end]
 
     def read_to_end(self) -> bytes:
-        return self.data.read(self.size - self.data.tell())
+        offset = self.offset
+        self.offset = self.size
+        return self.data[offset : self.size]
 
     def bool(self) -> bool:
         return self.byte() > 0
 
     def fstring(self) -> str:
         # in the hot loop, avoid function calls
-        reader = self.data
-        (size,) = FArchiveReader.unpack_i32(reader.read(4))
+        data = self.data
+        offset = self.offset
+        if offset + 4 > self.size:
+            self._past_end(4)
+        (size,) = FArchiveReader.unpack_i32(data, offset)
+        offset += 4
 
         if size == 0:
+            self.offset = offset
             return ""
 
-        data: bytes
+        raw: bytes
         encoding: str
         if size < 0:
             size = -size
-            data = reader.read(size * 2)[:-2]
+            end = offset + size * 2
+            # A string running past the end is clipped, as read() does, and
+            # still loses its last byte(s) as if they were the terminator
+            if end > self.size:
+                end = self.size
+            raw = data[offset : end - 2]
             encoding = "utf-16-le"
         else:
-            data = reader.read(size)[:-1]
+            end = offset + size
+            if end > self.size:
+                end = self.size
+            raw = data[offset : end - 1]
+            # size counts the terminating null
+            if size <= FSTRING_CACHE_MAX_LENGTH + 1:
+                string = _fstring_cache.get(raw)
+                if string is not None:
+                    self.offset = end
+                    return string
+                if len(_fstring_cache) < FSTRING_CACHE_SIZE:
+                    try:
+                        string = sys.intern(raw.decode("ascii"))
+                    except UnicodeDecodeError:
+                        pass
+                    else:
+                        _fstring_cache[raw] = string
+                        self.offset = end
+                        return string
             encoding = "ascii"
+        self.offset = end
 
         try:
-            return data.decode(encoding)
+            return raw.decode(encoding)
         except Exception as e:
             try:
-                escaped = data.decode(encoding, errors="surrogatepass")
+                escaped = raw.decode(encoding, errors="surrogatepass")
                 logger.debug(
-                    f"Error decoding {encoding} string of length {size}, data loss may occur! {bytes(data)!r}"
+                    f"Error decoding {encoding} string of length {size}, data loss may occur! {bytes(raw)!r}"
                 )
                 return escaped
             except Exception as e:
                 raise Exception(
-                    f"Error decoding {encoding} string of length {size}: {bytes(data)!r}"
+                    f"Error decoding {encoding} string of length {size}: {bytes(raw)!r}"
                 ) from e
 
-    unpack_i16 = struct.Struct("h").unpack
+    def _counted_fstring(self) -> str:
+        # Replaces fstring on debug readers to count fstring cache hits
+        data = self.data
+        offset = self.offset
+        (size,) = FArchiveReader.unpack_i32(data, offset)
+        if 0 < size <= FSTRING_CACHE_MAX_LENGTH + 1:
+            if data[offset + 4 : offset + 3 + size] in _fstring_cache:
+                fstring_cache_stats[0] += 1
+            else:
+                fstring_cache_stats[1] += 1
+        return FArchiveReader.fstring(self)
+
+    def _past_end(self, size: int) -> NoReturn:
+        # What unpacking from a short buffer raises; sub-readers end before
+        # the buffer they share does
+        raise struct.error(f"unpack requires a buffer of {size} bytes")
+
+    unpack_i16 = struct.Struct("h").unpack_from
 
     def i16(self) -> int:
-        return FArchiveReader.unpack_i16(self.data.read(2))[0]
+        offset = self.offset
+        if offset + 2 > self.size:
+            self._past_end(2)
+        self.offset = offset + 2
+        return FArchiveReader.unpack_i16(self.data, offset)[0]
 
-    unpack_u16 = struct.Struct("H").unpack
+    unpack_u16 = struct.Struct("H").unpack_from
 
     def u16(self) -> int:
-        return FArchiveReader.unpack_u16(self.data.read(2))[0]
+        offset = self.offset
+        if offset + 2 > self.size:
+            self._past_end(2)
+        self.offset = offset + 2
+        return FArchiveReader.unpack_u16(self.data, offset)[0]
 
-    unpack_i32 = struct.Struct("i").unpack
+    unpack_i32 = struct.Struct("i").unpack_from
 
     def i32(self) -> int:
-        return FArchiveReader.unpack_i32(self.data.read(4))[0]
+        offset = self.offset
+        if offset + 4 > self.size:
+            self._past_end(4)
+        self.offset = offset + 4
+        return FArchiveReader.unpack_i32(self.data, offset)[0]
 
-    unpack_u32 = struct.Struct("I").unpack
+    unpack_u32 = struct.Struct("I").unpack_from
 
     def u32(self) -> int:
-        return FArchiveReader.unpack_u32(self.data.read(4))[0]
+        offset = self.offset
+        if offset + 4 > self.size:
+            self._past_end(4)
+        self.offset = offset + 4
+        return FArchiveReader.unpack_u32(self.data, offset)[0]
 
-    unpack_i64 = struct.Struct("q").unpack
+    unpack_i64 = struct.Struct("q").unpack_from
 
     def i64(self) -> int:
-        return FArchiveReader.unpack_i64(self.data.read(8))[0]
+        offset = self.offset
+        if offset + 8 > self.size:
+            self._past_end(8)
+        self.offset = offset + 8
+        return FArchiveReader.unpack_i64(self.data, offset)[0]
 
-    unpack_u64 = struct.Struct("Q").unpack
+    unpack_u64 = struct.Struct("Q").unpack_from
 
     def u64(self) -> int:
-        return FArchiveReader.unpack_u64(self.data.read(8))[0]
+        offset = self.offset
+        if offset + 8 > self.size:
+            self._past_end(8)
+        self.offset = offset + 8
+        return FArchiveReader.unpack_u64(self.data, offset)[0]
 
-    unpack_float = struct.Struct("f").unpack
+    unpack_float = struct.Struct("f").unpack_from
 
     def float(self) -> Optional[_float]:
-        val = FArchiveReader.unpack_float(self.data.read(4))[0]
+        offset = self.offset
+        if offset + 4 > self.size:
+            self._past_end(4)
+        self.offset = offset + 4
+        val = FArchiveReader.unpack_float(self.data, offset)[0]
         if self.allow_nan:
             return val
         if math.isnan(val) or math.isinf(val):
             return None
         return val
 
-    unpack_double = struct.Struct("d").unpack
+    unpack_double = struct.Struct("d").unpack_from
 
     def double(self) -> Optional[_float]:
-        val = FArchiveReader.unpack_double(self.data.read(8))[0]
+        offset = self.offset
+        if offset + 8 > self.size:
+            self._past_end(8)
+        self.offset = offset + 8
+        val = FArchiveReader.unpack_double(self.data, offset)[0]
         if self.allow_nan:
             return val
         if math.isnan(val) or math.isinf(val):
             return None
         return val
 
-    unpack_byte = struct.Struct("B").unpack
+    unpack_byte = struct.Struct("B").unpack_from
 
     def byte(self) -> int:
-        return FArchiveReader.unpack_byte(self.data.read(1))[0]
+        offset = self.offset
+        if offset + 1 > self.size:
+            self._past_end(1)
+        self.offset = offset + 1
+        return FArchiveReader.unpack_byte(self.data, offset)[0]
 
     def byte_list(self, size: int) -> bytes:
-        return self.data.read(size)
+        return self.read(size)
 
     def skip(self, size: int) -> None:
-        self.data.read(size)
+        self.offset = min(self.offset + size, self.size)
 
     def guid(self) -> UUID:
         # in the hot loop, avoid function calls
-        return UUID(self.data.read(16))
+        offset = self.offset
+        end = offset + 16
+        if end > self.size:
+            # A GUID cut off by the end is read short, as read() does
+            end = self.size
+        self.offset = end
+        return UUID(self.data[offset:end])
 
     def optional_guid(self) -> Optional[UUID]:
         # in the hot loop, avoid function calls
-        if self.data.read(1)[0]:
-            return UUID(self.data.read(16))
+        offset = self.offset
+        if offset >= self.size:
+            self._past_end(1)
+        if self.data[offset]:
+            end = offset + 17
+            if end > self.size:
+                end = self.size
+            self.offset = end
+            return UUID(self.data[offset + 1 : end])
+        self.offset = offset + 1
         return None
 
     def tarray(self, type_reader: Callable[["FArchiveReader"], Any]) -> list[Any]:
@@ -397,17 +704,67 @@ class FArchiveReader:
             array.append(type_reader(self))
         return array
 
-    def properties_until_end(self, path: str = "") -> dict[str, Any]:
-        properties = {}
+    def properties_until_end(self, path: Union[str, DecodePlan] = "") -> dict[str, Any]:
+        node = self.plan_node(path)
+        children = node.children
+        dispatch = self._PROPERTY_DISPATCH
+        properties: dict[str, Any] = {}
+        # The C loop hands back anything it does not read exactly as below,
+        # which is then read from where it stopped
+        if (
+            _speedups is not None
+            and not self.debug
+            and dispatch is FArchiveReader._PROPERTY_DISPATCH
+            and _speedups.read_properties(self, node, properties)
+        ):
+            return properties
         while True:
             name = self.fstring()
             if name == "None":
                 break
             type_name = self.fstring()
             size = self.u64()
-            properties[name] = self.property(type_name, size, f"{path}.{name}")
+            child = children.get(name) or node.child(name)
+            if child.custom is not None:
+                properties[name] = self.property(type_name, size, child)
+                continue
+            # Same as property() for the common case of no custom decoder
+            handler = dispatch.get(type_name)
+            if handler is None:
+                raise Exception(f"Unknown type: {type_name} ({child})")
+            value = handler(self, size, child)
+            value["type"] = type_name
+            properties[name] = value
         return properties
 
+    def skip_fstring(self) -> None:
+        (size,) = FArchiveReader.unpack_i32(self.data, self.offset)
+        self.offset += 4 + (size if size >= 0 else -size * 2)
+
+    def skip_optional_guid(self) -> None:
+        self.offset += 17 if self.data[self.offset] else 1
+
+    def skip_property(self, type_name: str, size: int) -> None:
+        """Skip a property value given the type name and u64 size preceding it.
+
+        The serialized size only covers the value itself, so the small
+        type-specific header in front of it is walked first.
+        """
+        if type_name == "StructProperty":
+            self.skip_fstring()
+            self.offset += 16
+        elif type_name == "MapProperty":
+            self.skip_fstring()
+            self.skip_fstring()
+        elif type_name in _SKIP_FSTRING_HEADER_TYPES:
+            self.skip_fstring()
+        elif type_name == "BoolProperty":
+            self.offset += 1
+        elif type_name not in FArchiveReader._PROPERTY_DISPATCH:
+            raise Exception(f"Unknown type: {type_name}")
+        self.skip_optional_guid()
+        self.offset += size
+
     def _read_StructProperty(self, size, path):
         return self.struct(path)
 
@@ -470,12 +827,13 @@ class FArchiveReader:
         _id = self.optional_guid()
         self.u32()
         count = self.u32()
-        key_path = path + ".Key"
+        node = self.plan_node(path)
+        key_path = node.child("Key")
         if key_type == "StructProperty":
             key_struct_type = self.get_type_or(key_path, "Guid")
         else:
             key_struct_type = None
-        value_path = path + ".Value"
+        value_path = node.child("Value")
         if value_type == "StructProperty":
             value_struct_type = self.get_type_or(value_path, "StructProperty")
         else:
@@ -502,7 +860,7 @@ class FArchiveReader:
         return {
             "set_type": set_type,
             "id": _id,
-            "value": [self.properties_until_end() for _ in range(count)],
+            "value": [self.properties_until_end(self.plan) for _ in range(count)],
         }
 
     _PROPERTY_DISPATCH: dict[str, Callable] = {
@@ -525,22 +883,31 @@ class FArchiveReader:
     }
 
     def property(
-        self, type_name: str, size: int, path: str, nested_caller_path: str = ""
+        self,
+        type_name: str,
+        size: int,
+        path: Union[str, DecodePlan],
+        nested_caller_path: Union[str, DecodePlan] = "",
     ) -> dict[str, Any]:
-        if path in self.custom_properties and (
-            path is not nested_caller_path or nested_caller_path == ""
-        ):
-            value = self.custom_properties[path][0](self, type_name, size, path)
-            value["custom_type"] = path
+        # Custom decoders pass back the node they were given as both paths
+        # to decode the property itself
+        if type(path) is str:
+            path = self.plan_node(path)
+        if type(nested_caller_path) is str and nested_caller_path:
+            nested_caller_path = self.plan_node(nested_caller_path)
+        custom = path.custom  # type: ignore[union-attr]
+        if custom is not None and path is not nested_caller_path:
+            value = custom[0](self, type_name, size, path)
+            value["custom_type"] = str(path)
         else:
-            handler = FArchiveReader._PROPERTY_DISPATCH.get(type_name)
+            handler = self._PROPERTY_DISPATCH.get(type_name)
             if handler is None:
                 raise Exception(f"Unknown type: {type_name} ({path})")
             value = handler(self, size, path)
         value["type"] = type_name
         return value
 
-    def prop_value(self, type_name: str, struct_type_name: str, path: str):
+    def prop_value(self, type_name: str, struct_type_name: str, path: DecodePlan):
         if type_name == "StructProperty":
             return self.struct_value(struct_type_name, path)
         elif type_name == "EnumProperty":
@@ -558,7 +925,7 @@ class FArchiveReader:
         else:
             raise Exception(f"Unknown property value type: {type_name} ({path})")
 
-    def struct(self, path: str) -> dict[str, Any]:
+    def struct(self, path: DecodePlan) -> dict[str, Any]:
         struct_type = self.fstring()
         struct_id = self.guid()
         _id = self.optional_guid()
@@ -570,7 +937,7 @@ class FArchiveReader:
             "value": value,
         }
 
-    def struct_value(self, struct_type: str, path: str = ""):
+    def struct_value(self, struct_type: str, path: Union[str, DecodePlan] = ""):
         if struct_type == "Vector":
             return self.vector_dict()
         elif struct_type == "DateTime":
@@ -598,7 +965,8 @@ class FArchiveReader:
                 logger.debug(f"Assuming struct type: {struct_type} ({path})")
             return self.properties_until_end(path)
 
-    def array_property(self, array_type: str, size: int, path: str):
+    def array_property(self, array_type: str, size: int, path: Union[str, DecodePlan]):
+        node = self.plan_node(path)
         count = self.u32()
         value = {}
         if array_type == "StructProperty":
@@ -608,9 +976,12 @@ class FArchiveReader:
             type_name = self.fstring()
             _id = self.guid()
             self.skip(1)
-            prop_values = []
-            for _ in range(count):
-                prop_values.append(self.struct_value(type_name, f"{path}.{prop_name}"))
+            prop_values = self.fixed_struct_values(type_name, count)
+            if prop_values is None:
+                prop_path = node.child(prop_name)
+                prop_values = [
+                    self.struct_value(type_name, prop_path) for _ in range(count)
+                ]
             value = {
                 "prop_name": prop_name,
                 "prop_type": prop_type,
@@ -620,11 +991,48 @@ class FArchiveReader:
             }
         else:
             value = {
-                "values": self.array_value(array_type, count, size, path),
+                "values": self.array_value(array_type, count, size, node),
             }
         return value
 
-    def array_value(self, array_type: str, count: int, size: int, path: str):
+    def fixed_struct_values(self, struct_type: str, count: int) -> Optional[list[Any]]:
+        """Read ``count`` fixed-size structs with a single unpack.
+
+        Returns the same values as ``struct_value`` would one at a time, or
+        None without reading anything if ``struct_type`` has no fixed layout.
+        """
+        offset = self.offset
+        if struct_type == "Guid":
+            end = offset + 16 * count
+            if end > self.size:
+                return None
+            data = self.data
+            self.offset = end
+            return [UUID(data[o : o + 16]) for o in range(offset, end, 16)]
+        layout = _FIXED_STRUCT_LAYOUTS.get(struct_type)
+        if layout is None:
+            return None
+        if not self.allow_nan and struct_type in _FLOAT_STRUCT_TYPES:
+            # Non-finite floats are replaced one at a time by float()
+            return None
+        end = offset + layout.size * count
+        if end > self.size:
+            # Read one at a time, up to where they run past the end
+            return None
+        rows = layout.iter_unpack(self.data[offset:end])
+        self.offset = end
+        if struct_type == "Vector":
+            return [{"x": x, "y": y, "z": z} for x, y, z in rows]
+        elif struct_type == "Quat":
+            return [{"x": x, "y": y, "z": z, "w": w} for x, y, z, w in rows]
+        elif struct_type == "LinearColor":
+            return [{"r": r, "g": g, "b": b, "a": a} for r, g, b, a in rows]
+        elif struct_type == "Color":
+            return [{"b": b, "g": g, "r": r, "a": a} for b, g, r, a in rows]
+        else:
+            return [row[0] for row in rows]
+
+    def array_value(self, array_type: str, count: int, size: int, path: DecodePlan):
         values = []
         decode_func: Callable
         if array_type == "EnumProperty":
@@ -718,6 +1126,443 @@ class FArchiveReader:
         }
 
 
+if _speedups is not None:
+    _speedups.setup(
+        UUID,
+        FArchiveReader._PROPERTY_DISPATCH,
+        _fstring_cache,
+        FSTRING_CACHE_MAX_LENGTH,
+        FSTRING_CACHE_SIZE,
+    )
+
+
+class UnreadProperty(NamedTuple):
+    """Location of a property value that has not been decoded yet.
+
+    ``offset`` is where the value's type-specific header starts, while
+    ``start``/``end`` span the whole serialized property after its name.
+    """
+
+    type_name: str
+    size: int
+    offset: int
+    path: DecodePlan
+    start: int
+    end: int
+
+
+class LazyProperties(MutableMapping):
+    """Property map whose values are decoded from the archive on first access.
+
+    Produced by ``LazyFArchiveReader.properties_until_end``; values are
+    cached once decoded, and nested struct values are lazy in turn.
+    """
+
+    __slots__ = ("_reader", "_values")
+
+    def __init__(self, reader: "LazyFArchiveReader", values: dict[str, Any]):
+        self._reader = reader
+        self._values = values
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._values[key]
+        if type(value) is UnreadProperty:
+            reader = self._reader.reader_at(value.offset)
+            value = reader.property(value.type_name, value.size, value.path)
+            self._values[key] = value
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._values[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        del self._values[key]
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def is_loaded(self, key: str) -> bool:
+        return type(self._values[key]) is not UnreadProperty
+
+    def raw_property(self, key: str) -> Optional[bytes]:
+        """Return the original bytes of a property that was never accessed.
+
+        Returns None once the value has been decoded or replaced, as it may
+        have been modified in place and has to be re-encoded.
+        """
+        value = self._values[key]
+        if type(value) is not UnreadProperty:
+            return None
+        return self._reader.data[value.start : value.end]
+
+    def __repr__(self) -> str:
+        return "%s.LazyProperties(%r)" % (self.__module__, self._values)
+
+
+class LazyFArchiveReader(FArchiveReader):
+    """Reader whose ``properties_until_end`` skips values instead of decoding.
+
+    Each property is recorded by offset using its serialized u64 size and
+    only decoded when looked up in the returned ``LazyProperties``. The
+    reader's buffer must stay valid for as long as the tree is in use.
+    """
+
+    def reader_at(self, offset: int) -> "LazyFArchiveReader":
+        reader = LazyFArchiveReader(
+            b"",
+            self.type_hints,
+            self.custom_properties,
+            debug=self.debug,
+            allow_nan=self.allow_nan,
+            plan=self.plan,
+        )
+        reader.data = self.data
+        reader.offset = offset
+        reader.size = self.size
+        return reader
+
+    def properties_until_end(  # type: ignore[override]
+        self, path: Union[str, DecodePlan] = ""
+    ) -> LazyProperties:
+        node = self.plan_node(path)
+        properties: dict[str, Any] = {}
+        while True:
+            name = self.fstring()
+            if name == "None":
+                break
+            start = self.offset
+            type_name = self.fstring()
+            size = self.u64()
+            offset = self.offset
+            self.skip_property(type_name, size)
+            properties[name] = UnreadProperty(
+                type_name, size, offset, node.child(name), start, self.offset
+            )
+        return LazyProperties(self, properties)
+
+
+class SelectiveFArchiveReader(FArchiveReader):
+    """Reader that only decodes the properties at (or under) the given paths.
+
+    Any sibling that is neither requested nor on the way to a requested
+    path is skipped using its serialized u64 size, so the returned tree only
+    contains the requested subtrees and the structs/containers holding them.
+    """
+
+    def __init__(self, data, paths: Sequence[str], *args, **kwargs):
+        super().__init__(data, *args, **kwargs)
+        self.paths = frozenset(paths)
+        # Property lists that are on the way to a requested path but not
+        # inside one are filtered, everything below a requested path is not
+        ancestors = {""}
+        for requested in self.paths:
+            parts = requested.split(".")
+            for i in range(2, len(parts)):
+                ancestors.add(".".join(parts[:i]))
+        self.ancestors = frozenset(
+            ancestor
+            for ancestor in ancestors
+            if not any(
+                ancestor == requested or ancestor.startswith(requested + ".")
+                for requested in self.paths
+            )
+        )
+        # Set elements are read from the root path, so inside a requested
+        # property the path alone cannot tell what to filter
+        self.inside_requested = 0
+
+    def properties_until_end(self, path: Union[str, DecodePlan] = "") -> dict[str, Any]:
+        node = self.plan_node(path)
+        if self.inside_requested or str(node) not in self.ancestors:
+            return super().properties_until_end(node)
+        properties = {}
+        while True:
+            name = self.fstring()
+            if name == "None":
+                break
+            type_name = self.fstring()
+            size = self.u64()
+            property_path = node.child(name)
+            if str(property_path) in self.paths:
+                self.inside_requested += 1
+                try:
+                    properties[name] = self.property(type_name, size, property_path)
+                finally:
+                    self.inside_requested -= 1
+            elif str(property_path) in self.ancestors:
+                properties[name] = self.property(type_name, size, property_path)
+            else:
+                self.skip_property(type_name, size)
+        return properties
+
+
+class DeferredProperty(NamedTuple):
+    """A custom property value left undecoded by DeferringFArchiveReader.
+
+    ``placeholder`` is the dict standing in for the value in the tree, and
+    ``start``/``end`` span the value's bytes after its u64 size.
+    """
+
+    placeholder: dict[str, Any]
+    type_name: str
+    size: int
+    path: str
+    start: int
+    end: int
+
+
+class DeferringFArchiveReader(FArchiveReader):
+    """Reader that skips custom property values instead of decoding them.
+
+    Each value is replaced by an empty placeholder dict and recorded in
+    ``deferred``, so the custom decoders can be run on the recorded spans
+    separately (see ``palworld_save_tools.parallel``) and their results
+    filled into the placeholders in place.
+    """
+
+    def __init__(self, data, *args, **kwargs):
+        super().__init__(data, *args, **kwargs)
+        self.deferred: list[DeferredProperty] = []
+
+    def property(
+        self,
+        type_name: str,
+        size: int,
+        path: Union[str, DecodePlan],
+        nested_caller_path: Union[str, DecodePlan] = "",
+    ) -> dict[str, Any]:
+        node = self.plan_node(path)
+        if node.custom is not None and node is not self.plan_node(nested_caller_path):
+            start = self.offset
+            self.skip_property(type_name, size)
+            placeholder: dict[str, Any] = {}
+            self.deferred.append(
+                DeferredProperty(
+                    placeholder, type_name, size, str(node), start, self.offset
+                )
+            )
+            return placeholder
+        return super().property(type_name, size, node, nested_caller_path)
+
+
+class CompactFArchiveReader(FArchiveReader):
+    """Reader building the property tree out of slotted ``nodes.Node`` objects.
+
+    Every property, map entry and Vector/Quat/color value is a node instead
+    of a dict, which takes several times less memory for a large world.
+    Nodes behave as the dicts they replace for reading, editing, writing and
+    dumping to JSON, but are not ``dict`` instances. Dicts produced by custom
+    decoders themselves are left as they are.
+    """
+
+    def internal_copy(self, data, debug: bool) -> "FArchiveReader":
+        return CompactFArchiveReader(
+            data,
+            self.type_hints,
+            self.custom_properties,
+            debug=debug,
+            allow_nan=self.allow_nan,
+            plan=self.plan,
+        )
+
+    def guid(self) -> UUID:
+        # Struct IDs are almost always zero, and share a single UUID
+        offset = self.offset
+        end = offset + 16
+        if end > self.size:
+            end = self.size
+        self.offset = end
+        raw = self.data[offset:end]
+        if raw == _ZERO_GUID_BYTES:
+            return _ZERO_GUID
+        return UUID(raw)
+
+    def _read_IntProperty(self, size, path):
+        return nodes.IntProp(self.optional_guid(), self.i32(), "IntProperty")
+
+    def _read_UInt16Property(self, size, path):
+        return nodes.IntProp(self.optional_guid(), self.u16(), "UInt16Property")
+
+    def _read_UInt32Property(self, size, path):
+        return nodes.IntProp(self.optional_guid(), self.u32(), "UInt32Property")
+
+    def _read_UInt64Property(self, size, path):
+        return nodes.IntProp(self.optional_guid(), self.u64(), "UInt64Property")
+
+    def _read_Int64Property(self, size, path):
+        return nodes.IntProp(self.optional_guid(), self.i64(), "Int64Property")
+
+    def _read_FixedPoint64Property(self, size, path):
+        return nodes.IntProp(self.optional_guid(), self.i32(), "FixedPoint64Property")
+
+    def _read_FloatProperty(self, size, path):
+        return nodes.FloatProp(self.optional_guid(), self.float(), "FloatProperty")
+
+    def _read_StrProperty(self, size, path):
+        return nodes.StrProp(self.optional_guid(), self.fstring(), "StrProperty")
+
+    def _read_NameProperty(self, size, path):
+        return nodes.StrProp(self.optional_guid(), self.fstring(), "NameProperty")
+
+    def _read_EnumProperty(self, size, path):
+        enum_type = self.fstring()
+        _id = self.optional_guid()
+        enum_value = self.fstring()
+        return nodes.EnumProp(
+            _id, nodes.EnumValue(enum_type, enum_value), "EnumProperty"
+        )
+
+    def _read_BoolProperty(self, size, path):
+        return nodes.BoolProp(self.bool(), self.optional_guid(), "BoolProperty")
+
+    def _read_ByteProperty(self, size, path):
+        enum_type = self.fstring()
+        _id = self.optional_guid()
+        if enum_type == "None":
+            enum_value = self.byte()
+        else:
+            enum_value = self.fstring()
+        return nodes.EnumProp(
+            _id, nodes.EnumValue(enum_type, enum_value), "ByteProperty"
+        )
+
+    def _read_ArrayProperty(self, size, path):
+        array_type = self.fstring()
+        return nodes.ArrayProp(
+            array_type,
+            self.optional_guid(),
+            self.array_property(array_type, size - 4, path),
+            "ArrayProperty",
+        )
+
+    def _read_MapProperty(self, size, path):
+        key_type = self.fstring()
+        value_type = self.fstring()
+        _id = self.optional_guid()
+        self.u32()
+        count = self.u32()
+        node = self.plan_node(path)
+        key_path = node.child("Key")
+        if key_type == "StructProperty":
+            key_struct_type = self.get_type_or(key_path, "Guid")
+        else:
+            key_struct_type = None
+        value_path = node.child("Value")
+        if value_type == "StructProperty":
+            value_struct_type = self.get_type_or(value_path, "StructProperty")
+        else:
+            value_struct_type = None
+        values: list[nodes.MapEntry] = []
+        for _ in range(count):
+            key = self.prop_value(key_type, key_struct_type, key_path)
+            v = self.prop_value(value_type, value_struct_type, value_path)
+            values.append(nodes.MapEntry(key, v))
+        return nodes.MapProp(
+            key_type,
+            value_type,
+            key_struct_type,
+            value_struct_type,
+            _id,
+            values,
+            "MapProperty",
+        )
+
+    def _read_SetProperty(self, size, path):
+        set_type = self.fstring()
+        _id = self.optional_guid()
+        self.u32()
+        count = self.u32()
+        return nodes.SetProp(
+            set_type,
+            _id,
+            [self.properties_until_end(self.plan) for _ in range(count)],
+            "SetProperty",
+        )
+
+    _PROPERTY_DISPATCH: dict[str, Callable] = {
+        "StructProperty": FArchiveReader._read_StructProperty,
+        "IntProperty": _read_IntProperty,
+        "UInt16Property": _read_UInt16Property,
+        "UInt32Property": _read_UInt32Property,
+        "UInt64Property": _read_UInt64Property,
+        "Int64Property": _read_Int64Property,
+        "FixedPoint64Property": _read_FixedPoint64Property,
+        "FloatProperty": _read_FloatProperty,
+        "StrProperty": _read_StrProperty,
+        "NameProperty": _read_NameProperty,
+        "EnumProperty": _read_EnumProperty,
+        "BoolProperty": _read_BoolProperty,
+        "ByteProperty": _read_ByteProperty,
+        "ArrayProperty": _read_ArrayProperty,
+        "MapProperty": _read_MapProperty,
+        "SetProperty": _read_SetProperty,
+    }
+
+    def struct(self, path: DecodePlan) -> nodes.StructProp:  # type: ignore[override]
+        struct_type = self.fstring()
+        struct_id = self.guid()
+        _id = self.optional_guid()
+        value = self.struct_value(struct_type, path)
+        return nodes.StructProp(struct_type, struct_id, _id, value, "StructProperty")
+
+    def struct_value(self, struct_type: str, path: Union[str, DecodePlan] = ""):
+        if struct_type == "LinearColor":
+            return nodes.LinearColor(
+                self.float(), self.float(), self.float(), self.float()
+            )
+        elif struct_type == "Color":
+            return nodes.Color(self.byte(), self.byte(), self.byte(), self.byte())
+        return super().struct_value(struct_type, path)
+
+    def fixed_struct_values(self, struct_type: str, count: int) -> Optional[list[Any]]:
+        node_type = _FIXED_STRUCT_NODES.get(struct_type)
+        if node_type is None:
+            return super().fixed_struct_values(struct_type, count)
+        if not self.allow_nan and struct_type in _FLOAT_STRUCT_TYPES:
+            return None
+        layout = _FIXED_STRUCT_LAYOUTS[struct_type]
+        offset = self.offset
+        end = offset + layout.size * count
+        if end > self.size:
+            # Read one at a time, up to where they run past the end
+            return None
+        rows = layout.iter_unpack(self.data[offset:end])
+        self.offset = end
+        return [node_type(*row) for row in rows]
+
+    def array_property(self, array_type: str, size: int, path):
+        value = super().array_property(array_type, size, path)
+        if array_type == "StructProperty":
+            return nodes.StructArrayValue(**value)
+        return nodes.ArrayValue(**value)
+
+    def vector_dict(self) -> nodes.Vector:  # type: ignore[override]
+        return nodes.Vector(self.double(), self.double(), self.double())
+
+    def quat_dict(self) -> nodes.Quat:  # type: ignore[override]
+        return nodes.Quat(self.double(), self.double(), self.double(), self.double())
+
+
+_ZERO_GUID_BYTES = bytes(16)
+_ZERO_GUID = UUID(_ZERO_GUID_BYTES)
+
+# Node types of the fixed-layout structs CompactFArchiveReader reads in bulk,
+# each taking its fields in serialized order
+_FIXED_STRUCT_NODES: dict[str, type[nodes.Node]] = {
+    "Vector": nodes.Vector,
+    "Quat": nodes.Quat,
+    "LinearColor": nodes.LinearColor,
+    "Color": nodes.Color,
+}
+
+
+class CompactDeferringFArchiveReader(DeferringFArchiveReader, CompactFArchiveReader):
+    """DeferringFArchiveReader building the tree out of compact nodes."""
+
+
 def uuid_writer(writer, s: Union[str, uuid.UUID, UUID]):
     if isinstance(s, str):
         s = uuid.UUID(s)
@@ -754,7 +1599,7 @@ def instance_id_writer(writer, d):
 
 
 class FArchiveWriter:
-    data: io.BytesIO
+    data: bytearray
     size: int
     custom_properties: dict[str, tuple[Callable, Callable]]
     debug: bool
@@ -764,103 +1609,109 @@ class FArchiveWriter:
         custom_properties: dict[str, tuple[Callable, Callable]] = {},
         debug: bool = os.environ.get("DEBUG", "0") == "1",
     ):
-        self.data = io.BytesIO()
+        # Appended to in a single pass; sizes that are only known after a
+        # value has been written are patched in place with pack_into
+        self.data = bytearray()
         self.custom_properties = custom_properties
         self.debug = debug
 
     def __enter__(self):
-        self.data.seek(0)
         return self
 
     def __exit__(self, type, value, traceback):
-        self.data.close()
+        pass
 
     def copy(self) -> "FArchiveWriter":
         return FArchiveWriter(self.custom_properties)
 
     def bytes(self) -> bytes:
-        pos = self.data.tell()
-        self.data.seek(0)
-        b = self.data.read()
-        self.data.seek(pos)
-        return b
+        return _bytes(self.data)
+
+    def buffer(self) -> bytearray:
+        """Return the written data without copying it.
+
+        The buffer is shared with the writer, so it should only be used once
+        writing has finished.
+        """
+        return self.data
 
     def write(self, data: _bytes):
-        self.data.write(data)
+        self.data += data
 
     _pack_bool = struct.Struct("?").pack
 
     def bool(self, bool: bool):
-        self.data.write(FArchiveWriter._pack_bool(bool))
+        self.data += FArchiveWriter._pack_bool(bool)
 
     def fstring(self, string: str) -> int:
-        start = self.data.tell()
+        start = len(self.data)
         if string == "":
             self.i32(0)
         elif string.isascii():
             str_bytes = string.encode("ascii")
             self.i32(len(str_bytes) + 1)
-            self.data.write(str_bytes)
-            self.data.write(b"\x00")
+            self.data += str_bytes
+            self.data += b"\x00"
         else:
             str_bytes = string.encode("utf-16-le", errors="surrogatepass")
             assert len(str_bytes) % 2 == 0
             self.i32(-((len(str_bytes) // 2) + 1))
-            self.data.write(str_bytes)
-            self.data.write(b"\x00\x00")
-        return self.data.tell() - start
+            self.data += str_bytes
+            self.data += b"\x00\x00"
+        return len(self.data) - start
 
     _pack_i16 = struct.Struct("h").pack
 
     def i16(self, i: int):
-        self.data.write(FArchiveWriter._pack_i16(i))
+        self.data += FArchiveWriter._pack_i16(i)
 
     _pack_u16 = struct.Struct("H").pack
 
     def u16(self, i: int):
-        self.data.write(FArchiveWriter._pack_u16(i))
+        self.data += FArchiveWriter._pack_u16(i)
 
     _pack_i32 = struct.Struct("i").pack
 
     def i32(self, i: int):
-        self.data.write(FArchiveWriter._pack_i32(i))
+        self.data += FArchiveWriter._pack_i32(i)
 
     _pack_u32 = struct.Struct("I").pack
 
     def u32(self, i: int):
-        self.data.write(FArchiveWriter._pack_u32(i))
+        self.data += FArchiveWriter._pack_u32(i)
 
     _pack_i64 = struct.Struct("q").pack
 
     def i64(self, i: int):
-        self.data.write(FArchiveWriter._pack_i64(i))
+        self.data += FArchiveWriter._pack_i64(i)
 
     _pack_u64 = struct.Struct("Q").pack
+    _pack_u64_into = struct.Struct("Q").pack_into
 
     def u64(self, i: int):
-        self.data.write(FArchiveWriter._pack_u64(i))
+        self.data += FArchiveWriter._pack_u64(i)
 
     _pack_float = struct.Struct("f").pack
 
     def float(self, i: Optional[float]):
         if i is None:
             i = float("nan")
-        self.data.write(FArchiveWriter._pack_float(i))
+        self.data += FArchiveWriter._pack_float(i)
 
     _pack_double = struct.Struct("d").pack
 
     def double(self, i: Optional[_float]):
         if i is None:
             i = float("nan")
-        self.data.write(FArchiveWriter._pack_double(i))
+        self.data += FArchiveWriter._pack_double(i)
 
     _pack_byte = struct.Struct("B").pack
 
     def byte(self, b: int):
-        self.data.write(FArchiveWriter._pack_byte(b))
+        self.data += FArchiveWriter._pack_byte(b)
 
     def u(self, b: int):
-        self.data.write(FArchiveWriter._pack_byte(b))
+        self.data += FArchiveWriter._pack_byte(b)
 
     def guid(self, u: Union[str, uuid.UUID, UUID]):
         uuid_writer(self, u)
@@ -880,9 +1731,21 @@ class FArchiveWriter:
             type_writer(self, array[i])
 
     def properties(self, properties: dict[str, Any]):
-        for key in properties:
-            self.fstring(key)
-            self.property(properties[key])
+        if type(properties) is LazyProperties:
+            # Properties never accessed since a lazy read are copied verbatim
+            for key in properties:
+                self.fstring(key)
+                raw = properties.raw_property(key)
+                if raw is None:
+                    self.property(properties[key])
+                else:
+                    self.data += raw
+        elif _speedups is not None and not self.debug and type(properties) is dict:
+            _speedups.write_properties(self, properties)
+        else:
+            for key in properties:
+                self.fstring(key)
+                self.property(properties[key])
         self.fstring("None")
 
     def property(self, property: dict[str, Any]):
@@ -890,13 +1753,10 @@ class FArchiveWriter:
         self.fstring(property["type"])
         property_type = property["type"]
         # reserve 8 bytes for the u64 size, patch once we know it
-        size_pos = self.data.tell()
-        self.data.write(b"\x00" * 8)
+        size_pos = len(self.data)
+        self.data += _SIZE_PLACEHOLDER
         size = self.property_inner(property_type, property)
-        end_pos = self.data.tell()
-        self.data.seek(size_pos)
-        self.data.write(FArchiveWriter._pack_u64(size))
-        self.data.seek(end_pos)
+        FArchiveWriter._pack_u64_into(self.data, size_pos, size)
 
     def _write_StructProperty(self, property):
         return self.struct(property)
@@ -965,15 +1825,15 @@ class FArchiveWriter:
     def _write_ArrayProperty(self, property):
         self.fstring(property["array_type"])
         self.optional_guid(property.get("id", None))
-        start = self.data.tell()
+        start = len(self.data)
         self.array_property(property["array_type"], property["value"])
-        return self.data.tell() - start
+        return len(self.data) - start
 
     def _write_MapProperty(self, property):
         self.fstring(property["key_type"])
         self.fstring(property["value_type"])
         self.optional_guid(property.get("id", None))
-        start = self.data.tell()
+        start = len(self.data)
         self.u32(0)
         self.u32(len(property["value"]))
         for entry in property["value"]:
@@ -985,17 +1845,17 @@ class FArchiveWriter:
                 property["value_struct_type"],
                 entry["value"],
             )
-        return self.data.tell() - start
+        return len(self.data) - start
 
     def _write_SetProperty(self, property):
         self.fstring(property["set_type"])
         self.optional_guid(property.get("id", None))
-        start = self.data.tell()
+        start = len(self.data)
         self.u32(0)
         self.u32(len(property["value"]))
         for element in property["value"]:
             self.properties(element)
-        return self.data.tell() - start
+        return len(self.data) - start
 
     _PROPERTY_DISPATCH: dict[str, Callable] = {
         "StructProperty": _write_StructProperty,
@@ -1016,7 +1876,7 @@ class FArchiveWriter:
         "SetProperty": _write_SetProperty,
     }
 
-    def property_inner(self, property_type: str, property: dict[str, Any]) -> int:
+    def property_inner(self, property_type: str, property: Mapping[str, Any]) -> int:
         if "custom_type" in property:
             custom = self.custom_properties.get(property["custom_type"])
             if custom is None:
@@ -1033,9 +1893,9 @@ class FArchiveWriter:
         self.fstring(property["struct_type"])
         self.guid(property["struct_id"])
         self.optional_guid(property.get("id", None))
-        start = self.data.tell()
+        start = len(self.data)
         self.struct_value(property["struct_type"], property["value"])
-        return self.data.tell() - start
+        return len(self.data) - start
 
     def struct_value(self, struct_type: str, value):
         if struct_type == "Vector":
@@ -1086,22 +1946,24 @@ class FArchiveWriter:
             self.fstring(value["prop_name"])
             self.fstring(value["prop_type"])
             # Reserve the u64 size; we know the length only after writing the body
-            size_pos = self.data.tell()
-            self.data.write(b"\x00" * 8)
+            size_pos = len(self.data)
+            self.data += _SIZE_PLACEHOLDER
             self.fstring(value["type_name"])
             self.guid(value["id"])
             self.u(0)
-            data_start = self.data.tell()
-            for i in range(count):
-                self.struct_value(value["type_name"], value["values"][i])
-            end_pos = self.data.tell()
-            self.data.seek(size_pos)
-            self.data.write(FArchiveWriter._pack_u64(end_pos - data_start))
-            self.data.seek(end_pos)
+            data_start = len(self.data)
+            if not self.fixed_struct_values(value["type_name"], value["values"]):
+                for i in range(count):
+                    self.struct_value(value["type_name"], value["values"][i])
+            FArchiveWriter._pack_u64_into(
+                self.data, size_pos, len(self.data) - data_start
+            )
         elif array_type == "ByteProperty":
             # Fast path: raw byte blob. Values may be bytes (fresh parse),
             # str (base64 from JSON), or list[int] (legacy JSON).
-            buf = coerce_bytes(value["values"])
+            buf = value["values"]
+            if not isinstance(buf, (bytes, bytearray)):
+                buf = coerce_bytes(buf)
             self.u32(len(buf))
             self.write(buf)
         else:
@@ -1109,6 +1971,36 @@ class FArchiveWriter:
             self.u32(count)
             self.array_value(array_type, count, value["values"])
 
+    def fixed_struct_values(self, struct_type: str, values: list[Any]):
+        """Write fixed-size structs with a single pack.
+
+        Returns False without writing anything if ``struct_type`` has no fixed
+        layout or a value needs converting first (GUID strings, or None in
+        place of NaN) or does not fit its field, in which case they should be
+        written one at a time.
+        """
+        try:
+            if struct_type == "Guid":
+                self.data += b"".join([v.raw_bytes for v in values])
+                return True
+            typecode = _FIXED_STRUCT_TYPECODES.get(struct_type)
+            if typecode is None:
+                return False
+            if struct_type == "Vector":
+                fields = [c for v in values for c in (v["x"], v["y"], v["z"])]
+            elif struct_type == "Quat":
+                fields = [c for v in values for c in (v["x"], v["y"], v["z"], v["w"])]
+            elif struct_type == "LinearColor":
+                fields = [c for v in values for c in (v["r"], v["g"], v["b"], v["a"])]
+            elif struct_type == "Color":
+                fields = [c for v in values for c in (v["b"], v["g"], v["r"], v["a"])]
+            else:
+                fields = values
+            self.data += array.array(typecode, fields).tobytes()
+        except (AttributeError, TypeError, OverflowError):
+            return False
+        return True
+
     def array_value(self, array_type: str, count: int, values: list[Any]):
         for i in range(count):
             if array_type == "IntProperty":
@@ -1241,3 +2133,29 @@ class FArchiveWriter:
         self.quat_dict(value["rotation"])
         self.vector_dict(value["translation"])
         self.vector_dict(value["scale3d"])
+
+
+class PreencodedFArchiveWriter(FArchiveWriter):
+    """Writer that copies custom property values encoded ahead of time.
+
+    ``preencoded`` maps ``id()`` of a custom property dict in the tree being
+    written to the bytes its encoder produced and the size it returned (see
+    ``palworld_save_tools.parallel``); any other property is encoded as usual.
+    """
+
+    def __init__(
+        self,
+        preencoded: dict[int, tuple[bytes, int]],
+        *args,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self.preencoded = preencoded
+
+    def property_inner(self, property_type: str, property: Mapping[str, Any]) -> int:
+        encoded = self.preencoded.get(id(property))
+        if encoded is None:
+            return super().property_inner(property_type, property)
+        data, size = encoded
+        self.data += data
+        return size
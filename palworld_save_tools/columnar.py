@@ -0,0 +1,248 @@
+from collections.abc import Mapping, MutableMapping
+from typing import Any, Optional
+
+try:
+    import numpy
+except ImportError:
+    numpy = None  # type: ignore[assignment]
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None  # type: ignore[assignment]
+
+# Column name to type of every exported table. Values the save omits (it only
+# stores properties that differ from their defaults) are exported as 0, an
+# empty string or False.
+TABLE_SCHEMAS: dict[str, dict[str, str]] = {
+    "characters": {
+        "instance_id": "str",
+        "player_uid": "str",
+        "is_player": "bool",
+        "character_id": "str",
+        "nickname": "str",
+        "gender": "str",
+        "level": "int64",
+        "exp": "int64",
+        "hp": "int64",
+        "owner_player_uid": "str",
+        "group_id": "str",
+        "talent_hp": "int64",
+        "talent_melee": "int64",
+        "talent_shot": "int64",
+        "talent_defense": "int64",
+    },
+    "items": {
+        "container_id": "str",
+        "group_id": "str",
+        "slot_index": "int64",
+        "static_id": "str",
+        "count": "int64",
+        "created_world_id": "str",
+        "local_id_in_created_world": "str",
+    },
+    "groups": {
+        "group_id": "str",
+        "group_type": "str",
+        "group_name": "str",
+        "guild_name": "str",
+        "admin_player_uid": "str",
+        "base_camp_level": "int64",
+        "character_count": "int64",
+        "player_count": "int64",
+    },
+}
+
+# The properties export_tables reads, for GvasFile.extract
+TABLE_PATHS = [
+    ".worldSaveData.CharacterSaveParameterMap",
+    ".worldSaveData.ItemContainerSaveData",
+    ".worldSaveData.GroupSaveDataMap",
+]
+
+# Custom properties the RawData columns are read from
+TABLE_CUSTOM_PROPERTIES = [
+    ".worldSaveData.CharacterSaveParameterMap.Value.RawData",
+    ".worldSaveData.ItemContainerSaveData.Value.Slots.Slots.RawData",
+    ".worldSaveData.GroupSaveDataMap",
+]
+
+_DEFAULTS = {"str": "", "int64": 0, "float64": 0.0, "bool": False}
+
+
+def property_value(properties: Optional[Mapping], *names: str) -> Any:
+    """Follow ``names`` through nested property values, or None if missing."""
+    value: Any = properties
+    for name in names:
+        if not isinstance(value, Mapping) or name not in value:
+            return None
+        value = value[name]["value"]
+    return value
+
+
+def _enum(properties: Optional[Mapping], name: str) -> Optional[str]:
+    value = property_value(properties, name)
+    return value["value"] if value is not None else None
+
+
+def _str(value: Any) -> Optional[str]:
+    return str(value) if value is not None else None
+
+
+def decoded_raw_data(raw_data: Any) -> Optional[MutableMapping]:
+    """RawData decoded by a custom property, or None if it is still bytes."""
+    if isinstance(raw_data, MutableMapping) and "values" not in raw_data:
+        return raw_data
+    return None
+
+
+def belong_group_id(belong_info: Optional[Mapping]) -> Any:
+    """The group an item container belongs to, or None if missing."""
+    # Older saves spell it GroupId
+    group_id = property_value(belong_info, "GroupID")
+    return group_id or property_value(belong_info, "GroupId")
+
+
+def _character_rows(world: Mapping):
+    for entry in property_value(world, "CharacterSaveParameterMap") or []:
+        raw = decoded_raw_data(property_value(entry["value"], "RawData"))
+        params = property_value(raw["object"], "SaveParameter") if raw else None
+        yield {
+            "instance_id": _str(property_value(entry["key"], "InstanceId")),
+            "player_uid": _str(property_value(entry["key"], "PlayerUId")),
+            "is_player": property_value(params, "IsPlayer"),
+            "character_id": property_value(params, "CharacterID"),
+            "nickname": property_value(params, "NickName"),
+            "gender": _enum(params, "Gender"),
+            "level": property_value(params, "Level"),
+            "exp": property_value(params, "Exp"),
+            "hp": property_value(params, "HP", "Value"),
+            "owner_player_uid": _str(property_value(params, "OwnerPlayerUId")),
+            "group_id": _str(raw["group_id"]) if raw else None,
+            "talent_hp": property_value(params, "Talent_HP"),
+            "talent_melee": property_value(params, "Talent_Melee"),
+            "talent_shot": property_value(params, "Talent_Shot"),
+            "talent_defense": property_value(params, "Talent_Defense"),
+        }
+
+
+def _slot_row(slot: Mapping) -> dict[str, Any]:
+    # Older saves store the slot as properties next to a RawData blob in
+    # another layout, current ones only in the decoded RawData
+    raw = decoded_raw_data(property_value(slot, "RawData"))
+    if "ItemId" in slot or raw is None:
+        dynamic_id = property_value(slot, "ItemId", "DynamicId")
+        return {
+            "slot_index": property_value(slot, "SlotIndex"),
+            "static_id": property_value(slot, "ItemId", "StaticId"),
+            "count": property_value(slot, "StackCount"),
+            "created_world_id": _str(property_value(dynamic_id, "CreatedWorldId")),
+            "local_id_in_created_world": _str(
+                property_value(dynamic_id, "LocalIdInCreatedWorld")
+            ),
+        }
+    item = raw["item"]
+    return {
+        "slot_index": raw["slot_index"],
+        "static_id": item["static_id"],
+        "count": raw["count"],
+        "created_world_id": _str(item["dynamic_id"]["created_world_id"]),
+        "local_id_in_created_world": _str(
+            item["dynamic_id"]["local_id_in_created_world"]
+        ),
+    }
+
+
+def _item_rows(world: Mapping):
+    for entry in property_value(world, "ItemContainerSaveData") or []:
+        container_id = _str(property_value(entry["key"], "ID"))
+        group_id = belong_group_id(property_value(entry["value"], "BelongInfo"))
+        slots = property_value(entry["value"], "Slots")
+        for slot in slots["values"] if slots else []:
+            yield {
+                "container_id": container_id,
+                "group_id": _str(group_id),
+                **_slot_row(slot),
+            }
+
+
+def _group_rows(world: Mapping):
+    for entry in property_value(world, "GroupSaveDataMap") or []:
+        raw = decoded_raw_data(property_value(entry["value"], "RawData")) or {}
+        yield {
+            "group_id": _str(entry["key"]),
+            "group_type": _enum(entry["value"], "GroupType"),
+            "group_name": raw.get("group_name"),
+            "guild_name": raw.get("guild_name"),
+            "admin_player_uid": _str(raw.get("admin_player_uid")),
+            "base_camp_level": raw.get("base_camp_level"),
+            "character_count": len(raw.get("individual_character_handle_ids", [])),
+            "player_count": len(raw.get("players", [])),
+        }
+
+
+_TABLE_ROWS = {
+    "characters": _character_rows,
+    "items": _item_rows,
+    "groups": _group_rows,
+}
+
+
+def export_tables(properties: Mapping) -> dict[str, dict[str, list]]:
+    """Flatten characters, item slots and groups into columns of plain values.
+
+    ``properties`` is ``GvasFile.properties`` of a Level.sav. Columns taken
+    from RawData are only filled in when the custom properties in
+    ``TABLE_CUSTOM_PROPERTIES`` were decoded. GUIDs are exported as strings.
+    """
+    world = property_value(properties, "worldSaveData") or {}
+    tables = {}
+    for table, rows in _TABLE_ROWS.items():
+        schema = TABLE_SCHEMAS[table]
+        columns: dict[str, list] = {name: [] for name in schema}
+        for row in rows(world):
+            for name, column_type in schema.items():
+                value = row[name]
+                columns[name].append(_DEFAULTS[column_type] if value is None else value)
+        tables[table] = columns
+    return tables
+
+
+def to_numpy(tables: dict[str, dict[str, list]]) -> dict[str, dict[str, Any]]:
+    """Convert the columns from ``export_tables`` to NumPy arrays."""
+    if numpy is None:
+        raise ImportError("numpy is required for NumPy export")
+    dtypes = {
+        "str": numpy.str_,
+        "int64": numpy.int64,
+        "float64": numpy.float64,
+        "bool": numpy.bool_,
+    }
+    return {
+        table: {
+            name: numpy.array(column, dtype=dtypes[TABLE_SCHEMAS[table][name]])
+            for name, column in columns.items()
+        }
+        for table, columns in tables.items()
+    }
+
+
+def to_arrow(tables: dict[str, dict[str, list]]) -> dict[str, Any]:
+    """Convert the columns from ``export_tables`` to ``pyarrow.Table``s."""
+    if pyarrow is None:
+        raise ImportError("pyarrow is required for Arrow export")
+    types = {
+        "str": pyarrow.string(),
+        "int64": pyarrow.int64(),
+        "float64": pyarrow.float64(),
+        "bool": pyarrow.bool_(),
+    }
+    return {
+        table: pyarrow.table(
+            {
+                name: pyarrow.array(column, type=types[TABLE_SCHEMAS[table][name]])
+                for name, column in columns.items()
+            }
+        )
+        for table, columns in tables.items()
+    }
@@ -1,4 +1,5 @@
 from . import (
     convert,
+    export,
     resave_test
 )
\ No newline at end of file
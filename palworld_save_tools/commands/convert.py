@@ -3,6 +3,7 @@
 import argparse
 import contextlib
 import gc
+import mmap
 import sys
 import time
 import os
@@ -27,15 +28,59 @@ def _gc_paused():
         if was_enabled:
             gc.enable()
             gc.collect()
+
+
+from palworld_save_tools.compressor.oozlib import OodleCompressor, OodleLevel
 from palworld_save_tools.gvas import GvasFile
-from palworld_save_tools import json_tools
-from palworld_save_tools.palsav import compress_gvas_to_sav, decompress_sav_to_gvas
+from palworld_save_tools import json_tools, pickle_tools
+from palworld_save_tools.palsav import compress_gvas_to_sav, decompress_sav_file
 from palworld_save_tools.paltypes import (
     DISABLED_PROPERTIES,
     PALWORLD_CUSTOM_PROPERTIES,
     PALWORLD_TYPE_HINTS,
 )
 
+# Decompressed GVAS size above which JSON is streamed to disk instead of being
+# built in memory first; the JSON text is typically several times larger
+STREAM_JSON_GVAS_SIZE = 64 * 1024 * 1024
+
+OODLE_COMPRESSORS = {
+    "kraken": OodleCompressor.Kraken,
+    "mermaid": OodleCompressor.Mermaid,
+    "selkie": OodleCompressor.Selkie,
+    "leviathan": OodleCompressor.Leviathan,
+}
+
+# Intermediate formats SAV files can be converted to and from, by extension
+FORMATS = {
+    "json": json_tools,
+    "pickle": pickle_tools,
+}
+
+
+def parse_compression_level(value: str, library: str) -> int:
+    """Parse a compression level valid for ``library``.
+
+    zlib takes 0-9, libooz an Oodle level given either as a number (-4 to 9)
+    or an OodleLevel name.
+    """
+    if library == "zlib":
+        if value.isdigit() and int(value) <= 9:
+            return int(value)
+        raise argparse.ArgumentTypeError(
+            f"invalid zlib compression level: {value} (expected 0-9)"
+        )
+    try:
+        level = int(value)
+    except ValueError:
+        for name in vars(OodleLevel):
+            if not name.startswith("_") and name.lower() == value.lower():
+                return getattr(OodleLevel, name)
+    else:
+        if -4 <= level <= 9:
+            return level
+    raise argparse.ArgumentTypeError(f"invalid Oodle compression level: {value}")
+
 
 def main():
     parser = argparse.ArgumentParser(
@@ -58,6 +103,12 @@ def main():
         "-o",
         help="Output file (default: <filename>.json or <filename>.sav)",
     )
+    parser.add_argument(
+        "--format",
+        choices=list(FORMATS),
+        default=None,
+        help="Intermediate format to convert SAV files to or from. 'pickle' is a compact binary format that stores bytes, GUIDs and NaN/Inf as-is; it is much smaller and faster to convert back to SAV than JSON, but can only be read by these tools (default: json, or from the file extension)",
+    )
     parser.add_argument(
         "--force",
         "-f",
@@ -71,6 +122,39 @@ def main():
         default="libooz",
         help="Compression library used to convert JSON files to SAV files. 'zlib' for zlib compression, 'libooz' for libooz compression (default: libooz)",
     )
+    parser.add_argument(
+        "--compression-level",
+        default=None,
+        help="Compression level used when converting JSON files to SAV files. 0-9 for zlib, or an Oodle level (-4 to 9, or a name such as HyperFast1, SuperFast, Normal, Optimal2) for libooz. World saves are always compressed with zlib (default: the library's default)",
+    )
+    parser.add_argument(
+        "--oodle-compressor",
+        choices=list(OODLE_COMPRESSORS),
+        default=None,
+        help="Oodle compressor used when converting JSON files to SAV files with libooz (default: mermaid)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of processes used to decode or encode custom properties, 0 to use every core (default: 1)",
+    )
+    parser.add_argument(
+        "--compress-threads",
+        type=int,
+        default=1,
+        help="Number of threads used for zlib compression when converting JSON files to SAV files, 0 to use every core (default: 1)",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Read the SAV file into compact node objects instead of dicts, to reduce memory use on large saves (SAV to JSON only)",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Encode the JSON straight into the SAV file as it is parsed instead of loading the whole document first, to reduce memory use on large saves (JSON to SAV only)",
+    )
     parser.add_argument(
         "--convert-nan-to-null",
         action="store_true",
@@ -82,6 +166,12 @@ def main():
         type=lambda t: [s.strip() for s in t.split(",")],
         help="Comma-separated list of custom properties to decode, or 'all' for all known properties. This can be used to speed up processing by excluding properties that are not of interest. (default: all)",
     )
+    parser.add_argument(
+        "--only",
+        action="append",
+        metavar="PATH",
+        help="Only read the property at this path (e.g. .worldSaveData.GroupSaveDataMap) when converting SAV to JSON, skipping the rest of the save. Can be given multiple times. The output cannot be converted back to SAV",
+    )
 
     parser.add_argument("--minify-json", action="store_true", help="Minify JSON output")
     parser.add_argument("--raw", action="store_true", help="Output raw GVAS file")
@@ -90,6 +180,15 @@ def main():
         "--debug-log", action="store_true", help="Enable debug logging to file"
     )
     args = parser.parse_args()
+    if args.library == "zlib" and args.oodle_compressor is not None:
+        parser.error("argument --oodle-compressor: not allowed with --library zlib")
+    if args.compression_level is not None:
+        # With libooz, world saves are still compressed with zlib, so the level
+        # is only checked against the codec once the save type is known
+        try:
+            parse_compression_level(args.compression_level, args.library)
+        except argparse.ArgumentTypeError as e:
+            parser.error(f"argument --compression-level: {e}")
 
     if args.debug:
         logger.remove()
@@ -125,9 +224,19 @@ def main():
         logger.error(f"{args.filename} is not a file")
         exit(1)
 
+    input_format = args.format
+    if input_format is None:
+        input_format = next(
+            (name for name in FORMATS if args.filename.endswith(f".{name}")), "json"
+        )
+    if args.stream and input_format != "json":
+        logger.error("--stream is only supported for JSON input")
+        exit(1)
+
     if args.to_json or args.filename.endswith(".sav"):
+        output_format = args.format or "json"
         if not args.output:
-            output_path = args.filename + ".json"
+            output_path = f"{args.filename}.{output_format}"
         else:
             output_path = args.output
         convert_sav_to_json(
@@ -138,15 +247,32 @@ def main():
             allow_nan=(not args.convert_nan_to_null),
             custom_properties_keys=args.custom_properties,
             raw=args.raw,
+            only_paths=args.only,
+            output_format=output_format,
+            workers=args.workers,
+            compact=args.compact,
         )
 
-    if args.from_json or args.filename.endswith(".json"):
+    if args.from_json or any(args.filename.endswith(f".{name}") for name in FORMATS):
         if not args.output:
-            output_path = args.filename.replace(".json", "")
+            output_path = args.filename.replace(f".{input_format}", "")
         else:
             output_path = args.output
         convert_json_to_sav(
-            args.filename, output_path, force=args.force, zlib=(args.library == "zlib")
+            args.filename,
+            output_path,
+            force=args.force,
+            zlib=(args.library == "zlib"),
+            compression_level=args.compression_level,
+            workers=args.workers,
+            compress_threads=args.compress_threads,
+            oodle_compressor=(
+                OODLE_COMPRESSORS[args.oodle_compressor]
+                if args.oodle_compressor is not None
+                else None
+            ),
+            stream=args.stream,
+            input_format=input_format,
         )
 
 
@@ -158,26 +284,20 @@ def convert_sav_to_json(
     allow_nan=True,
     custom_properties_keys=["all"],
     raw=False,
+    only_paths=None,
+    output_format="json",
+    workers=1,
+    compact=False,
 ):
     start_time = time.perf_counter()
-    logger.info(f"Converting {filename} to JSON, saving to {output_path}")
+    logger.info(
+        f"Converting {filename} to {output_format.upper()}, saving to {output_path}"
+    )
     if os.path.exists(output_path):
         logger.debug(f"{output_path} already exists, this will overwrite the file")
         if not force:
             if not confirm_prompt("Are you sure you want to continue?"):
                 exit(1)
-    logger.info("Decompressing sav file")
-    with open(filename, "rb") as f:
-        data = f.read()
-        raw_gvas, _ = decompress_sav_to_gvas(data)
-    if raw:
-        output_dir = os.path.dirname(output_path)
-        output_file = f"{os.path.basename(output_path)}.bin"
-        output_file_path = f"{output_dir}\\{output_file}" if raw else None
-        logger.info(f"Writing raw GVAS file to {output_file_path}")
-        with open(output_file_path, "wb") as f:
-            f.write(raw_gvas)
-    logger.info("Loading GVAS file")
     custom_properties = {}
     if len(custom_properties_keys) > 0 and custom_properties_keys[0] == "all":
         custom_properties = PALWORLD_CUSTOM_PROPERTIES
@@ -185,48 +305,121 @@ def convert_sav_to_json(
         for prop in PALWORLD_CUSTOM_PROPERTIES:
             if prop in custom_properties_keys:
                 custom_properties[prop] = PALWORLD_CUSTOM_PROPERTIES[prop]
-    with _gc_paused():
-        gvas_file = GvasFile.read(
-            raw_gvas, PALWORLD_TYPE_HINTS, custom_properties, allow_nan=allow_nan
-        )
+    logger.info("Decompressing sav file")
+    raw_gvas, _ = decompress_sav_file(filename)
+    try:
+        if raw:
+            output_dir = os.path.dirname(output_path)
+            output_file = f"{os.path.basename(output_path)}.bin"
+            output_file_path = f"{output_dir}\\{output_file}" if raw else None
+            logger.info(f"Writing raw GVAS file to {output_file_path}")
+            with open(output_file_path, "wb") as f:
+                f.write(raw_gvas)
+        logger.info("Loading GVAS file")
+        with _gc_paused():
+            if only_paths:
+                logger.info(f"Only reading {', '.join(only_paths)}")
+                gvas_file = GvasFile.extract(
+                    raw_gvas,
+                    only_paths,
+                    PALWORLD_TYPE_HINTS,
+                    custom_properties,
+                    allow_nan=allow_nan,
+                )
+            else:
+                gvas_file = GvasFile.read(
+                    raw_gvas,
+                    PALWORLD_TYPE_HINTS,
+                    custom_properties,
+                    allow_nan=allow_nan,
+                    workers=workers,
+                    compact=compact,
+                )
+        stream_json = len(raw_gvas) >= STREAM_JSON_GVAS_SIZE
+    finally:
+        # The parsed tree holds no references into the decompressed buffer
+        if isinstance(raw_gvas, mmap.mmap):
+            raw_gvas.close()
     gvas_parse_time = time.perf_counter()
     logger.info(f"GVAS file loaded in {gvas_parse_time - start_time:.2f} seconds")
-    logger.info(f"Writing JSON to {output_path}")
+    logger.info(f"Writing {output_format.upper()} to {output_path}")
     write_start_time = time.perf_counter()
     with _gc_paused():
-        json_tools.dump(
-            gvas_file.dump(), output_path, minify=minify, allow_nan=allow_nan
-        )
+        if output_format == "json":
+            dump = json_tools.dump_stream if stream_json else json_tools.dump
+            dump(gvas_file.dump(), output_path, minify=minify, allow_nan=allow_nan)
+        else:
+            FORMATS[output_format].dump(gvas_file.dump(), output_path)
     write_end_time = time.perf_counter()
-    logger.info(f"JSON written in {write_end_time - write_start_time:.2f} seconds")
+    logger.info(
+        f"{output_format.upper()} written in {write_end_time - write_start_time:.2f} seconds"
+    )
     end_time = time.perf_counter()
     logger.info(f"Conversion took {end_time - start_time:.2f} seconds")
 
 
-def convert_json_to_sav(filename, output_path, force=False, zlib=False):
+def convert_json_to_sav(
+    filename,
+    output_path,
+    force=False,
+    zlib=False,
+    compression_level=None,
+    workers=1,
+    compress_threads=1,
+    oodle_compressor=None,
+    stream=False,
+    input_format="json",
+):
     logger.info(f"Converting {filename} to SAV, saving to {output_path}")
     if os.path.exists(output_path):
         logger.debug(f"{output_path} already exists, this will overwrite the file")
         if not force:
             if not confirm_prompt("Are you sure you want to continue?"):
                 exit(1)
-    logger.info(f"Loading JSON from {filename}")
-    with _gc_paused():
-        data = json_tools.load(filename)
-        gvas_file = GvasFile.load(data)
+    if stream:
+        logger.info(f"Streaming JSON from {filename}")
+        with _gc_paused():
+            header, written = json_tools.load_gvas_stream(
+                filename, PALWORLD_CUSTOM_PROPERTIES
+            )
+    else:
+        logger.info(f"Loading {input_format.upper()} from {filename}")
+        with _gc_paused():
+            data = FORMATS[input_format].load(filename)
+            gvas_file = GvasFile.load(data)
+            del data
+            written = gvas_file.write(PALWORLD_CUSTOM_PROPERTIES, workers=workers)
+        header = gvas_file.header
+        del gvas_file
     logger.info("Compressing SAV file")
     if (
-        "Pal.PalWorldSaveGame" in gvas_file.header.save_game_class_name
-        or "Pal.PalLocalWorldSaveGame" in gvas_file.header.save_game_class_name
+        "Pal.PalWorldSaveGame" in header.save_game_class_name
+        or "Pal.PalLocalWorldSaveGame" in header.save_game_class_name
     ):
         save_type = 0x32
     else:
         save_type = 0x31
     if zlib:
         save_type = 0x32  # Use double zlib compression
-    with _gc_paused():
-        written = gvas_file.write(PALWORLD_CUSTOM_PROPERTIES)
-    sav_file = compress_gvas_to_sav(written, save_type)
+    library = "zlib" if save_type == 0x32 else "libooz"
+    level = None
+    if compression_level is not None:
+        try:
+            level = parse_compression_level(str(compression_level), library)
+        except argparse.ArgumentTypeError as e:
+            logger.error(f"{e}, {header.save_game_class_name} saves use {library}")
+            exit(1)
+    if library == "zlib" and oodle_compressor is not None:
+        logger.warning(
+            f"Ignoring the Oodle compressor, {header.save_game_class_name} saves use zlib"
+        )
+    sav_file = compress_gvas_to_sav(
+        written,
+        save_type,
+        level=level,
+        workers=compress_threads,
+        oodle_compressor=oodle_compressor,
+    )
     logger.info(f"Writing SAV file to {output_path}")
     with open(output_path, "wb") as f:
         f.write(sav_file)
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# Exports characters, item slots and groups from a Level.sav as columnar tables
+# Usage: export.py <Level.sav> [--output DIR] [--format parquet|npz|csv]
+
+import argparse
+import csv
+import mmap
+import os
+import sys
+from typing import Sequence
+
+from loguru import logger
+from palworld_save_tools import columnar
+from palworld_save_tools.gvas import GvasFile
+from palworld_save_tools.palsav import decompress_sav_file
+from palworld_save_tools.paltypes import PALWORLD_CUSTOM_PROPERTIES, PALWORLD_TYPE_HINTS
+
+
+def default_format() -> str:
+    if columnar.pyarrow is not None:
+        return "parquet"
+    if columnar.numpy is not None:
+        return "npz"
+    return "csv"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="palworld-save-tools-export",
+        description="Exports characters, item slots and groups from a Level.sav as columnar tables",
+    )
+    parser.add_argument("filename")
+    parser.add_argument(
+        "--output",
+        "-o",
+        help="Output directory, one file per table (default: <filename>.tables)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["parquet", "npz", "csv"],
+        default=default_format(),
+        help="'parquet' needs pyarrow, 'npz' needs numpy (default: parquet if pyarrow is installed, else npz if numpy is, else csv)",
+    )
+    parser.add_argument(
+        "--custom-properties",
+        default=",".join(columnar.TABLE_CUSTOM_PROPERTIES),
+        type=lambda t: [s.strip() for s in t.split(",") if s.strip()],
+        help="Comma-separated list of custom properties to decode the RawData columns from. Leave out the ones that do not match an older save's version (default: all of columnar.TABLE_CUSTOM_PROPERTIES)",
+    )
+    args = parser.parse_args()
+    for path in args.custom_properties:
+        if path not in PALWORLD_CUSTOM_PROPERTIES:
+            parser.error(f"argument --custom-properties: unknown property {path}")
+
+    logger.remove()
+    logger.add(sys.stdout, format="<level>{level}</level> 🡆 {message}", level="INFO")
+
+    if not os.path.isfile(args.filename):
+        logger.error(f"{args.filename} is not a file")
+        exit(1)
+    output_dir = args.output or args.filename + ".tables"
+    os.makedirs(output_dir, exist_ok=True)
+    export_sav_tables(args.filename, output_dir, args.format, args.custom_properties)
+
+
+def read_tables(
+    filename: str,
+    custom_properties_keys: Sequence[str] = columnar.TABLE_CUSTOM_PROPERTIES,
+) -> dict[str, dict[str, list]]:
+    custom_properties = {
+        path: PALWORLD_CUSTOM_PROPERTIES[path] for path in custom_properties_keys
+    }
+    raw_gvas, _ = decompress_sav_file(filename)
+    try:
+        gvas_file = GvasFile.extract(
+            raw_gvas, columnar.TABLE_PATHS, PALWORLD_TYPE_HINTS, custom_properties
+        )
+    finally:
+        if isinstance(raw_gvas, mmap.mmap):
+            raw_gvas.close()
+    return columnar.export_tables(gvas_file.properties)
+
+
+def export_sav_tables(
+    filename: str,
+    output_dir: str,
+    format: str,
+    custom_properties_keys: Sequence[str] = columnar.TABLE_CUSTOM_PROPERTIES,
+):
+    logger.info(f"Exporting tables from {filename} to {output_dir}")
+    tables = read_tables(filename, custom_properties_keys)
+    if format == "parquet":
+        import pyarrow.parquet
+
+        for table, arrow_table in columnar.to_arrow(tables).items():
+            pyarrow.parquet.write_table(
+                arrow_table, os.path.join(output_dir, f"{table}.parquet")
+            )
+    elif format == "npz":
+        for table, arrays in columnar.to_numpy(tables).items():
+            columnar.numpy.savez(os.path.join(output_dir, f"{table}.npz"), **arrays)
+    else:
+        for table, columns in tables.items():
+            with open(
+                os.path.join(output_dir, f"{table}.csv"),
+                "w",
+                newline="",
+                encoding="utf-8",
+            ) as f:
+                writer = csv.writer(f)
+                writer.writerow(columns)
+                writer.writerows(zip(*columns.values()))
+    for table, columns in tables.items():
+        rows = len(next(iter(columns.values())))
+        logger.info(f"Wrote {rows} rows to {table}.{format}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
-from typing import Tuple
+import mmap
+from typing import Tuple, Union
 
 from loguru import logger
 from palworld_save_tools.compressor.enums import SaveType, MagicBytes
@@ -11,7 +12,9 @@ class Compressor:
         """
         pass
 
-    def _parse_sav_header(self, sav_data: bytes) -> Tuple[int, int, bytes, int, int]:
+    def _parse_sav_header(
+        self, sav_data: Union[bytes, mmap.mmap]
+    ) -> Tuple[int, int, bytes, int, int]:
         """
         Parse SAV file header
         Returns: (uncompressed length, compressed length, magic bytes, save type, data offset)
@@ -62,7 +65,7 @@ class Compressor:
                 logger.debug(f"Unknown save type: 0x{save_type:02X}")
                 return None
 
-    def check_sav_format(self, sav_data: bytes) -> SaveType | None:
+    def check_sav_format(self, sav_data: Union[bytes, mmap.mmap]) -> SaveType | None:
         """
         Check SAV file format.
         Returns: 1=PLM(Oodle), 0=PLZ(Zlib), -1=Unknown.
@@ -1,6 +1,8 @@
+import mmap
 import os
 import sys
 import platform
+from typing import Union
 
 from loguru import logger
 from palworld_save_tools.compressor import Compressor, SaveType
@@ -80,7 +82,18 @@ class OozLib(Compressor):
 
         self.ooz = ooz
 
-    def compress(self, data: bytes, save_type: int) -> bytes:
+    def compress(
+        self,
+        data: bytes,
+        save_type: int,
+        compressor: int = OodleCompressor.Mermaid,
+        level: int = OodleLevel.Normal,
+    ) -> bytes:
+        """
+        Oodle compress GVAS data into a PLM save.
+        ``compressor`` is one of OodleCompressor and ``level`` one of OodleLevel;
+        the game loads any of them, so they only trade speed against ratio.
+        """
         logger.info("Starting compression process with libooz...")
 
         uncompressed_len = len(data)
@@ -94,9 +107,10 @@ class OozLib(Compressor):
 
         logger.debug("Compressing data...")
 
-        compressed_data = self.ooz.compress(
-            OodleCompressor.Mermaid, OodleLevel.Normal, data, uncompressed_len
-        )
+        if compressor == OodleCompressor.Hydra:
+            raise ValueError("Hydra is not supported by libooz")
+
+        compressed_data = self.ooz.compress(compressor, level, data, uncompressed_len)
 
         if not compressed_data:
             raise RuntimeError(
@@ -123,7 +137,7 @@ class OozLib(Compressor):
 
         return sav_data
 
-    def decompress(self, data: bytes) -> bytes:
+    def decompress(self, data: Union[bytes, mmap.mmap]) -> tuple[bytes, int]:
         logger.info("Starting decompression process with libooz...")
 
         if not data:
@@ -1,8 +1,114 @@
+import io
+import mmap
+import os
 import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Optional, Union
 
 from loguru import logger
 from palworld_save_tools.compressor import Compressor, SaveType
 
+# Size of the compressed slices fed to the inflaters when streaming
+CHUNK_SIZE = 1 << 20
+# Size of the independently deflated blocks when compressing in parallel
+PARALLEL_CHUNK_SIZE = 1 << 20
+# Each parallel block is primed with the tail of the previous one, as pigz does
+_DICT_SIZE = 1 << 15
+_ADLER_BASE = 65521
+
+
+def _adler32_combine(adler1: int, adler2: int, len2: int) -> int:
+    # Port of zlib's adler32_combine()
+    rem = len2 % _ADLER_BASE
+    sum1 = adler1 & 0xFFFF
+    sum2 = (rem * sum1) % _ADLER_BASE
+    sum1 += (adler2 & 0xFFFF) + _ADLER_BASE - 1
+    sum2 += ((adler1 >> 16) & 0xFFFF) + ((adler2 >> 16) & 0xFFFF) + _ADLER_BASE - rem
+    return (sum1 % _ADLER_BASE) | ((sum2 % _ADLER_BASE) << 16)
+
+
+def _zlib_header(level: int) -> bytes:
+    if level == zlib.Z_DEFAULT_COMPRESSION:
+        level = 6
+    if level < 2:
+        flevel = 0
+    elif level < 6:
+        flevel = 1
+    elif level == 6:
+        flevel = 2
+    else:
+        flevel = 3
+    cmf = 0x78  # deflate with a 32K window
+    flg = flevel << 6
+    flg |= 31 - ((cmf << 8) | flg) % 31
+    return bytes([cmf, flg])
+
+
+def parallel_compress(
+    data,
+    level: int = zlib.Z_DEFAULT_COMPRESSION,
+    workers: Optional[int] = None,
+    chunk_size: int = PARALLEL_CHUNK_SIZE,
+) -> bytes:
+    """
+    Compress ``data`` into a single zlib stream using multiple threads.
+
+    Like pigz, the input is split into blocks that are raw-deflated
+    independently (each primed with the previous block's last 32K as a
+    dictionary) and ended with a sync flush, so the blocks concatenate into
+    one valid deflate stream. zlib releases the GIL while compressing, so the
+    blocks run concurrently on a thread pool.
+    """
+    view = memoryview(data)
+    length = len(view)
+    if workers is None or workers <= 0:
+        workers = os.cpu_count() or 1
+    if workers == 1 or length <= chunk_size:
+        return zlib.compress(data, level)
+
+    def compress_block(start: int) -> tuple[bytes, int]:
+        end = min(start + chunk_size, length)
+        block = view[start:end]
+        if start > 0:
+            compressor = zlib.compressobj(
+                level,
+                zlib.DEFLATED,
+                -zlib.MAX_WBITS,
+                zdict=view[max(0, start - _DICT_SIZE) : start],
+            )
+        else:
+            compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        flush_mode = zlib.Z_FINISH if end == length else zlib.Z_SYNC_FLUSH
+        return (
+            compressor.compress(block) + compressor.flush(flush_mode),
+            zlib.adler32(block),
+        )
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        blocks = list(executor.map(compress_block, range(0, length, chunk_size)))
+
+    checksum = 1
+    for start, (_, block_checksum) in zip(range(0, length, chunk_size), blocks):
+        checksum = _adler32_combine(
+            checksum, block_checksum, min(chunk_size, length - start)
+        )
+    return b"".join(
+        [_zlib_header(level)]
+        + [block for block, _ in blocks]
+        + [checksum.to_bytes(4, "big")]
+    )
+
+
+def _file_chunks(f: io.BufferedIOBase) -> Iterator[memoryview]:
+    # The chunk buffer is reused; each chunk is consumed before the next read
+    buf = bytearray(CHUNK_SIZE)
+    view = memoryview(buf)
+    while True:
+        n = f.readinto(buf)
+        if not n:
+            return
+        yield view[:n]
+
 
 class Zlib(Compressor):
     def __init__(self):
@@ -11,17 +117,28 @@ class Zlib(Compressor):
         """
         self.SAFE_SPACE_PADDING = 128
 
-    def compress(self, data: bytes, save_type: int) -> bytes:
+    def compress(
+        self,
+        data: bytes,
+        save_type: int,
+        level: int = zlib.Z_DEFAULT_COMPRESSION,
+        workers: int = 1,
+    ) -> bytes:
+        """
+        Double-zlib compress GVAS data into a PLZ save.
+        ``workers`` > 1 compresses blocks on a thread pool (0 uses every core);
+        the output is still a standard zlib stream.
+        """
         logger.info("Starting compression process with zlib...")
 
         uncompressed_len = len(data)
-        compressed_data = zlib.compress(data)
+        compressed_data = parallel_compress(data, level, workers)
         compressed_len = len(compressed_data)
         if save_type != 0x32:
             raise Exception(
                 f"Unhandled compression type: 0x{save_type:02X}, only 0x32 (double zlib) is supported"
             )
-        compressed_data = zlib.compress(compressed_data)
+        compressed_data = parallel_compress(compressed_data, level, workers)
         magic_bytes = self._get_magic(save_type)
 
         logger.debug("File information (Compress):")
@@ -41,9 +158,7 @@ class Zlib(Compressor):
 
         return sav_data
 
-    def decompress(self, data: bytes) -> bytes:
-        logger.info("Starting decompression process with zlib...")
-
+    def _read_header(self, data) -> tuple[int, int, bytes, int, int]:
         format_result = self.check_sav_format(data)
 
         if format_result is None:
@@ -65,13 +180,30 @@ class Zlib(Compressor):
         logger.debug(f"  Uncompressed size: {uncompressed_len:,} bytes")
         logger.debug("Detected PLZ format (Zlib), starting decompression...")
 
-        uncompressed_data = zlib.decompress(data[data_offset:])
+        return uncompressed_len, compressed_len, magic, save_type, data_offset
+
+    def decompress(self, data: bytes) -> tuple[bytes, int]:
+        logger.info("Starting decompression process with zlib...")
+
+        uncompressed_len, compressed_len, magic, save_type, data_offset = (
+            self._read_header(data)
+        )
 
+        # Size the output buffers from the header so they are not regrown
         if save_type == SaveType.PLZ.value:
+            uncompressed_data = zlib.decompress(
+                memoryview(data)[data_offset:], bufsize=compressed_len
+            )
             if compressed_len != len(uncompressed_data):
                 raise Exception(f"incorrect compressed length: {compressed_len}")
 
-            uncompressed_data = zlib.decompress(uncompressed_data)
+            uncompressed_data = zlib.decompress(
+                uncompressed_data, bufsize=uncompressed_len
+            )
+        else:
+            uncompressed_data = zlib.decompress(
+                memoryview(data)[data_offset:], bufsize=uncompressed_len
+            )
 
         if uncompressed_len != len(uncompressed_data):
             raise Exception(
@@ -83,3 +215,74 @@ class Zlib(Compressor):
         )
 
         return uncompressed_data, save_type
+
+    def decompress_file(
+        self, f: io.BufferedIOBase, out: Optional[Union[bytearray, mmap.mmap]] = None
+    ) -> tuple[Union[bytearray, mmap.mmap], int]:
+        """
+        Stream-decompress an open SAV file into one buffer sized up front from
+        the header's uncompressed length. The compressed data is read in
+        CHUNK_SIZE pieces and never held in memory as a whole.
+        If no output buffer is given, an anonymous mmap is allocated, which
+        FArchiveReader can parse without copying.
+        Returns: (decompressed buffer, save type)
+        """
+        logger.info("Starting decompression process with zlib...")
+
+        start = f.tell()
+        uncompressed_len, compressed_len, magic, save_type, data_offset = (
+            self._read_header(f.read(24))
+        )
+        if out is None:
+            out = mmap.mmap(-1, uncompressed_len)
+        elif len(out) != uncompressed_len:
+            raise ValueError(
+                f"Output buffer of {len(out):,} bytes does not match uncompressed length {uncompressed_len:,}"
+            )
+        f.seek(start + data_offset)
+
+        pos = 0
+        for piece in self._inflate_chunks(_file_chunks(f), save_type, compressed_len):
+            end = pos + len(piece)
+            if end > uncompressed_len:
+                raise Exception(
+                    f"incorrect uncompressed length: more than {uncompressed_len} bytes"
+                )
+            out[pos:end] = piece
+            pos = end
+        if uncompressed_len != pos:
+            raise Exception(
+                f"incorrect uncompressed length: {uncompressed_len} != {pos}"
+            )
+
+        logger.info(f"Decompression successful, decompressed size: {pos:,} bytes")
+
+        return out, save_type
+
+    def _inflate_chunks(
+        self, chunks: Iterator[memoryview], save_type: int, compressed_len: int
+    ) -> Iterator[bytes]:
+        # PLZ saves are zlib-compressed twice, so the outer inflater's output is
+        # fed straight into a second inflater rather than being materialised.
+        outer = zlib.decompressobj()
+        inner = zlib.decompressobj() if save_type == SaveType.PLZ.value else None
+        intermediate_len = 0
+        for chunk in chunks:
+            piece = outer.decompress(chunk)
+            if inner is not None:
+                intermediate_len += len(piece)
+                piece = inner.decompress(piece)
+            if piece:
+                yield piece
+            if outer.eof:
+                break
+        if not outer.eof:
+            raise Exception("incomplete zlib stream")
+        if inner is not None:
+            if compressed_len != intermediate_len:
+                raise Exception(f"incorrect compressed length: {compressed_len}")
+            piece = inner.flush()
+            if piece:
+                yield piece
+            if not inner.eof:
+                raise Exception("incomplete zlib stream")
@@ -1,8 +1,24 @@
 import base64
-from typing import Any, Callable
+import mmap
+from typing import Any, Callable, Sequence, Union
 
 from loguru import logger
-from palworld_save_tools.archive import FArchiveReader, FArchiveWriter
+from palworld_save_tools.archive import (
+    CompactDeferringFArchiveReader,
+    CompactFArchiveReader,
+    DeferringFArchiveReader,
+    FArchiveReader,
+    FArchiveWriter,
+    LazyFArchiveReader,
+    PreencodedFArchiveWriter,
+    SelectiveFArchiveReader,
+    fstring_cache_stats,
+)
+from palworld_save_tools.parallel import (
+    decode_deferred,
+    encode_custom_properties,
+    resolve_workers,
+)
 
 
 def custom_version_reader(reader: FArchiveReader):
@@ -116,27 +132,123 @@ class GvasFile:
 
     @staticmethod
     def read(
-        data: bytes,
+        data: Union[bytes, mmap.mmap],
         type_hints: dict[str, str] = {},
         custom_properties: dict[str, tuple[Callable, Callable]] = {},
         allow_nan: bool = True,
+        lazy: bool = False,
+        workers: int = 1,
+        compact: bool = False,
     ) -> "GvasFile":
+        """Parse decompressed GVAS data.
+
+        With ``lazy``, property values are only located up front and decoded
+        when first accessed; the returned tree references ``data``, which
+        must not be modified or closed while the tree is in use.
+
+        With ``workers`` other than 1 (``0`` for one per core), the generic
+        properties are parsed first and the custom properties are then
+        decoded in that many worker processes. Not supported with ``lazy``,
+        which decodes each value when it is first accessed.
+
+        With ``compact``, properties are read into the slotted node classes
+        of ``palworld_save_tools.nodes`` instead of dicts, see
+        ``CompactFArchiveReader``. Ignored with ``lazy``.
+        """
+        if lazy and workers != 1:
+            raise ValueError("workers cannot be used with lazy")
         gvas_file = GvasFile()
-        with FArchiveReader(
+        workers = resolve_workers(workers)
+        if lazy:
+            reader_class: type[FArchiveReader] = LazyFArchiveReader
+        elif workers > 1 and custom_properties:
+            if compact:
+                reader_class = CompactDeferringFArchiveReader
+            else:
+                reader_class = DeferringFArchiveReader
+        elif compact:
+            reader_class = CompactFArchiveReader
+        else:
+            reader_class = FArchiveReader
+        with reader_class(
             data,
             type_hints=type_hints,
             custom_properties=custom_properties,
             allow_nan=allow_nan,
         ) as reader:
+            hits, misses = fstring_cache_stats
             gvas_file.header = GvasHeader.read(reader)
             gvas_file.properties = reader.properties_until_end()
             gvas_file.trailer = reader.read_to_end()
+            if isinstance(reader, DeferringFArchiveReader):
+                decode_deferred(reader, workers)
             if gvas_file.trailer != b"\x00\x00\x00\x00":
                 logger.debug(
                     f"{len(gvas_file.trailer)} bytes of trailer data, file may not have fully parsed"
                 )
+            if reader.debug:
+                hits = fstring_cache_stats[0] - hits
+                misses = fstring_cache_stats[1] - misses
+                logger.debug(
+                    f"fstring cache: {hits:,} hits, {misses:,} misses "
+                    f"({hits / max(hits + misses, 1):.1%} hit rate)"
+                )
+        return gvas_file
+
+    @staticmethod
+    def extract(
+        data: Union[bytes, mmap.mmap],
+        paths: Sequence[str],
+        type_hints: dict[str, str] = {},
+        custom_properties: dict[str, tuple[Callable, Callable]] = {},
+        allow_nan: bool = True,
+    ) -> "GvasFile":
+        """Parse only the properties at ``paths`` out of decompressed GVAS data.
+
+        Paths use the same dotted form as type hints and custom properties,
+        e.g. ``.worldSaveData.GroupSaveDataMap``. Every other property is
+        skipped over without being decoded, so the result only holds the
+        requested subtrees and cannot be written back as a full save.
+        """
+        gvas_file = GvasFile()
+        with SelectiveFArchiveReader(
+            data,
+            paths,
+            type_hints=type_hints,
+            custom_properties=custom_properties,
+            allow_nan=allow_nan,
+        ) as reader:
+            gvas_file.header = GvasHeader.read(reader)
+            gvas_file.properties = reader.properties_until_end()
+            gvas_file.trailer = reader.read_to_end()
         return gvas_file
 
+    @staticmethod
+    def read_path(
+        path: str,
+        type_hints: dict[str, str] = {},
+        custom_properties: dict[str, tuple[Callable, Callable]] = {},
+        allow_nan: bool = True,
+        lazy: bool = False,
+        workers: int = 1,
+    ) -> "GvasFile":
+        """Decompress and parse the .sav at ``path`` via a memory-mapped input."""
+        from palworld_save_tools.palsav import decompress_sav_file
+
+        data, _ = decompress_sav_file(path)
+        if lazy:
+            # The lazy tree keeps decoding from the buffer after this returns
+            return GvasFile.read(
+                data, type_hints, custom_properties, allow_nan, lazy, workers
+            )
+        try:
+            return GvasFile.read(
+                data, type_hints, custom_properties, allow_nan, workers=workers
+            )
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+
     @staticmethod
     def load(dict: dict[str, Any]) -> "GvasFile":
         gvas_file = GvasFile()
@@ -153,9 +265,24 @@ class GvasFile:
         }
 
     def write(
-        self, custom_properties: dict[str, tuple[Callable, Callable]] = {}
+        self,
+        custom_properties: dict[str, tuple[Callable, Callable]] = {},
+        workers: int = 1,
     ) -> bytes:
-        writer = FArchiveWriter(custom_properties)
+        """Serialize to decompressed GVAS data.
+
+        With ``workers`` other than 1 (``0`` for one per core), the custom
+        properties are encoded up front in that many worker processes and
+        their bytes are copied in as the rest of the tree is written.
+        """
+        workers = resolve_workers(workers)
+        if workers > 1 and custom_properties:
+            writer: FArchiveWriter = PreencodedFArchiveWriter(
+                encode_custom_properties(self.properties, custom_properties, workers),
+                custom_properties,
+            )
+        else:
+            writer = FArchiveWriter(custom_properties)
         self.header.write(writer)
         writer.properties(self.properties)
         writer.write(self.trailer)
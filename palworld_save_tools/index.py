@@ -0,0 +1,343 @@
+from collections.abc import Mapping, MutableMapping
+from typing import Any, Callable, Optional
+
+from palworld_save_tools.archive import UUID
+from palworld_save_tools.columnar import (
+    belong_group_id,
+    decoded_raw_data,
+    property_value,
+)
+
+# The properties EntityIndex reads, for GvasFile.extract
+INDEX_PATHS = [
+    ".worldSaveData.CharacterSaveParameterMap",
+    ".worldSaveData.GroupSaveDataMap",
+    ".worldSaveData.ItemContainerSaveData",
+    ".worldSaveData.CharacterContainerSaveData",
+    ".worldSaveData.BaseCampSaveData",
+]
+
+# Custom properties the owner, group and base camp indexes are read from
+INDEX_CUSTOM_PROPERTIES = [
+    ".worldSaveData.CharacterSaveParameterMap.Value.RawData",
+    ".worldSaveData.BaseCampSaveData.Value.RawData",
+    ".worldSaveData.BaseCampSaveData.Value.WorkerDirector.RawData",
+]
+
+_ZERO_GUID = UUID(bytes(16))
+
+
+def _guid(value: Any) -> UUID:
+    """GUIDs from the tree as-is, and strings (as loaded from JSON) parsed."""
+    if isinstance(value, UUID):
+        return value
+    return UUID.from_str(str(value))
+
+
+def _ref(value: Any) -> Optional[UUID]:
+    """A GUID referencing another entity, or None for the zero GUID."""
+    if value is None:
+        return None
+    guid = _guid(value)
+    return None if guid == _ZERO_GUID else guid
+
+
+def _key_guid(entry: Mapping) -> UUID:
+    return _guid(entry["key"])
+
+
+def _save_parameter(entry: Mapping) -> Optional[MutableMapping]:
+    raw = decoded_raw_data(property_value(entry["value"], "RawData"))
+    return property_value(raw["object"], "SaveParameter") if raw else None
+
+
+def _character_id(entry: Mapping) -> UUID:
+    return _guid(property_value(entry["key"], "InstanceId"))
+
+
+def _character_player(entry: Mapping) -> Optional[UUID]:
+    # Pals are keyed by their owner's uid too, so only IsPlayer tells them apart
+    if not property_value(_save_parameter(entry), "IsPlayer"):
+        return None
+    return _ref(property_value(entry["key"], "PlayerUId"))
+
+
+def _character_owner(entry: Mapping) -> Optional[UUID]:
+    return _ref(property_value(_save_parameter(entry), "OwnerPlayerUId"))
+
+
+def _character_group(entry: Mapping) -> Optional[UUID]:
+    raw = decoded_raw_data(property_value(entry["value"], "RawData"))
+    return _ref(raw["group_id"]) if raw else None
+
+
+def _container_id(entry: Mapping) -> UUID:
+    return _guid(property_value(entry["key"], "ID"))
+
+
+def _container_group(entry: Mapping) -> Optional[UUID]:
+    return _ref(belong_group_id(property_value(entry["value"], "BelongInfo")))
+
+
+def _base_camp_group(entry: Mapping) -> Optional[UUID]:
+    raw = decoded_raw_data(property_value(entry["value"], "RawData"))
+    return _ref(raw["group_id_belong_to"]) if raw else None
+
+
+def _base_camp_container(entry: Mapping) -> Optional[UUID]:
+    raw = decoded_raw_data(property_value(entry["value"], "WorkerDirector", "RawData"))
+    return _ref(raw["container_id"]) if raw else None
+
+
+class _Table:
+    """Entries of one world map by their id and by the ids they reference.
+
+    Each reference index maps a referenced id to the entries holding it, in
+    a dict keyed by entry id so that entries are unindexed in constant time.
+    The references an entry was indexed under are remembered, which keeps
+    unindexing correct after the entry itself was changed.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        entries: Optional[list],
+        key: Callable[[Mapping], UUID],
+        references: dict[str, Callable[[Mapping], Optional[UUID]]],
+    ):
+        self.name = name
+        self.entries = entries
+        self.key = key
+        self.references = references
+        self.by_id: dict[UUID, MutableMapping] = {}
+        self.by_reference: dict[str, dict[UUID, dict[UUID, MutableMapping]]] = {
+            reference: {} for reference in references
+        }
+        self.indexed: dict[UUID, tuple[Optional[UUID], ...]] = {}
+        for entry in entries or []:
+            self.index(entry)
+
+    def index(self, entry: MutableMapping) -> UUID:
+        entry_id = self.key(entry)
+        if entry_id in self.by_id:
+            raise ValueError(f"{self.name} already has an entry {entry_id}")
+        self.by_id[entry_id] = entry
+        targets = tuple(reference(entry) for reference in self.references.values())
+        for reference, target in zip(self.by_reference.values(), targets):
+            if target is not None:
+                reference.setdefault(target, {})[entry_id] = entry
+        self.indexed[entry_id] = targets
+        return entry_id
+
+    def unindex(self, entry_id: UUID) -> MutableMapping:
+        entry = self.by_id.pop(entry_id)
+        targets = self.indexed.pop(entry_id)
+        for reference, target in zip(self.by_reference.values(), targets):
+            if target is not None:
+                entries = reference[target]
+                del entries[entry_id]
+                if not entries:
+                    del reference[target]
+        return entry
+
+    def get(self, entry_id: Any) -> Optional[MutableMapping]:
+        return self.by_id.get(_guid(entry_id))
+
+    def referencing(self, reference: str, target: Any) -> list[MutableMapping]:
+        return list(self.by_reference[reference].get(_guid(target), {}).values())
+
+    def add(self, entry: MutableMapping) -> None:
+        if self.entries is None:
+            raise KeyError(f"{self.name} is not in this save")
+        self.index(entry)
+        self.entries.append(entry)
+
+    def remove(self, entry_id: Any) -> MutableMapping:
+        entry_id = _guid(entry_id)
+        if entry_id not in self.by_id:
+            raise KeyError(entry_id)
+        entry = self.unindex(entry_id)
+        assert self.entries is not None
+        # By identity, as comparing entries would compare their whole trees
+        for i, e in enumerate(self.entries):
+            if e is entry:
+                del self.entries[i]
+                break
+        return entry
+
+    def update(self, entry_id: Any, change: Callable[[MutableMapping], None]) -> None:
+        entry_id = _guid(entry_id)
+        entry = self.unindex(entry_id)
+        try:
+            change(entry)
+        finally:
+            self.index(entry)
+
+
+class EntityIndex:
+    """Hash indexes over the characters, groups, containers and base camps.
+
+    Built in one pass over ``GvasFile.properties`` of a Level.sav. Entries
+    are looked up by their own id, and characters by the uid of the player
+    they are or are owned by, in constant time. Characters, item containers
+    and base camps are also indexed by the group they belong to, and base
+    camps by the character container holding their workers. The lookups
+    return the map entries of the tree itself, so changes to them end up in
+    the save; changes to the ids they are indexed by must be made through the
+    methods here to keep the indexes consistent.
+
+    Owners, character groups and base camp groups and containers are read
+    from RawData, and are only indexed when those custom properties
+    (``INDEX_CUSTOM_PROPERTIES``) were decoded. GUIDs can be given as
+    ``UUID``s or strings.
+    """
+
+    def __init__(self, properties: Mapping):
+        world = property_value(properties, "worldSaveData") or {}
+
+        def entries(name: str) -> Optional[list]:
+            return world[name]["value"] if name in world else None
+
+        self._characters = _Table(
+            "CharacterSaveParameterMap",
+            entries("CharacterSaveParameterMap"),
+            _character_id,
+            {
+                "player": _character_player,
+                "owner": _character_owner,
+                "group": _character_group,
+            },
+        )
+        self._groups = _Table(
+            "GroupSaveDataMap", entries("GroupSaveDataMap"), _key_guid, {}
+        )
+        self._item_containers = _Table(
+            "ItemContainerSaveData",
+            entries("ItemContainerSaveData"),
+            _container_id,
+            {"group": _container_group},
+        )
+        self._character_containers = _Table(
+            "CharacterContainerSaveData",
+            entries("CharacterContainerSaveData"),
+            _container_id,
+            {},
+        )
+        self._base_camps = _Table(
+            "BaseCampSaveData",
+            entries("BaseCampSaveData"),
+            _key_guid,
+            {"group": _base_camp_group, "container": _base_camp_container},
+        )
+
+    # Characters
+
+    def character(self, instance_id: Any) -> Optional[MutableMapping]:
+        return self._characters.get(instance_id)
+
+    def player(self, player_uid: Any) -> Optional[MutableMapping]:
+        players = self._characters.referencing("player", player_uid)
+        return players[0] if players else None
+
+    def characters_owned_by(self, player_uid: Any) -> list[MutableMapping]:
+        """Pals owned by the player, wherever they are kept."""
+        return self._characters.referencing("owner", player_uid)
+
+    def characters_in_group(self, group_id: Any) -> list[MutableMapping]:
+        return self._characters.referencing("group", group_id)
+
+    def add_character(self, entry: MutableMapping) -> None:
+        self._characters.add(entry)
+
+    def remove_character(self, instance_id: Any) -> MutableMapping:
+        return self._characters.remove(instance_id)
+
+    def set_owner(self, instance_id: Any, player_uid: Any) -> None:
+        """Make the player the owner of a pal, or release it for None."""
+
+        def change(entry: MutableMapping) -> None:
+            params = _save_parameter(entry)
+            if params is None:
+                raise ValueError(f"RawData of character {instance_id} is not decoded")
+            if player_uid is None:
+                params.pop("OwnerPlayerUId", None)
+            elif "OwnerPlayerUId" in params:
+                params["OwnerPlayerUId"]["value"] = _guid(player_uid)
+            else:
+                params["OwnerPlayerUId"] = {
+                    "struct_type": "Guid",
+                    "struct_id": _ZERO_GUID,
+                    "id": None,
+                    "value": _guid(player_uid),
+                    "type": "StructProperty",
+                }
+
+        self._characters.update(instance_id, change)
+
+    def set_character_group(self, instance_id: Any, group_id: Any) -> None:
+        def change(entry: MutableMapping) -> None:
+            raw = decoded_raw_data(property_value(entry["value"], "RawData"))
+            if raw is None:
+                raise ValueError(f"RawData of character {instance_id} is not decoded")
+            raw["group_id"] = _guid(group_id)
+
+        self._characters.update(instance_id, change)
+
+    # Groups
+
+    def group(self, group_id: Any) -> Optional[MutableMapping]:
+        return self._groups.get(group_id)
+
+    def add_group(self, entry: MutableMapping) -> None:
+        self._groups.add(entry)
+
+    def remove_group(self, group_id: Any) -> MutableMapping:
+        return self._groups.remove(group_id)
+
+    # Containers
+
+    def item_container(self, container_id: Any) -> Optional[MutableMapping]:
+        return self._item_containers.get(container_id)
+
+    def item_containers_in_group(self, group_id: Any) -> list[MutableMapping]:
+        return self._item_containers.referencing("group", group_id)
+
+    def add_item_container(self, entry: MutableMapping) -> None:
+        self._item_containers.add(entry)
+
+    def remove_item_container(self, container_id: Any) -> MutableMapping:
+        return self._item_containers.remove(container_id)
+
+    def character_container(self, container_id: Any) -> Optional[MutableMapping]:
+        return self._character_containers.get(container_id)
+
+    def add_character_container(self, entry: MutableMapping) -> None:
+        self._character_containers.add(entry)
+
+    def remove_character_container(self, container_id: Any) -> MutableMapping:
+        return self._character_containers.remove(container_id)
+
+    # Base camps
+
+    def base_camp(self, base_camp_id: Any) -> Optional[MutableMapping]:
+        return self._base_camps.get(base_camp_id)
+
+    def base_camps_in_group(self, group_id: Any) -> list[MutableMapping]:
+        return self._base_camps.referencing("group", group_id)
+
+    def base_camp_of_container(self, container_id: Any) -> Optional[MutableMapping]:
+        """The base camp whose workers are kept in the character container."""
+        base_camps = self._base_camps.referencing("container", container_id)
+        return base_camps[0] if base_camps else None
+
+    def base_camp_container(self, base_camp_id: Any) -> Optional[MutableMapping]:
+        """The character container holding the workers of the base camp."""
+        base_camp = self.base_camp(base_camp_id)
+        container_id = _base_camp_container(base_camp) if base_camp else None
+        return self.character_container(container_id) if container_id else None
+
+    def add_base_camp(self, entry: MutableMapping) -> None:
+        self._base_camps.add(entry)
+
+    def remove_base_camp(self, base_camp_id: Any) -> MutableMapping:
+        return self._base_camps.remove(base_camp_id)
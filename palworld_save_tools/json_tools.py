@@ -1,11 +1,25 @@
 import base64
 import json
 import math
+import mmap
+import re
+import struct
 import uuid
+from collections.abc import Mapping
+from typing import Any, Callable, Iterator, Optional
 
 import orjson
 
-from palworld_save_tools.archive import UUID
+from palworld_save_tools.archive import UUID, FArchiveWriter, cache_uuid_strings
+from palworld_save_tools.gvas import GvasHeader
+from palworld_save_tools.nodes import Node
+
+# dump_stream writes to the file once this many bytes of JSON are pending
+STREAM_CHUNK_SIZE = 1 << 20
+# Containers nested deeper than this are encoded by orjson in one piece
+STREAM_MAX_DEPTH = 8
+# Bytes of JSON decoded to text at a time by load_gvas_stream
+STREAM_WINDOW_SIZE = 1 << 20
 
 
 def _bytes_to_str(obj: bytes) -> str:
@@ -21,6 +35,11 @@ class CustomEncoder(json.JSONEncoder):
             return str(obj)
         if isinstance(obj, (bytes, bytearray)):
             return _bytes_to_str(bytes(obj))
+        if isinstance(obj, Node):
+            return obj.to_dict()
+        if isinstance(obj, Mapping):
+            # Lazily decoded property maps
+            return dict(obj)
         return super(CustomEncoder, self).default(obj)
 
 
@@ -31,6 +50,11 @@ def _orjson_default(obj):
         return str(obj)
     if isinstance(obj, (bytes, bytearray)):
         return _bytes_to_str(bytes(obj))
+    if isinstance(obj, Node):
+        return obj.to_dict()
+    if isinstance(obj, Mapping):
+        # Lazily decoded property maps
+        return dict(obj)
     raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
 
 
@@ -39,7 +63,7 @@ def _sanitize_nonfinite(obj):
         if math.isnan(obj) or math.isinf(obj):
             return None
         return obj
-    if isinstance(obj, dict):
+    if isinstance(obj, Mapping):
         return {k: _sanitize_nonfinite(v) for k, v in obj.items()}
     if isinstance(obj, list):
         return [_sanitize_nonfinite(v) for v in obj]
@@ -51,6 +75,8 @@ def _sanitize_nonfinite(obj):
 def dump(data, path, minify=False, allow_nan=True):
     if not allow_nan:
         data = _sanitize_nonfinite(data)
+    # Format the GUIDs in one pass rather than through a default() call each
+    cache_uuid_strings(data)
     option = orjson.OPT_NON_STR_KEYS
     if not minify:
         option |= orjson.OPT_INDENT_2
@@ -59,6 +85,412 @@ def dump(data, path, minify=False, allow_nan=True):
         f.write(buf)
 
 
+class _JsonStreamWriter:
+    """Emits the same bytes as ``orjson.dumps`` one fragment at a time."""
+
+    def __init__(self, f, minify: bool, allow_nan: bool, max_depth: int):
+        self.f = f
+        self.allow_nan = allow_nan
+        self.max_depth = max_depth
+        self.option = orjson.OPT_NON_STR_KEYS
+        if minify:
+            self.newlines = [b""] * (max_depth + 2)
+            self.colon = b":"
+        else:
+            self.option |= orjson.OPT_INDENT_2
+            self.newlines = [b"\n" + b"  " * depth for depth in range(max_depth + 2)]
+            self.colon = b": "
+        self.chunks: list[bytes] = []
+        self.pending = 0
+
+    def write(self, chunk: bytes):
+        self.chunks.append(chunk)
+        self.pending += len(chunk)
+        if self.pending >= STREAM_CHUNK_SIZE:
+            self.flush()
+
+    def flush(self):
+        self.f.write(b"".join(self.chunks))
+        self.chunks.clear()
+        self.pending = 0
+
+    def key(self, key) -> bytes:
+        if type(key) is str:
+            return orjson.dumps(key)
+        # Let orjson stringify non-str keys exactly as it does in a dict
+        return orjson.dumps(
+            {key: None}, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS
+        )[1:-6]
+
+    def value(self, value, depth: int):
+        if depth < self.max_depth and value:
+            if isinstance(value, Mapping):
+                return self.mapping(value, depth)
+            if isinstance(value, list):
+                return self.sequence(value, depth)
+        if not self.allow_nan:
+            value = _sanitize_nonfinite(value)
+        fragment = orjson.dumps(value, default=_orjson_default, option=self.option)
+        if depth:
+            # orjson indents from column zero; shift continuation lines over
+            fragment = fragment.replace(b"\n", self.newlines[depth])
+        self.write(fragment)
+
+    def mapping(self, value: Mapping, depth: int):
+        newline = self.newlines[depth + 1]
+        separator = b"{"
+        for key, item in value.items():
+            self.write(separator + newline + self.key(key) + self.colon)
+            self.value(item, depth + 1)
+            separator = b","
+        self.write(self.newlines[depth] + b"}")
+
+    def sequence(self, value: list, depth: int):
+        newline = self.newlines[depth + 1]
+        separator = b"["
+        for item in value:
+            self.write(separator + newline)
+            self.value(item, depth + 1)
+            separator = b","
+        self.write(self.newlines[depth] + b"]")
+
+
+def dump_stream(data, path, minify=False, allow_nan=True, max_depth=STREAM_MAX_DEPTH):
+    """Write the same JSON as ``dump`` without building the whole document.
+
+    The tree is walked down to ``max_depth`` and written out in chunks of
+    orjson-encoded fragments, so peak memory is the tree plus the largest
+    fragment rather than the tree plus the full JSON text.
+    """
+    cache_uuid_strings(data)
+    with open(path, "wb") as f:
+        writer = _JsonStreamWriter(f, minify, allow_nan, max_depth)
+        writer.value(data, 0)
+        writer.flush()
+
+
 def load(path):
     with open(path, "rb") as f:
-        return orjson.loads(f.read())
\ No newline at end of file
+        return orjson.loads(f.read())
+
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_pack_u32_into = struct.Struct("I").pack_into
+_pack_u64_into = struct.Struct("Q").pack_into
+# Struct types FArchiveWriter.struct_value writes natively, not as properties
+_NATIVE_STRUCT_TYPES = frozenset(
+    ("Vector", "DateTime", "Guid", "Quat", "LinearColor", "Color")
+)
+
+
+class _JsonCursor:
+    """Walks a JSON document, only decoding the values it is asked for.
+
+    The document is UTF-8 bytes (typically an mmap) of which only a window
+    is decoded to text at a time; the window moves along with the cursor
+    and grows when a single value does not fit in it.
+    """
+
+    def __init__(self, data, window_size: int = STREAM_WINDOW_SIZE):
+        self.data = data
+        self.window_size = window_size
+        self._scan: Callable[[str, int], tuple[Any, int]]
+        self._scan = json.JSONDecoder().scan_once  # type: ignore[attr-defined]
+        # Byte offset of the window and whether it is pure ASCII, in which
+        # case text and byte offsets line up
+        self.base = 0
+        self.ascii = True
+        self.text = ""
+        self.pos = 0
+        self.at_end = False
+        self._load(0)
+
+    def _load(self, min_size: int):
+        if self.ascii:
+            start = self.base + self.pos
+        else:
+            start = self.base + len(self.text[: self.pos].encode("utf-8"))
+        end = start + max(self.window_size, min_size)
+        chunk = self.data[start:end]
+        self.at_end = end >= len(self.data)
+        if not self.at_end:
+            # Leave a character split by the window for the next one
+            i = len(chunk) - 1
+            while i > 0 and chunk[i] & 0xC0 == 0x80:
+                i -= 1
+            if chunk[i] >= 0x80:
+                chunk = chunk[:i]
+        self.base = start
+        self.ascii = chunk.isascii()
+        self.text = chunk.decode("utf-8")
+        self.pos = 0
+
+    def peek(self) -> str:
+        while True:
+            match = _WHITESPACE.match(self.text, self.pos)
+            if match is None:
+                raise json.JSONDecodeError("Expecting value", self.text, self.pos)
+            self.pos = match.end()
+            if self.pos < len(self.text) or self.at_end:
+                return self.text[self.pos : self.pos + 1]
+            self._load(0)
+
+    def _next_char(self) -> str:
+        char = self.peek()
+        self.pos += 1
+        return char
+
+    def _expect(self, expected: str):
+        char = self._next_char()
+        if char != expected:
+            raise ValueError(f"Expected {expected!r}, got {char!r}")
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self._scan(self.text, self.pos)
+            except (StopIteration, ValueError):
+                end = None
+            # A value running up to the end of the window may be cut short
+            if end is not None and (end < len(self.text) or self.at_end):
+                self.pos = end
+                return value
+            if self.at_end:
+                raise ValueError(f"Invalid JSON value at byte {self.base}")
+            self._load(2 * (len(self.text) - self.pos))
+
+    def keys(self) -> Iterator[str]:
+        """Iterate over an object's keys, each value must be consumed in between."""
+        self._expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self._expect(":")
+            yield key
+            char = self._next_char()
+            if char == "}":
+                return
+            if char != ",":
+                raise ValueError(f"Expected ',' or '}}', got {char!r}")
+
+    def items(self) -> Iterator[None]:
+        """Iterate over an array, each item must be consumed in between."""
+        self._expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield
+            char = self._next_char()
+            if char == "]":
+                return
+            if char != ",":
+                raise ValueError(f"Expected ',' or ']', got {char!r}")
+
+    def first_key(self) -> Optional[str]:
+        """Return the first key of the object at the cursor without moving."""
+        state = (self.base, self.ascii, self.text, self.pos, self.at_end)
+        try:
+            return next(self.keys(), None)
+        finally:
+            self.base, self.ascii, self.text, self.pos, self.at_end = state
+
+
+def _stream_fields(cursor: _JsonCursor, keys: Iterator[str]) -> dict[str, Any]:
+    """Decode the members of a property object up to (not including) its value."""
+    fields: dict[str, Any] = {}
+    for key in keys:
+        if key == "value":
+            return fields
+        fields[key] = cursor.value()
+    raise ValueError("Property without a value")
+
+
+def _stream_remaining_fields(
+    cursor: _JsonCursor,
+    keys: Iterator[str],
+    fields: dict[str, Any],
+    type_name: str,
+    path: str,
+):
+    for key in keys:
+        fields[key] = cursor.value()
+    if fields.get("type", type_name) != type_name:
+        raise ValueError(f"Expected {type_name} at {path}, got {fields['type']}")
+    if "custom_type" in fields:
+        raise Exception(f"Unknown custom property type: {fields['custom_type']}")
+
+
+def _is_properties(value: Any) -> bool:
+    return isinstance(value, dict) and all(
+        isinstance(item, dict) for item in value.values()
+    )
+
+
+def _stream_struct_property(cursor: _JsonCursor, writer: FArchiveWriter, path: str):
+    keys = cursor.keys()
+    fields = _stream_fields(cursor, keys)
+    struct_type = fields["struct_type"]
+    writer.fstring(struct_type)
+    writer.guid(fields["struct_id"])
+    writer.optional_guid(fields.get("id", None))
+    start = len(writer.data)
+    if struct_type in _NATIVE_STRUCT_TYPES or cursor.peek() != "{":
+        writer.struct_value(struct_type, cursor.value())
+    else:
+        _stream_properties(cursor, writer, path)
+    size = len(writer.data) - start
+    _stream_remaining_fields(cursor, keys, fields, "StructProperty", path)
+    return size
+
+
+def _stream_map_property(cursor: _JsonCursor, writer: FArchiveWriter, path: str):
+    keys = cursor.keys()
+    fields = _stream_fields(cursor, keys)
+    key_type = fields["key_type"]
+    key_struct_type = fields.get("key_struct_type", None)
+    value_type = fields["value_type"]
+    value_struct_type = fields.get("value_struct_type", None)
+    writer.fstring(key_type)
+    writer.fstring(value_type)
+    writer.optional_guid(fields.get("id", None))
+    start = len(writer.data)
+    writer.u32(0)
+    count_pos = len(writer.data)
+    writer.u32(0)
+    count = 0
+    for _ in cursor.items():
+        entry = cursor.value()
+        writer.prop_value(key_type, key_struct_type, entry["key"])
+        writer.prop_value(value_type, value_struct_type, entry["value"])
+        count += 1
+    _pack_u32_into(writer.data, count_pos, count)
+    size = len(writer.data) - start
+    _stream_remaining_fields(cursor, keys, fields, "MapProperty", path)
+    return size
+
+
+def _stream_struct_array(cursor: _JsonCursor, writer: FArchiveWriter):
+    value: dict[str, Any] = {}
+    elements = writer.copy()
+    count = 0
+    # The element type comes after the values in JSON but before them in the
+    # archive. Elements shaped like property maps can be encoded as they
+    # arrive, anything else waits for the type
+    pending: list[Any] = []
+    properties_encoded = False
+    for key in cursor.keys():
+        if key != "values":
+            value[key] = cursor.value()
+            continue
+        for _ in cursor.items():
+            element = cursor.value()
+            count += 1
+            if "type_name" in value:
+                elements.struct_value(value["type_name"], element)
+            elif not pending and _is_properties(element):
+                elements.properties(element)
+                properties_encoded = True
+            else:
+                pending.append(element)
+    type_name = value["type_name"]
+    if properties_encoded and type_name in _NATIVE_STRUCT_TYPES:
+        raise ValueError(f"{type_name} array elements are not property maps")
+    for element in pending:
+        elements.struct_value(type_name, element)
+    writer.u32(count)
+    writer.fstring(value["prop_name"])
+    writer.fstring(value["prop_type"])
+    writer.u64(len(elements.data))
+    writer.fstring(type_name)
+    writer.guid(value["id"])
+    writer.u(0)
+    writer.write(elements.buffer())
+
+
+def _stream_array_property(cursor: _JsonCursor, writer: FArchiveWriter, path: str):
+    keys = cursor.keys()
+    fields = _stream_fields(cursor, keys)
+    array_type = fields["array_type"]
+    writer.fstring(array_type)
+    writer.optional_guid(fields.get("id", None))
+    start = len(writer.data)
+    if array_type == "StructProperty" and cursor.peek() == "{":
+        _stream_struct_array(cursor, writer)
+    else:
+        writer.array_property(array_type, cursor.value())
+    size = len(writer.data) - start
+    _stream_remaining_fields(cursor, keys, fields, "ArrayProperty", path)
+    return size
+
+
+# Keyed on the first key of a property as written by FArchiveReader
+_STREAM_PROPERTY_DISPATCH: dict[str, tuple[str, Callable]] = {
+    "struct_type": ("StructProperty", _stream_struct_property),
+    "key_type": ("MapProperty", _stream_map_property),
+    "array_type": ("ArrayProperty", _stream_array_property),
+}
+
+
+def _stream_properties(cursor: _JsonCursor, writer: FArchiveWriter, path: str):
+    for name in cursor.keys():
+        writer.fstring(name)
+        property_path = f"{path}.{name}"
+        stream = None
+        if property_path not in writer.custom_properties and cursor.peek() == "{":
+            first_key = cursor.first_key()
+            if first_key is not None:
+                stream = _STREAM_PROPERTY_DISPATCH.get(first_key)
+        if stream is None:
+            writer.property(cursor.value())
+            continue
+        type_name, stream_property = stream
+        writer.fstring(type_name)
+        size_pos = len(writer.data)
+        writer.u64(0)
+        size = stream_property(cursor, writer, property_path)
+        _pack_u64_into(writer.data, size_pos, size)
+    writer.fstring("None")
+
+
+def load_gvas_stream(
+    path,
+    custom_properties: dict[str, tuple[Callable, Callable]] = {},
+    window_size: int = STREAM_WINDOW_SIZE,
+) -> tuple[GvasHeader, bytes]:
+    """Encode a JSON dump of a GvasFile straight to GVAS bytes.
+
+    Equivalent to ``GvasFile.load(load(path)).write(custom_properties)``,
+    except that the document is parsed incrementally and written as it is
+    read: struct properties are walked property by property, and maps and
+    struct arrays an element at a time, so only one element of the tree is
+    decoded at once. Properties decoded by ``custom_properties`` and any
+    property not laid out the way ``dump`` writes it are decoded whole.
+    The file is memory-mapped and decoded ``window_size`` bytes at a time.
+    """
+    with open(path, "rb") as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    with data:
+        cursor = _JsonCursor(data, window_size)
+        writer = FArchiveWriter(custom_properties)
+        header = None
+        trailer = b""
+        for key in cursor.keys():
+            if key == "header":
+                header = GvasHeader.load(cursor.value())
+                header.write(writer)
+            elif key == "properties":
+                if header is None:
+                    raise ValueError("header must come before properties")
+                _stream_properties(cursor, writer, "")
+            elif key == "trailer":
+                trailer = base64.b64decode(cursor.value())
+            else:
+                cursor.value()
+    if header is None:
+        raise ValueError("missing header")
+    writer.write(trailer)
+    return header, writer.bytes()
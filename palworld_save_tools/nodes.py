@@ -0,0 +1,317 @@
+from collections.abc import Mapping, MutableMapping
+from typing import TYPE_CHECKING, Any, Iterator, Optional
+
+
+class Node(MutableMapping):
+    """Property tree node storing its keys in slots instead of a dict.
+
+    Built by ``CompactFArchiveReader`` in place of the plain dicts
+    ``FArchiveReader`` returns, and usable wherever those are: the fixed keys
+    of each node type are slots, iterated in the same order as the dict's,
+    and any other key is kept in a dict of its own that is only created when
+    first needed. Nodes compare equal to dicts with the same items and are
+    dumped to the same JSON.
+
+    Slots are named after their key, with a trailing underscore for keys
+    that would shadow a mapping method (``values_`` holds ``"values"``).
+    """
+
+    __slots__ = ("_extra",)
+    _extra: Optional[dict[str, Any]]
+    # Key -> slot name, in iteration order
+    _slots: dict[str, str] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        names = cls.__dict__.get("__slots__")
+        if not names:
+            return
+        slots = dict(cls._slots)
+        for name in names:
+            slots[name[:-1] if name.endswith("_") else name] = name
+        cls._slots = slots
+        # __init__ and to_dict are generated to assign and read each slot in
+        # turn, as the dict literals they replace do; nodes are created and
+        # dumped by the hundred thousand. Each class declares the generated
+        # __init__'s signature for type checkers
+        args = ", ".join(slots)
+        assign = "".join(f"    self.{name} = {key}\n" for key, name in slots.items())
+        items = ", ".join(f"{key!r}: self.{name}" for key, name in slots.items())
+        namespace: dict[str, Any] = {}
+        exec(
+            f"def __init__(self, {args}):\n{assign}    self._extra = None\n"
+            "def to_dict(self):\n"
+            "    try:\n"
+            f"        d = {{{items}}}\n"
+            "    except AttributeError:\n"
+            "        return dict(self.items())\n"
+            "    if self._extra is not None:\n"
+            "        d.update(self._extra)\n"
+            "    return d\n",
+            namespace,
+        )
+        cls.__init__ = namespace["__init__"]  # type: ignore[misc]
+        cls.to_dict = namespace["to_dict"]  # type: ignore[method-assign]
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the items as a plain dict, without copying nested nodes."""
+        return dict(self.items())
+
+    def __getitem__(self, key: str) -> Any:
+        name = self._slots.get(key)
+        if name is not None:
+            try:
+                return getattr(self, name)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        name = self._slots.get(key)
+        if name is not None:
+            return getattr(self, name, default)
+        if self._extra is None:
+            return default
+        return self._extra.get(key, default)
+
+    def __contains__(self, key: object) -> bool:
+        name = self._slots.get(key)  # type: ignore[call-overload]
+        if name is not None:
+            return hasattr(self, name)
+        return self._extra is not None and key in self._extra
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        name = self._slots.get(key)
+        if name is not None:
+            setattr(self, name, value)
+        elif self._extra is None:
+            self._extra = {key: value}
+        else:
+            self._extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        name = self._slots.get(key)
+        if name is not None:
+            try:
+                delattr(self, name)
+            except AttributeError:
+                raise KeyError(key) from None
+        elif self._extra is None:
+            raise KeyError(key)
+        else:
+            del self._extra[key]
+
+    def __iter__(self) -> Iterator[str]:
+        for key, name in self._slots.items():
+            if hasattr(self, name):
+                yield key
+        if self._extra is not None:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Node):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, Mapping):
+            return self.to_dict() == dict(other.items())
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def copy(self) -> dict[str, Any]:
+        return self.to_dict()
+
+    def __repr__(self) -> str:
+        return "%s(%r)" % (type(self).__name__, self.to_dict())
+
+
+class IntProp(Node):
+    """Int, UInt16, UInt32, UInt64, Int64 and FixedPoint64 properties."""
+
+    __slots__ = ("id", "value", "type")
+
+    if TYPE_CHECKING:
+
+        def __init__(self, id: Any, value: Any, type: Any) -> None: ...
+
+
+class FloatProp(Node):
+    __slots__ = ("id", "value", "type")
+
+    if TYPE_CHECKING:
+
+        def __init__(self, id: Any, value: Any, type: Any) -> None: ...
+
+
+class StrProp(Node):
+    """Str and Name properties."""
+
+    __slots__ = ("id", "value", "type")
+
+    if TYPE_CHECKING:
+
+        def __init__(self, id: Any, value: Any, type: Any) -> None: ...
+
+
+class BoolProp(Node):
+    __slots__ = ("value", "id", "type")
+
+    if TYPE_CHECKING:
+
+        def __init__(self, value: Any, id: Any, type: Any) -> None: ...
+
+
+class EnumValue(Node):
+    """Value of Enum and Byte properties."""
+
+    __slots__ = ("type", "value")
+
+    if TYPE_CHECKING:
+
+        def __init__(self, type: Any, value: Any) -> None: ...
+
+
+class EnumProp(Node):
+    """Enum and Byte properties, the value being an ``EnumValue``."""
+
+    __slots__ = ("id", "value", "type")
+
+    if TYPE_CHECKING:
+
+        def __init__(self, id: Any, value: Any, type: Any) -> None: ...
+
+
+class StructProp(Node):
+    __slots__ = ("struct_type", "struct_id", "id", "value", "type")
+
+    if TYPE_CHECKING:
+
+        def __init__(
+            self, struct_type: Any, struct_id: Any, id: Any, value: Any, type: Any
+        ) -> None: ...
+
+
+class ArrayProp(Node):
+    __slots__ = ("array_type", "id", "value", "type")
+
+    if TYPE_CHECKING:
+
+        def __init__(self, array_type: Any, id: Any, value: Any, type: Any) -> None: ...
+
+
+class ArrayValue(Node):
+    """Value of arrays of anything but structs."""
+
+    __slots__ = ("values_",)
+
+    if TYPE_CHECKING:
+
+        def __init__(self, values: Any) -> None: ...
+
+
+class StructArrayValue(Node):
+    __slots__ = ("prop_name", "prop_type", "values_", "type_name", "id")
+
+    if TYPE_CHECKING:
+
+        def __init__(
+            self, prop_name: Any, prop_type: Any, values: Any, type_name: Any, id: Any
+        ) -> None: ...
+
+
+class MapProp(Node):
+    __slots__ = (
+        "key_type",
+        "value_type",
+        "key_struct_type",
+        "value_struct_type",
+        "id",
+        "value",
+        "type",
+    )
+
+    if TYPE_CHECKING:
+
+        def __init__(
+            self,
+            key_type: Any,
+            value_type: Any,
+            key_struct_type: Any,
+            value_struct_type: Any,
+            id: Any,
+            value: Any,
+            type: Any,
+        ) -> None: ...
+
+
+class MapEntry(Node):
+    __slots__ = ("key", "value")
+
+    if TYPE_CHECKING:
+
+        def __init__(self, key: Any, value: Any) -> None: ...
+
+
+class SetProp(Node):
+    __slots__ = ("set_type", "id", "value", "type")
+
+    if TYPE_CHECKING:
+
+        def __init__(self, set_type: Any, id: Any, value: Any, type: Any) -> None: ...
+
+
+class Vector(Node):
+    __slots__ = ("x", "y", "z")
+
+    if TYPE_CHECKING:
+
+        def __init__(self, x: Any, y: Any, z: Any) -> None: ...
+
+
+class Quat(Node):
+    __slots__ = ("x", "y", "z", "w")
+
+    if TYPE_CHECKING:
+
+        def __init__(self, x: Any, y: Any, z: Any, w: Any) -> None: ...
+
+
+class LinearColor(Node):
+    __slots__ = ("r", "g", "b", "a")
+
+    if TYPE_CHECKING:
+
+        def __init__(self, r: Any, g: Any, b: Any, a: Any) -> None: ...
+
+
+class Color(Node):
+    __slots__ = ("b", "g", "r", "a")
+
+    if TYPE_CHECKING:
+
+        def __init__(self, b: Any, g: Any, r: Any, a: Any) -> None: ...
+
+
+NODE_TYPES: tuple[type[Node], ...] = (
+    IntProp,
+    FloatProp,
+    StrProp,
+    BoolProp,
+    EnumValue,
+    EnumProp,
+    StructProp,
+    ArrayProp,
+    ArrayValue,
+    StructArrayValue,
+    MapProp,
+    MapEntry,
+    SetProp,
+    Vector,
+    Quat,
+    LinearColor,
+    Color,
+)
@@ -1,6 +1,10 @@
+import mmap
 import sys
+import zlib
+from typing import Optional, Union
+
 from palworld_save_tools.compressor import Compressor
-from palworld_save_tools.compressor.oozlib import OozLib
+from palworld_save_tools.compressor.oozlib import OodleCompressor, OodleLevel, OozLib
 from palworld_save_tools.compressor.zlib import Zlib
 from palworld_save_tools.compressor.enums import SaveType
 
@@ -43,7 +47,49 @@ def decompress_sav_to_gvas(data: bytes, debug: bool = False) -> tuple[bytes, int
             raise Exception("Unknown save format")
 
 
-def compress_gvas_to_sav(data: bytes, save_type: int, debug: bool = False) -> bytes:
+def decompress_sav_file(
+    path: str, debug: bool = False
+) -> tuple[Union[bytes, mmap.mmap], int]:
+    """Decompress the .sav at ``path`` without reading it into memory first.
+
+    Zlib saves are streamed from the file in fixed-size chunks and inflated
+    straight into one anonymous mmap sized from the header, which
+    FArchiveReader parses in place. Oodle saves are memory-mapped and
+    returned as the bytes produced by libooz.
+    """
+    configure_logging(debug)
+    with open(path, "rb") as f:
+        format = compressor.check_sav_format(f.read(12))
+        f.seek(0)
+
+        if format is None:
+            raise Exception("Unknown save format")
+
+        match format:
+            case SaveType.PLZ | SaveType.CNK:
+                return z_lib.decompress_file(f)
+            case SaveType.PLM:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    return oozlib.decompress(data)
+            case _:
+                raise Exception("Unknown save format")
+
+
+def compress_gvas_to_sav(
+    data: bytes,
+    save_type: int,
+    debug: bool = False,
+    level: Optional[int] = None,
+    workers: int = 1,
+    oodle_compressor: Optional[int] = None,
+) -> bytes:
+    """Compress GVAS data into a .sav.
+
+    ``level`` is the zlib level (0-9) for PLZ saves or an OodleLevel for PLM
+    saves, and ``oodle_compressor`` an OodleCompressor for PLM saves; None
+    picks the codec's default. ``workers`` is the number of threads used to deflate PLZ
+    saves (0 for every core).
+    """
     configure_logging(debug)
     format = compressor.check_savtype_format(save_type)
 
@@ -52,6 +98,20 @@ def compress_gvas_to_sav(data: bytes, save_type: int, debug: bool = False) -> by
 
     match format:
         case SaveType.PLZ | SaveType.CNK:
-            return z_lib.compress(data, save_type)
+            return z_lib.compress(
+                data,
+                save_type,
+                level=zlib.Z_DEFAULT_COMPRESSION if level is None else level,
+                workers=workers,
+            )
         case SaveType.PLM:
-            return oozlib.compress(data, save_type)
+            return oozlib.compress(
+                data,
+                save_type,
+                compressor=(
+                    OodleCompressor.Mermaid
+                    if oodle_compressor is None
+                    else oodle_compressor
+                ),
+                level=OodleLevel.Normal if level is None else level,
+            )
@@ -0,0 +1,176 @@
+import os
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional, Union
+
+from palworld_save_tools.archive import (
+    CompactFArchiveReader,
+    DecodePlan,
+    DeferringFArchiveReader,
+    FArchiveReader,
+    FArchiveWriter,
+    LazyProperties,
+)
+from palworld_save_tools.nodes import Node
+
+# Deferred custom properties are sent to the workers in chunks of about this
+# many bytes, so small blobs such as character RawData do not each pay for a
+# round trip to a worker process
+DECODE_CHUNK_SIZE = 1 << 20
+
+# Custom property values are sent to the workers in about this many chunks
+# per worker, to even out chunks that take longer than others to encode
+ENCODE_CHUNKS_PER_WORKER = 4
+
+# (type_name, size, path, value bytes) of one deferred custom property
+_Span = tuple[str, int, str, bytes]
+
+
+def resolve_workers(workers: Optional[int]) -> int:
+    """``None`` or ``<= 0`` means one worker per core, as for parallel_compress."""
+    if workers is None or workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+def _gil_enabled() -> bool:
+    # sys._is_gil_enabled only exists on 3.13+, where free-threaded builds
+    # can run the decoders on threads without pickling anything
+    return getattr(sys, "_is_gil_enabled", lambda: True)()
+
+
+def _executor(workers: int) -> Executor:
+    if _gil_enabled():
+        return ProcessPoolExecutor(max_workers=workers)
+    return ThreadPoolExecutor(max_workers=workers)
+
+
+def _decode_chunk(
+    type_hints: dict[str, str],
+    custom_properties: dict[str, tuple[Callable, Callable]],
+    allow_nan: bool,
+    compact: bool,
+    spans: list[_Span],
+) -> list[dict[str, Any]]:
+    values = []
+    plan = DecodePlan.compile(type_hints, custom_properties)
+    reader_class = CompactFArchiveReader if compact else FArchiveReader
+    for type_name, size, path, data in spans:
+        reader = reader_class(
+            data, type_hints, custom_properties, allow_nan=allow_nan, plan=plan
+        )
+        values.append(reader.property(type_name, size, path))
+    return values
+
+
+def decode_deferred(reader: DeferringFArchiveReader, workers: int) -> None:
+    """Run the custom decoders on every property ``reader`` deferred.
+
+    The spans are split into chunks decoded concurrently, on a process pool
+    (or a thread pool on free-threaded Python), and each result is filled
+    into its placeholder so the tree ends up as a serial read would leave
+    it. Custom decoders must be picklable, i.e. module-level functions.
+    """
+    deferred = reader.deferred
+    if not deferred:
+        return
+    total_size = sum(d.end - d.start for d in deferred)
+    # At least one chunk per worker when the spans allow it
+    chunk_size = min(DECODE_CHUNK_SIZE, -(-total_size // workers))
+    chunks: list[list[_Span]] = [[]]
+    chunk_bytes = 0
+    for d in deferred:
+        if chunk_bytes >= chunk_size:
+            chunks.append([])
+            chunk_bytes = 0
+        chunks[-1].append((d.type_name, d.size, d.path, reader.data[d.start : d.end]))
+        chunk_bytes += d.end - d.start
+    options = (
+        reader.type_hints,
+        reader.custom_properties,
+        reader.allow_nan,
+        isinstance(reader, CompactFArchiveReader),
+    )
+    if workers <= 1 or len(chunks) == 1:
+        results = [_decode_chunk(*options, chunk) for chunk in chunks]
+    else:
+        with _executor(min(workers, len(chunks))) as executor:
+            futures = [
+                executor.submit(_decode_chunk, *options, chunk) for chunk in chunks
+            ]
+            results = [future.result() for future in futures]
+    placeholders = iter(deferred)
+    for values in results:
+        for value in values:
+            placeholder = next(placeholders).placeholder
+            placeholder.update(value)
+    reader.deferred = []
+
+
+def _custom_values(
+    value: Any,
+    custom_properties: dict[str, tuple[Callable, Callable]],
+    found: list[Union[dict[str, Any], Node]],
+) -> None:
+    # Nested custom properties are left to the encoder of the outermost one
+    if isinstance(value, (dict, Node)):
+        if value.get("custom_type") in custom_properties:
+            found.append(value)
+            return
+        for item in value.values():
+            _custom_values(item, custom_properties, found)
+    elif isinstance(value, list):
+        for item in value:
+            if isinstance(item, (dict, list, LazyProperties, Node)):
+                _custom_values(item, custom_properties, found)
+    elif isinstance(value, LazyProperties):
+        # Properties never accessed since a lazy read are copied verbatim
+        for key in value:
+            if value.is_loaded(key):
+                _custom_values(value[key], custom_properties, found)
+
+
+def _encode_chunk(
+    custom_properties: dict[str, tuple[Callable, Callable]],
+    properties: list[Union[dict[str, Any], Node]],
+) -> list[tuple[bytes, int]]:
+    encoded = []
+    for property in properties:
+        writer = FArchiveWriter(custom_properties)
+        size = writer.property_inner(property["type"], property)
+        encoded.append((writer.bytes(), size))
+    return encoded
+
+
+def encode_custom_properties(
+    properties: dict[str, Any],
+    custom_properties: dict[str, tuple[Callable, Callable]],
+    workers: int,
+) -> dict[int, tuple[bytes, int]]:
+    """Encode every custom property value in ``properties`` concurrently.
+
+    Returns the encoded bytes and size of each value keyed by ``id()`` of
+    its dict, for a PreencodedFArchiveWriter writing the same tree while
+    it is still alive.
+    """
+    found: list[Union[dict[str, Any], Node]] = []
+    _custom_values(properties, custom_properties, found)
+    if not found:
+        return {}
+    chunk_count = min(len(found), workers * ENCODE_CHUNKS_PER_WORKER)
+    chunk_size = -(-len(found) // chunk_count)
+    chunks = [found[i : i + chunk_size] for i in range(0, len(found), chunk_size)]
+    if workers <= 1 or len(chunks) == 1:
+        results = [_encode_chunk(custom_properties, chunk) for chunk in chunks]
+    else:
+        with _executor(min(workers, len(chunks))) as executor:
+            futures = [
+                executor.submit(_encode_chunk, custom_properties, chunk)
+                for chunk in chunks
+            ]
+            results = [future.result() for future in futures]
+    preencoded = {}
+    for chunk, encoded in zip(chunks, results):
+        for property, value in zip(chunk, encoded):
+            preencoded[id(property)] = value
+    return preencoded
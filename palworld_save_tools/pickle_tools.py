@@ -0,0 +1,86 @@
+import copyreg
+import io
+import pickle
+import uuid
+from collections.abc import Mapping
+from typing import Any
+
+from palworld_save_tools.archive import UUID, LazyProperties
+from palworld_save_tools.nodes import NODE_TYPES, Node
+
+# Highest protocol every supported Python can read; 5 stores large bytes
+# blobs without copying them into the pickle stream twice
+PICKLE_PROTOCOL = 5
+
+# The only globals a dump of a GvasFile tree refers to; anything else in a
+# file is rejected instead of being imported and called
+_ALLOWED_GLOBALS = {
+    ("builtins", "dict"),
+    ("palworld_save_tools.archive", "UUID"),
+    ("uuid", "UUID"),
+}
+
+
+def _reduce_uuid(obj: UUID):
+    # Only the raw bytes, not the cached str/uuid.UUID forms
+    return UUID, (bytes(obj.raw_bytes),)
+
+
+def _reduce_mapping(obj: Mapping):
+    # Lazily decoded property maps are loaded back as plain dicts
+    return dict, (dict(obj),)
+
+
+def _reduce_node(obj: Node):
+    # As are compact nodes
+    return dict, (obj.to_dict(),)
+
+
+_DISPATCH_TABLE = copyreg.dispatch_table.copy()
+_DISPATCH_TABLE[UUID] = _reduce_uuid
+_DISPATCH_TABLE[LazyProperties] = _reduce_mapping
+for _node_type in NODE_TYPES:
+    _DISPATCH_TABLE[_node_type] = _reduce_node
+
+
+class _Unpickler(pickle.Unpickler):
+    def find_class(self, module: str, name: str) -> Any:
+        if (module, name) not in _ALLOWED_GLOBALS:
+            raise pickle.UnpicklingError(f"{module}.{name} is not allowed")
+        if module == "uuid":
+            return uuid.UUID
+        if name == "dict":
+            return dict
+        return UUID
+
+
+def dumps(data) -> bytes:
+    """Serialize a ``GvasFile.dump()`` tree to the pickle interchange format.
+
+    Unlike JSON, bytes, UUIDs, tuples and NaN/Inf floats are stored as-is,
+    so ``loads`` returns exactly the tree that was dumped.
+    """
+    buf = io.BytesIO()
+    pickler = pickle.Pickler(buf, protocol=PICKLE_PROTOCOL)
+    pickler.dispatch_table = _DISPATCH_TABLE
+    pickler.dump(data)
+    return buf.getvalue()
+
+
+def loads(data: bytes):
+    """Deserialize a tree written by ``dumps``.
+
+    Only the types ``dumps`` emits can be loaded, so a crafted file cannot
+    run code, but it should still only be used between our own tools.
+    """
+    return _Unpickler(io.BytesIO(data)).load()
+
+
+def dump(data, path):
+    with open(path, "wb") as f:
+        f.write(dumps(data))
+
+
+def load(path):
+    with open(path, "rb") as f:
+        return loads(f.read())
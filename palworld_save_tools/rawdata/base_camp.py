@@ -1,16 +1,32 @@
-from typing import Any, Sequence
+from typing import Any, Sequence, Union
 
 from palworld_save_tools.archive import *
+from palworld_save_tools.rawdata.schema import Schema
+
+SCHEMA = Schema(
+    [
+        ("id", "guid"),
+        ("name", "fstring"),
+        ("state", "byte"),
+        ("transform", "ftransform"),
+        ("area_range", "float"),
+        ("group_id_belong_to", "guid"),
+        ("fast_travel_local_transform", "ftransform"),
+        ("owner_map_object_instance_id", "guid"),
+        ("trailing_bytes", "bytes[4]"),
+    ],
+    strict=True,
+)
 
 
 def decode(
-    reader: FArchiveReader, type_name: str, size: int, path: str
+    reader: FArchiveReader,
+    type_name: str,
+    size: int,
+    path: Union[str, DecodePlan],
 ) -> dict[str, Any]:
-    if type_name != "ArrayProperty":
-        raise Exception(f"Expected ArrayProperty, got {type_name}")
-    value = reader.property(type_name, size, path, nested_caller_path=path)
-    data_bytes = value["value"]["values"]
-    value["value"] = decode_bytes(reader, data_bytes)
+    value, data_reader = reader.byte_array_reader(type_name, size, path)
+    value["value"] = SCHEMA.read(data_reader)
     return value
 
 
@@ -18,20 +34,7 @@ def decode_bytes(
     parent_reader: FArchiveReader, b_bytes: Sequence[int]
 ) -> dict[str, Any]:
     reader = parent_reader.internal_copy(coerce_bytes(b_bytes), debug=False)
-    data = {
-        "id": reader.guid(),
-        "name": reader.fstring(),
-        "state": reader.byte(),
-        "transform": reader.ftransform(),
-        "area_range": reader.float(),
-        "group_id_belong_to": reader.guid(),
-        "fast_travel_local_transform": reader.ftransform(),
-        "owner_map_object_instance_id": reader.guid(),
-    }
-    data["trailing_bytes"] = reader.byte_list(4)
-    if not reader.eof():
-        raise Exception("Warning: EOF not reached")
-    return data
+    return SCHEMA.read(reader)
 
 
 def encode(
@@ -47,14 +50,6 @@ def encode(
 
 def encode_bytes(p: dict[str, Any]) -> bytes:
     writer = FArchiveWriter()
-    writer.guid(p["id"])
-    writer.fstring(p["name"])
-    writer.byte(p["state"])
-    writer.ftransform(p["transform"])
-    writer.float(p["area_range"])
-    writer.guid(p["group_id_belong_to"])
-    writer.ftransform(p["fast_travel_local_transform"])
-    writer.guid(p["owner_map_object_instance_id"])
-    writer.write(coerce_bytes(p["trailing_bytes"]))
+    SCHEMA.write(writer, p)
     encoded_bytes = writer.bytes()
     return encoded_bytes
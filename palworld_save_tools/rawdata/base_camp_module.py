@@ -1,8 +1,13 @@
-from typing import Any, Sequence
+from typing import Any, Sequence, Union
 
 from loguru import logger
 
-from palworld_save_tools.archive import FArchiveReader, FArchiveWriter, coerce_bytes
+from palworld_save_tools.archive import (
+    DecodePlan,
+    FArchiveReader,
+    FArchiveWriter,
+    coerce_bytes,
+)
 from palworld_save_tools.rawdata.common import (
     pal_item_and_num_read,
     pal_item_and_slot_writer,
@@ -20,7 +25,10 @@ NO_OP_TYPES = [
 
 
 def decode(
-    reader: FArchiveReader, type_name: str, size: int, path: str
+    reader: FArchiveReader,
+    type_name: str,
+    size: int,
+    path: Union[str, DecodePlan],
 ) -> dict[str, Any]:
     if type_name != "MapProperty":
         raise Exception(f"Expected MapProperty, got {type_name}")
@@ -86,7 +94,7 @@ def decode_bytes(
         try:
             data["passive_effects"] = reader.tarray(module_passive_effect_reader)
         except Exception as e:
-            reader.data.seek(0)
+            reader.seek(0)
             logger.debug(
                 f"Failed to decode passive effect, please report this: {e} ({bytes(b_bytes)!r})"
             )
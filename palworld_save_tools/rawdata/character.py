@@ -1,16 +1,16 @@
-from typing import Any, Sequence
+from typing import Any, Sequence, Union
 
 from palworld_save_tools.archive import *
 
 
 def decode(
-    reader: FArchiveReader, type_name: str, size: int, path: str
+    reader: FArchiveReader,
+    type_name: str,
+    size: int,
+    path: Union[str, DecodePlan],
 ) -> dict[str, Any]:
-    if type_name != "ArrayProperty":
-        raise Exception(f"Expected ArrayProperty, got {type_name}")
-    value = reader.property(type_name, size, path, nested_caller_path=path)
-    char_bytes = value["value"]["values"]
-    value["value"] = decode_bytes(reader, char_bytes)
+    value, data_reader = reader.byte_array_reader(type_name, size, path)
+    value["value"] = read_raw_data(data_reader)
     return value
 
 
@@ -18,6 +18,10 @@ def decode_bytes(
     parent_reader: FArchiveReader, char_bytes: Sequence[int]
 ) -> dict[str, Any]:
     reader = parent_reader.internal_copy(coerce_bytes(char_bytes), debug=False)
+    return read_raw_data(reader)
+
+
+def read_raw_data(reader: FArchiveReader) -> dict[str, Any]:
     char_data = {
         "object": reader.properties_until_end(),
         "unknown_bytes": reader.byte_list(4),
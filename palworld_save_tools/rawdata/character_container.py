@@ -1,37 +1,45 @@
-from typing import Any, Sequence
+from typing import Any, Sequence, Union
 
 from loguru import logger
 from palworld_save_tools.archive import *
+from palworld_save_tools.rawdata.schema import IF_REMAINING, Schema
+
+SCHEMA = Schema(
+    [
+        ("player_uid", "guid"),
+        ("instance_id", "guid"),
+        ("permission_tribe_id", "byte"),
+        ("unknown_bytes", "bytes[]", IF_REMAINING),
+    ]
+)
 
 
 def decode(
-    reader: FArchiveReader, type_name: str, size: int, path: str
+    reader: FArchiveReader,
+    type_name: str,
+    size: int,
+    path: Union[str, DecodePlan],
 ) -> dict[str, Any]:
-    if type_name != "ArrayProperty":
-        raise Exception(f"Expected ArrayProperty, got {type_name}")
-    value = reader.property(type_name, size, path, nested_caller_path=path)
-    data_bytes = value["value"]["values"]
-    value["value"] = decode_bytes(reader, data_bytes)
+    value, data_reader = reader.byte_array_reader(type_name, size, path)
+    value["value"] = read_raw_data(data_reader)
     return value
 
 
 def decode_bytes(
     parent_reader: FArchiveReader, c_bytes: Sequence[int]
 ) -> Optional[dict[str, Any]]:
-    if len(c_bytes) == 0:
-        return None
     reader = parent_reader.internal_copy(coerce_bytes(c_bytes), debug=False)
-    data = {
-        "player_uid": reader.guid(),
-        "instance_id": reader.guid(),
-        "permission_tribe_id": reader.byte(),
-    }
-    if not reader.eof():
-        unknown_bytes = reader.read_to_end()
+    return read_raw_data(reader)
+
+
+def read_raw_data(reader: FArchiveReader) -> Optional[dict[str, Any]]:
+    if reader.eof():
+        return None
+    data = SCHEMA.read(reader)
+    if "unknown_bytes" in data:
         logger.debug(
-            f"Unknown data in character container: {' '.join(f'{b:02x}' for b in unknown_bytes)}"
+            f"Unknown data in character container: {' '.join(f'{b:02x}' for b in data['unknown_bytes'])}"
         )
-        data["unknown_bytes"] = unknown_bytes
     return data
 
 
@@ -50,10 +58,6 @@ def encode_bytes(p: dict[str, Any]) -> bytes:
     if p is None:
         return bytes()
     writer = FArchiveWriter()
-    writer.guid(p["player_uid"])
-    writer.guid(p["instance_id"])
-    writer.byte(p["permission_tribe_id"])
-    if "unknown_bytes" in p:
-        writer.write(coerce_bytes(p["unknown_bytes"]))
+    SCHEMA.write(writer, p)
     encoded_bytes = writer.bytes()
     return encoded_bytes
@@ -1,17 +1,17 @@
-from typing import Any, Sequence
+from typing import Any, Sequence, Union
 
 from loguru import logger
 from palworld_save_tools.archive import *
 
 
 def decode(
-    reader: FArchiveReader, type_name: str, size: int, path: str
+    reader: FArchiveReader,
+    type_name: str,
+    size: int,
+    path: Union[str, DecodePlan],
 ) -> dict[str, Any]:
-    if type_name != "ArrayProperty":
-        raise Exception(f"Expected ArrayProperty, got {type_name}")
-    value = reader.property(type_name, size, path, nested_caller_path=path)
-    data_bytes = value["value"]["values"]
-    value["value"] = decode_bytes(reader, data_bytes)
+    value, data_reader = reader.byte_array_reader(type_name, size, path)
+    value["value"] = read_raw_data(data_reader)
     return value
 
 
@@ -30,9 +30,13 @@ def connect_info_item_writer(writer: FArchiveWriter, properties: dict[str, Any])
 def decode_bytes(
     parent_reader: FArchiveReader, c_bytes: Sequence[int]
 ) -> Optional[dict[str, Any]]:
-    if len(c_bytes) == 0:
-        return {"values": []}
     reader = parent_reader.internal_copy(coerce_bytes(c_bytes), debug=False)
+    return read_raw_data(reader)
+
+
+def read_raw_data(reader: FArchiveReader) -> Optional[dict[str, Any]]:
+    if reader.eof():
+        return {"values": []}
     data: dict[str, Any] = {
         "supported_level": reader.i32(),
         "connect": {
@@ -1,11 +1,14 @@
-from typing import Any
+from typing import Any, Union
 
 from loguru import logger
 from palworld_save_tools.archive import *
 
 
 def decode(
-    reader: FArchiveReader, type_name: str, size: int, path: str
+    reader: FArchiveReader,
+    type_name: str,
+    size: int,
+    path: Union[str, DecodePlan],
 ) -> dict[str, Any]:
     if type_name != "ArrayProperty":
         raise Exception(f"Expected ArrayProperty, got {type_name}")
@@ -1,27 +1,36 @@
-from typing import Any, Optional, Sequence
+from typing import Any, Optional, Sequence, Union
 
 from loguru import logger
-from palworld_save_tools.archive import FArchiveReader, FArchiveWriter, coerce_bytes
+from palworld_save_tools.archive import (
+    DecodePlan,
+    FArchiveReader,
+    FArchiveWriter,
+    coerce_bytes,
+)
 
 
 def decode(
-    reader: FArchiveReader, type_name: str, size: int, path: str
+    reader: FArchiveReader,
+    type_name: str,
+    size: int,
+    path: Union[str, DecodePlan],
 ) -> dict[str, Any]:
-    if type_name != "ArrayProperty":
-        raise Exception(f"Expected ArrayProperty, got {type_name}")
-    value = reader.property(type_name, size, path, nested_caller_path=path)
-    data_bytes = value["value"]["values"]
-    value["value"] = decode_bytes(reader, data_bytes)
+    value, data_reader = reader.byte_array_reader(type_name, size, path)
+    value["value"] = read_raw_data(data_reader)
     return value
 
 
 def decode_bytes(
     parent_reader: FArchiveReader, c_bytes: Sequence[int]
 ) -> Optional[dict[str, Any]]:
-    if len(c_bytes) == 0:
+    reader = parent_reader.internal_copy(coerce_bytes(c_bytes), debug=False)
+    return read_raw_data(reader)
+
+
+def read_raw_data(reader: FArchiveReader) -> Optional[dict[str, Any]]:
+    if reader.eof():
         return None
-    buf = coerce_bytes(c_bytes)
-    reader = parent_reader.internal_copy(buf, debug=False)
+    start = reader.tell()
     data: dict[str, Any] = {}
     data["type"] = "unknown"
     data["id"] = {
@@ -32,7 +41,7 @@ def decode_bytes(
     egg_data = try_read_egg(reader)
     if isinstance(egg_data, dict):
         data |= egg_data
-    elif (reader.size - reader.data.tell()) == 12:
+    elif (reader.size - reader.tell()) == 12:
         data["type"] = "armor"
         data["leading_bytes"] = reader.byte_list(4)
         data["durability"] = reader.float()
@@ -40,7 +49,7 @@ def decode_bytes(
         if not reader.eof():
             raise Exception("Warning: EOF not reached")
     else:
-        cur_pos = reader.data.tell()
+        cur_pos = reader.tell()
         temp_data: dict[str, Any] = {"type": "weapon"}
         try:
             temp_data["leading_bytes"] = reader.byte_list(4)
@@ -53,15 +62,15 @@ def decode_bytes(
             data |= temp_data
         except Exception as e:
             logger.debug(
-                f"Failed to parse weapon data, continuing as raw data {buf!r}: {e}"
+                f"Failed to parse weapon data, continuing as raw data {reader.data[start : reader.size]!r}: {e}"
             )
-            reader.data.seek(cur_pos)
+            reader.seek(cur_pos)
             data["trailer"] = reader.read_to_end()
     return data
 
 
 def try_read_egg(reader: FArchiveReader) -> Optional[dict[str, Any]]:
-    cur_pos = reader.data.tell()
+    cur_pos = reader.tell()
     try:
         data: dict[str, Any] = {"type": "egg"}
         data["leading_bytes"] = reader.byte_list(4)
@@ -74,7 +83,7 @@ def try_read_egg(reader: FArchiveReader) -> Optional[dict[str, Any]]:
     except Exception as e:
         if e.args[0] == "Warning: EOF not reached":
             raise e
-        reader.data.seek(cur_pos)
+        reader.seek(cur_pos)
         return None
 
 
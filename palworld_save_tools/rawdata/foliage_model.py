@@ -1,16 +1,27 @@
-from typing import Any, Sequence
+from typing import Any, Sequence, Union
 
 from palworld_save_tools.archive import *
+from palworld_save_tools.rawdata.schema import Schema
+
+SCHEMA = Schema(
+    [
+        ("model_id", "fstring"),
+        ("foliage_preset_type", "byte"),
+        ("cell_coord", [("x", "i64"), ("y", "i64"), ("z", "i64")]),
+        ("trailing_bytes", "bytes[4]"),
+    ],
+    strict=True,
+)
 
 
 def decode(
-    reader: FArchiveReader, type_name: str, size: int, path: str
+    reader: FArchiveReader,
+    type_name: str,
+    size: int,
+    path: Union[str, DecodePlan],
 ) -> dict[str, Any]:
-    if type_name != "ArrayProperty":
-        raise Exception(f"Expected ArrayProperty, got {type_name}")
-    value = reader.property(type_name, size, path, nested_caller_path=path)
-    data_bytes = value["value"]["values"]
-    value["value"] = decode_bytes(reader, data_bytes)
+    value, data_reader = reader.byte_array_reader(type_name, size, path)
+    value["value"] = SCHEMA.read(data_reader)
     return value
 
 
@@ -18,18 +29,7 @@ def decode_bytes(
     parent_reader: FArchiveReader, b_bytes: Sequence[int]
 ) -> dict[str, Any]:
     reader = parent_reader.internal_copy(coerce_bytes(b_bytes), debug=False)
-    data: dict[str, Any] = {}
-    data["model_id"] = reader.fstring()
-    data["foliage_preset_type"] = reader.byte()
-    data["cell_coord"] = {
-        "x": reader.i64(),
-        "y": reader.i64(),
-        "z": reader.i64(),
-    }
-    data["trailing_bytes"] = reader.byte_list(4)
-    if not reader.eof():
-        raise Exception("Warning: EOF not reached")
-    return data
+    return SCHEMA.read(reader)
 
 
 def encode(
@@ -45,12 +45,6 @@ def encode(
 
 def encode_bytes(p: dict[str, Any]) -> bytes:
     writer = FArchiveWriter()
-
-    writer.fstring(p["model_id"])
-    writer.byte(p["foliage_preset_type"])
-    writer.i64(p["cell_coord"]["x"])
-    writer.i64(p["cell_coord"]["y"])
-    writer.i64(p["cell_coord"]["z"])
-    writer.write(coerce_bytes(p["trailing_bytes"]))
+    SCHEMA.write(writer, p)
     encoded_bytes = writer.bytes()
     return encoded_bytes
@@ -1,11 +1,125 @@
-from typing import Any, Sequence
+import math
+import struct
+from typing import Any, Sequence, Union
 
 from loguru import logger
 from palworld_save_tools.archive import *
 
+_SHORT_TO_DEGREES = 360.0 / 65536.0
+_DEGREES_TO_SHORT = 65536.0 / 360.0
+_MAX_VALUE_TO_SCALE = 1 << 52
+_MAX_SCALED_VALUE = 1 << 62
+_unpack_u16 = struct.Struct("H").unpack_from
+_unpack_u32 = struct.Struct("I").unpack_from
+_unpack_i32 = struct.Struct("i").unpack_from
+_unpack_float = struct.Struct("f").unpack_from
+_unpack_3f = struct.Struct("3f").unpack_from
+_unpack_3d = struct.Struct("3d").unpack_from
+_pack_short = struct.Struct("<BH").pack
+_pack_u32 = struct.Struct("I").pack
+_pack_3d = struct.Struct("3d").pack
+_pack_float_i32 = struct.Struct("fi").pack
+
+
+def _nonfinite_to_none(value: Optional[float]) -> Optional[float]:
+    if value is not None and (math.isnan(value) or math.isinf(value)):
+        return None
+    return value
+
+
+def _unpack_instance(data: bytes, allow_nan: bool = True) -> tuple:
+    """Decode one RawData blob into its fields, in _pack_instance's order.
+
+    Reads the same fields as FArchiveReader.compressed_short_rotator and
+    packed_vector(1), straight from ``data`` without a reader per blob.
+    """
+    offset = 16
+    rotator = []
+    for _ in range(3):
+        if data[offset]:
+            rotator.append(_unpack_u16(data, offset + 1)[0] * _SHORT_TO_DEGREES)
+            offset += 3
+        else:
+            rotator.append(0.0)
+            offset += 1
+    info = _unpack_u32(data, offset)[0]
+    offset += 4
+    bit_count = info & 63
+    if bit_count > 0:
+        size = (bit_count + 7) // 8
+        mask = (1 << bit_count) - 1
+        sign_bit = 1 << (bit_count - 1)
+        location = []
+        for _ in range(3):
+            v = int.from_bytes(data[offset : offset + size], "little") & mask
+            location.append((v & (sign_bit - 1)) - (v & sign_bit))
+            offset += size
+        if info >> 6:
+            location = [v / 1 for v in location]
+    elif info >> 6:
+        location = list(_unpack_3d(data, offset))
+        offset += 24
+    else:
+        location = list(_unpack_3f(data, offset))
+        offset += 12
+    scale_x = _unpack_float(data, offset)[0]
+    hp = _unpack_i32(data, offset + 4)[0]
+    offset += 8
+    if not allow_nan:
+        if bit_count == 0:
+            location = [_nonfinite_to_none(v) for v in location]
+        scale_x = _nonfinite_to_none(scale_x)
+    unknown_bytes = bytes(data[offset:]) if offset < len(data) else None
+    return (data[:16], *rotator, *location, scale_x, hp, unknown_bytes)
+
+
+def _pack_instance(
+    model_instance_id: bytes,
+    pitch: float,
+    yaw: float,
+    roll: float,
+    x: float,
+    y: float,
+    z: float,
+    scale_x: Optional[float],
+    hp: int,
+    unknown_bytes: Optional[bytes],
+) -> bytes:
+    """Encode the fields of one instance, the inverse of _unpack_instance.
+
+    Writes the same bytes as FArchiveWriter.compressed_short_rotator and
+    packed_vector(1), without a writer per blob.
+    """
+    parts = [model_instance_id]
+    for angle in (pitch, yaw, roll):
+        short = round(angle * _DEGREES_TO_SHORT) & 0xFFFF
+        parts.append(_pack_short(1, short) if short else b"\x00")
+    if max(abs(x), abs(y), abs(z)) < _MAX_SCALED_VALUE:
+        # With a scale factor of 1 the scaled and unscaled values match, only
+        # the flag differs
+        use_scaled_value = min(abs(x), abs(y), abs(z)) < _MAX_VALUE_TO_SCALE
+        ints = (int(x), int(y), int(z))
+        bit_count = max(FArchiveWriter.unreal_get_bits_needed(i) for i in ints)
+        parts.append(_pack_u32((1 << 6 if use_scaled_value else 0) | bit_count))
+        size = (bit_count + 7) // 8
+        for i in ints:
+            parts.append(i.to_bytes(size, "little", signed=True))
+    else:
+        parts.append(_pack_u32(1 << 6))
+        parts.append(_pack_3d(x, y, z))
+    if scale_x is None:
+        scale_x = float("nan")
+    parts.append(_pack_float_i32(scale_x, hp))
+    if unknown_bytes is not None:
+        parts.append(coerce_bytes(unknown_bytes))
+    return b"".join(parts)
+
 
 def decode(
-    reader: FArchiveReader, type_name: str, size: int, path: str
+    reader: FArchiveReader,
+    type_name: str,
+    size: int,
+    path: Union[str, DecodePlan],
 ) -> dict[str, Any]:
     if type_name != "ArrayProperty":
         raise Exception(f"Expected ArrayProperty, got {type_name}")
@@ -18,11 +132,20 @@ def decode(
 def decode_bytes(
     parent_reader: FArchiveReader, b_bytes: Sequence[int]
 ) -> dict[str, Any]:
-    reader = parent_reader.internal_copy(coerce_bytes(b_bytes), debug=False)
+    (
+        model_instance_id,
+        pitch,
+        yaw,
+        roll,
+        x,
+        y,
+        z,
+        scale_x,
+        hp,
+        unknown_bytes,
+    ) = _unpack_instance(coerce_bytes(b_bytes), parent_reader.allow_nan)
     data: dict[str, Any] = {}
-    data["model_instance_id"] = reader.guid()
-    pitch, yaw, roll = reader.compressed_short_rotator()
-    x, y, z = reader.packed_vector(1)
+    data["model_instance_id"] = UUID(model_instance_id)
     data["world_transform"] = {
         "rotator": {
             "pitch": pitch,
@@ -34,11 +157,10 @@ def decode_bytes(
             "y": y,
             "z": z,
         },
-        "scale_x": reader.float(),
+        "scale_x": scale_x,
     }
-    data["hp"] = reader.i32()
-    if not reader.eof():
-        unknown_bytes = reader.read_to_end()
+    data["hp"] = hp
+    if unknown_bytes is not None:
         logger.debug(
             f"Unknown data found in foliage model instance, length {len(unknown_bytes)}. Data: {' '.join(f'{b:02X}' for b in unknown_bytes)}"
         )
@@ -58,24 +180,24 @@ def encode(
 
 
 def encode_bytes(p: dict[str, Any]) -> bytes:
-    writer = FArchiveWriter()
-
-    writer.guid(p["model_instance_id"])
-    writer.compressed_short_rotator(
-        p["world_transform"]["rotator"]["pitch"],
-        p["world_transform"]["rotator"]["yaw"],
-        p["world_transform"]["rotator"]["roll"],
-    )
-    writer.packed_vector(
-        1,
-        p["world_transform"]["location"]["x"],
-        p["world_transform"]["location"]["y"],
-        p["world_transform"]["location"]["z"],
+    if isinstance(p["model_instance_id"], UUID):
+        model_instance_id = p["model_instance_id"].raw_bytes
+    else:
+        guid_writer = FArchiveWriter()
+        guid_writer.guid(p["model_instance_id"])
+        model_instance_id = guid_writer.bytes()
+    transform = p["world_transform"]
+    rotator = transform["rotator"]
+    location = transform["location"]
+    return _pack_instance(
+        model_instance_id,
+        rotator["pitch"],
+        rotator["yaw"],
+        rotator["roll"],
+        location["x"],
+        location["y"],
+        location["z"],
+        transform["scale_x"],
+        p["hp"],
+        p.get("unknown_bytes"),
     )
-    writer.float(p["world_transform"]["scale_x"])
-    writer.i32(p["hp"])
-    if "unknown_bytes" in p:
-        writer.write(coerce_bytes(p["unknown_bytes"]))
-
-    encoded_bytes = writer.bytes()
-    return encoded_bytes
@@ -1,4 +1,4 @@
-from typing import Sequence
+from typing import Sequence, Union
 
 from palworld_save_tools.archive import *
 
@@ -20,7 +20,10 @@ def player_info_writer(writer: FArchiveWriter, p: dict[str, Any]) -> None:
 
 
 def decode(
-    reader: FArchiveReader, type_name: str, size: int, path: str
+    reader: FArchiveReader,
+    type_name: str,
+    size: int,
+    path: Union[str, DecodePlan],
 ) -> dict[str, Any]:
     if type_name != "MapProperty":
         raise Exception(f"Expected MapProperty, got {type_name}")
@@ -71,12 +74,12 @@ def decode_bytes(
         }
         group_data |= guild
     if group_type == "EPalGroupType::IndependentGuild":
-        guild: dict[str, Any] = {
+        independent_guild: dict[str, Any] = {
             "base_camp_level": reader.i32(),
             "map_object_instance_ids_base_camp_points": reader.tarray(uuid_reader),
             "guild_name": reader.fstring(),
         }
-        group_data |= guild
+        group_data |= independent_guild
         indie = {
             "player_uid": reader.guid(),
             "guild_name_2": reader.fstring(),
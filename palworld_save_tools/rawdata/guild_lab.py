@@ -1,5 +1,10 @@
-from typing import Any, Optional, Sequence
-from palworld_save_tools.archive import FArchiveReader, FArchiveWriter, coerce_bytes
+from typing import Any, Optional, Sequence, Union
+from palworld_save_tools.archive import (
+    DecodePlan,
+    FArchiveReader,
+    FArchiveWriter,
+    coerce_bytes,
+)
 from palworld_save_tools.rawdata.common import (
     lab_research_rep_info_read,
     lab_research_rep_info_writer,
@@ -7,13 +12,13 @@ from palworld_save_tools.rawdata.common import (
 
 
 def decode(
-    reader: FArchiveReader, type_name: str, size: int, path: str
+    reader: FArchiveReader,
+    type_name: str,
+    size: int,
+    path: Union[str, DecodePlan],
 ) -> dict[str, Any]:
-    if type_name != "ArrayProperty":
-        raise Exception(f"Expected ArrayProperty, got {type_name}")
-    value = reader.property(type_name, size, path, nested_caller_path=path)
-    data_bytes = value["value"]["values"]
-    value["value"] = decode_bytes(reader, data_bytes)
+    value, data_reader = reader.byte_array_reader(type_name, size, path)
+    value["value"] = read_raw_data(data_reader)
     return value
 
 
@@ -21,6 +26,10 @@ def decode_bytes(
     parent_reader: FArchiveReader, m_bytes: Sequence[int]
 ) -> dict[str, Any]:
     reader = parent_reader.internal_copy(coerce_bytes(m_bytes), debug=False)
+    return read_raw_data(reader)
+
+
+def read_raw_data(reader: FArchiveReader) -> dict[str, Any]:
     data: dict[str, Any] = {}
     data["research_info"] = reader.tarray(lab_research_rep_info_read)
     data["current_research_id"] = reader.fstring()
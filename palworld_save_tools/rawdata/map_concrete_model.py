@@ -14,6 +14,7 @@ from palworld_save_tools.rawdata.common import (
     pal_item_booth_trade_info_read,
     pal_item_booth_trade_info_writer,
 )
+from palworld_save_tools.rawdata.schema import IF_REMAINING, Schema
 
 
 def pal_instance_id_reader(reader: FArchiveReader) -> dict[str, Any]:
@@ -857,6 +858,221 @@ MAP_OBJECT_NAME_TO_CONCRETE_MODEL_CLASS: dict[str, str] = {
 }
 
 
+# Concrete models made of plain fields only, read and written after the base
+# instance_id and model_instance_id; the rest are handled in decode_bytes and
+# encode_bytes
+CONCRETE_MODEL_SCHEMAS: dict[str, Schema] = {
+    "PalMapObjectCharacterTeamMissionModel": Schema(
+        [
+            ("mission_id", "fstring"),
+            ("state", "byte"),
+            ("start_time", "i64"),
+            ("unknown_bytes", "bytes[]"),
+        ]
+    ),
+    "PalMapObjectFarmSkillFruitsModel": Schema(
+        [
+            ("leading_bytes", "bytes[4]"),
+            ("skill_fruits_id", "fstring"),
+            ("current_state", "byte"),
+            ("progress_rate", "float"),
+            ("trailing_bytes", "bytes[20]"),
+        ]
+    ),
+    "PalMapObjectSupplyStorageModel": Schema(
+        [
+            ("created_at_real_time", "i64"),
+            ("trailing_bytes", "bytes[8]"),
+        ]
+    ),
+    "PalMapObjectPalBoothModel": Schema([("unknown_bytes", "bytes[]")]),
+    "PalMapObjectMultiHatchingEggModel": Schema([("unknown_bytes", "bytes[]")]),
+    "PalMapObjectEnergyStorageModel": Schema(
+        [
+            ("stored_energy_amount", "float"),
+            ("trailing_bytes", "bytes[8]"),
+        ]
+    ),
+    "PalMapObjectDeathDroppedCharacterModel": Schema(
+        [
+            ("stored_parameter_id", "guid"),
+            ("owner_player_uid", "guid"),
+            ("unknown_bytes", "bytes[]", IF_REMAINING),
+        ]
+    ),
+    "PalMapObjectConvertItemModel": Schema(
+        [
+            ("leading_bytes", "bytes[4]"),
+            ("current_recipe_id", "fstring"),
+            ("requested_product_num", "i32"),
+            ("remain_product_num", "i32"),
+            ("work_speed_additional_rate", "float"),
+            ("trailing_bytes", "bytes[8]"),
+        ]
+    ),
+    "PalMapObjectPickupItemOnLevelModel": Schema([("auto_picked_up", "u32_bool")]),
+    "PalMapObjectDropItemModel": Schema(
+        [
+            ("auto_picked_up", "u32_bool"),
+            ("pickupdable_player_uid", "guid"),
+            ("remove_pickup_guard_timer_handle", "i64"),
+            (
+                "item_id",
+                [
+                    ("static_id", "fstring"),
+                    (
+                        "dynamic_id",
+                        [
+                            ("created_world_id", "guid"),
+                            ("local_id_in_created_world", "guid"),
+                        ],
+                    ),
+                ],
+            ),
+            ("trailing_bytes", "bytes[4]"),
+        ]
+    ),
+    "PalMapObjectDeathPenaltyStorageModel": Schema(
+        [
+            ("auto_destroy_if_empty", "u32_bool"),
+            ("owner_player_uid", "guid"),
+            ("created_at", "u64"),
+            ("trailing_bytes", "bytes[4]", IF_REMAINING),
+        ]
+    ),
+    "PalMapObjectDefenseBulletLauncherModel": Schema(
+        [
+            ("leading_bytes", "bytes[4]"),
+            ("remaining_bullets", "i32"),
+            ("magazine_size", "i32"),
+            ("bullet_item_name", "fstring"),
+            ("trailing_bytes", "bytes[4]"),
+        ]
+    ),
+    "PalMapObjectGenerateEnergyModel": Schema(
+        [
+            ("generate_energy_rate_by_worker", "float"),
+            ("stored_energy_amount", "float"),
+            ("consume_energy_speed", "float"),
+        ]
+    ),
+    "PalMapObjectFarmBlockV2Model": Schema(
+        [
+            ("crop_progress_rate", "float"),
+            ("crop_data_id", "fstring"),
+            ("current_state", "byte"),
+            ("crop_progress_rate_value", "float"),
+            ("water_stack_rate_value", "float"),
+            (
+                "state_machine",
+                [
+                    ("growup_required_time", "float"),
+                    ("growup_progress_time", "float"),
+                ],
+            ),
+            ("trailing_bytes", "bytes[8]"),
+        ]
+    ),
+    "PalMapObjectFastTravelPointModel": Schema(
+        [
+            ("location_instance_id", "guid"),
+            ("unknown_bytes", "bytes[]", IF_REMAINING),
+        ]
+    ),
+    "PalMapObjectProductItemModel": Schema(
+        [
+            ("leading_bytes", "bytes[4]"),
+            ("work_speed_additional_rate", "float"),
+            ("product_item_id", "fstring"),
+            ("trailing_bytes", "bytes[4]"),
+        ]
+    ),
+    "PalMapObjectRecoverOtomoModel": Schema([("recover_amount_by_sec", "float")]),
+    "PalMapObjectTreasureBoxModel": Schema(
+        [
+            ("treasure_grade_type", "byte"),
+            ("treasure_special_type", "byte"),
+            ("opened", "byte"),
+            ("long_hold_interaction_duration", "float"),
+            ("interact_player_action_type", "byte"),
+            ("is_lock_riding", "byte"),
+        ]
+    ),
+    "PalMapObjectSignboardModel": Schema(
+        [
+            ("leading_bytes", "bytes[4]"),
+            ("signboard_text", "fstring"),
+            ("last_modified_player_uid", "guid"),
+            ("trailing_bytes", "bytes[4]"),
+        ]
+    ),
+    "PalMapObjectTorchModel": Schema(
+        [
+            ("ignition_minutes", "i32"),
+            ("extinction_date_time", "i64"),
+            ("trailing_bytes", "bytes[4]"),
+        ]
+    ),
+    "PalMapObjectPalEggModel": Schema(
+        [
+            ("auto_picked_up", "u32_bool"),
+            ("pickupdable_player_uid", "guid"),
+            ("remove_pickup_guard_timer_handle", "i64"),
+        ]
+    ),
+    "PalMapObjectBaseCampPoint": Schema(
+        [
+            ("leading_bytes", "bytes[4]"),
+            ("base_camp_id", "guid"),
+            ("trailing_bytes", "bytes[4]"),
+        ]
+    ),
+    **dict.fromkeys(
+        ("PalMapObjectItemChestModel", "PalMapObjectItemChest_AffectCorruption"),
+        Schema(
+            [
+                ("leading_bytes", "bytes[4]"),
+                ("private_lock_player_uid", "guid"),
+                ("trailing_bytes", "bytes[4]"),
+            ]
+        ),
+    ),
+    "PalMapObjectDimensionPalStorageModel": Schema([("trailing_bytes", "bytes[12]")]),
+    **dict.fromkeys(
+        (
+            "PalMapObjectPlayerBedModel",
+            "PalBuildObject",
+            "PalMapObjectCharacterStatusOperatorModel",
+            "PalMapObjectRankUpCharacterModel",
+            "BlueprintGeneratedClass",
+            "PalMapObjectMedicalPalBedModel",
+            "PalMapObjectDoorModel",
+            "PalMapObjectMonsterFarmModel",
+            "PalMapObjectAmusementModel",
+            "PalMapObjectLampModel",
+            "PalMapObjectLabModel",
+            "PalMapObjectRepairItemModel",
+            "PalMapObjectBaseCampPassiveWorkHardModel",
+            "PalMapObjectBaseCampPassiveEffectModel",
+            "PalMapObjectBaseCampItemDispenserModel",
+            "PalMapObjectGuildChestModel",
+            "PalMapObjectCharacterMakeModel",
+            "PalMapObjectPalFoodBoxModel",
+            "PalMapObjectPlayerSitModel",
+            "PalMapObjectBaseCampWorkerDirectorModel",
+            "PalMapObjectPalMedicineBoxModel",
+            "PalMapObjectDefenseWaitModel",
+            "PalMapObjectHeatSourceModel",
+            "PalMapObjectDisplayCharacterModel",
+            "Default_PalMapObjectConcreteModelBase",
+            "PalMapObjectDamagedScarecrowModel",
+            "PalMapObjectGlobalPalStorageModel",
+        ),
+        Schema([("trailing_bytes", "bytes[4]")]),
+    ),
+}
+
+
 def decode_bytes(
     parent_reader: FArchiveReader, m_bytes: Sequence[int], object_id: str
 ) -> Optional[dict[str, Any]]:
@@ -877,182 +1093,41 @@ def decode_bytes(
         object_id.lower()
     ]
     data["concrete_model_type"] = map_object_concrete_model
-    match map_object_concrete_model:
-        case "PalMapObjectCharacterTeamMissionModel":
-            data["mission_id"] = reader.fstring()
-            data["state"] = reader.byte()
-            data["start_time"] = reader.i64()
-            data["unknown_bytes"] = reader.read_to_end()
-        case "PalMapObjectFarmSkillFruitsModel":
-            data["leading_bytes"] = reader.byte_list(4)
-            data["skill_fruits_id"] = reader.fstring()
-            data["current_state"] = reader.byte()
-            data["progress_rate"] = reader.float()
-            data["trailing_bytes"] = reader.byte_list(20)
-        case "PalMapObjectSupplyStorageModel":
-            data["created_at_real_time"] = reader.i64()
-            data["trailing_bytes"] = reader.byte_list(8)
-        case "PalMapObjectItemBoothModel":
-            data["leading_bytes"] = reader.byte_list(4)
-            data["private_lock_player_uid"] = reader.guid()
-            data["trade_infos"] = reader.tarray(pal_item_booth_trade_info_read)
-            data["trailing_bytes"] = reader.byte_list(20)
-        case "PalMapObjectPalBoothModel":
-            data["unknown_bytes"] = reader.read_to_end()
-        case "PalMapObjectMultiHatchingEggModel":
-            data["unknown_bytes"] = reader.read_to_end()
-        case "PalMapObjectEnergyStorageModel":
-            data["stored_energy_amount"] = reader.float()
-            data["trailing_bytes"] = reader.byte_list(8)
-        case "PalMapObjectDeathDroppedCharacterModel":
-            data["stored_parameter_id"] = reader.guid()
-            data["owner_player_uid"] = reader.guid()
-            if not reader.eof():
-                data["unknown_bytes"] = reader.read_to_end()
-        case "PalMapObjectConvertItemModel":
-            data["leading_bytes"] = reader.byte_list(4)
-            data["current_recipe_id"] = reader.fstring()
-            data["requested_product_num"] = reader.i32()
-            data["remain_product_num"] = reader.i32()
-            data["work_speed_additional_rate"] = reader.float()
-            data["trailing_bytes"] = reader.byte_list(8)
-        case "PalMapObjectPickupItemOnLevelModel":
-            data["auto_picked_up"] = reader.u32() > 0
-        case "PalMapObjectDropItemModel":
-            data["auto_picked_up"] = reader.u32() > 0
-            data["pickupdable_player_uid"] = reader.guid()
-            data["remove_pickup_guard_timer_handle"] = reader.i64()
-            data["item_id"] = {
-                "static_id": reader.fstring(),
-                "dynamic_id": {
-                    "created_world_id": reader.guid(),
-                    "local_id_in_created_world": reader.guid(),
-                },
-            }
-            data["trailing_bytes"] = reader.byte_list(4)
-        case "PalMapObjectItemDropOnDamagModel":
-            data["drop_item_infos"] = reader.tarray(pal_item_and_num_read)
-            if not reader.eof():
-                data["unknown_bytes"] = reader.read_to_end()
-        case "PalMapObjectDeathPenaltyStorageModel":
-            data["auto_destroy_if_empty"] = reader.u32() > 0
-            data["owner_player_uid"] = reader.guid()
-            data["created_at"] = reader.u64()
-            if not reader.eof():
+    schema = CONCRETE_MODEL_SCHEMAS.get(map_object_concrete_model)
+    if schema is not None:
+        schema.read(reader, data)
+    else:
+        match map_object_concrete_model:
+            case "PalMapObjectItemBoothModel":
+                data["leading_bytes"] = reader.byte_list(4)
+                data["private_lock_player_uid"] = reader.guid()
+                data["trade_infos"] = reader.tarray(pal_item_booth_trade_info_read)
+                data["trailing_bytes"] = reader.byte_list(20)
+            case "PalMapObjectItemDropOnDamagModel":
+                data["drop_item_infos"] = reader.tarray(pal_item_and_num_read)
+                if not reader.eof():
+                    data["unknown_bytes"] = reader.read_to_end()
+            case "PalMapObjectShippingItemModel":
+                data["shipping_hours"] = reader.tarray(lambda r: r.i32())
+            case "PalMapObjectHatchingEggModel":
+                data["leading_bytes"] = reader.byte_list(4)
+                data["hatched_character_save_parameter"] = reader.properties_until_end()
+                data["current_pal_egg_temp_diff"] = reader.i32()
+                data["hatched_character_guid"] = reader.guid()
                 data["trailing_bytes"] = reader.byte_list(4)
-        case "PalMapObjectDefenseBulletLauncherModel":
-            data["leading_bytes"] = reader.byte_list(4)
-            data["remaining_bullets"] = reader.i32()
-            data["magazine_size"] = reader.i32()
-            data["bullet_item_name"] = reader.fstring()
-            data["trailing_bytes"] = reader.byte_list(4)
-        case "PalMapObjectGenerateEnergyModel":
-            data["generate_energy_rate_by_worker"] = reader.float()
-            data["stored_energy_amount"] = reader.float()
-            data["consume_energy_speed"] = reader.float()
-        case "PalMapObjectFarmBlockV2Model":
-            data["crop_progress_rate"] = reader.float()
-            data["crop_data_id"] = reader.fstring()
-            data["current_state"] = reader.byte()
-            data["crop_progress_rate_value"] = reader.float()
-            data["water_stack_rate_value"] = reader.float()
-            data["state_machine"] = {
-                "growup_required_time": reader.float(),
-                "growup_progress_time": reader.float(),
-            }
-            data["trailing_bytes"] = reader.byte_list(8)
-        case "PalMapObjectFastTravelPointModel":
-            data["location_instance_id"] = reader.guid()
-            if not reader.eof():
-                data["unknown_bytes"] = reader.read_to_end()
-        case "PalMapObjectShippingItemModel":
-            data["shipping_hours"] = reader.tarray(lambda r: r.i32())
-        case "PalMapObjectProductItemModel":
-            data["leading_bytes"] = reader.byte_list(4)
-            data["work_speed_additional_rate"] = reader.float()
-            data["product_item_id"] = reader.fstring()
-            data["trailing_bytes"] = reader.byte_list(4)
-        case "PalMapObjectRecoverOtomoModel":
-            data["recover_amount_by_sec"] = reader.float()
-        case "PalMapObjectHatchingEggModel":
-            data["leading_bytes"] = reader.byte_list(4)
-            data["hatched_character_save_parameter"] = reader.properties_until_end()
-            data["current_pal_egg_temp_diff"] = reader.i32()
-            data["hatched_character_guid"] = reader.guid()
-            data["trailing_bytes"] = reader.byte_list(4)
-        case "PalMapObjectTreasureBoxModel":
-            data["treasure_grade_type"] = reader.byte()
-            data["treasure_special_type"] = reader.byte()
-            data["opened"] = reader.byte()
-            data["long_hold_interaction_duration"] = reader.float()
-            data["interact_player_action_type"] = reader.byte()
-            data["is_lock_riding"] = reader.byte()
-        case "PalMapObjectBreedFarmModel":
-            data["leading_bytes"] = reader.byte_list(4)
-            data["spawned_egg_instance_ids"] = reader.tarray(uuid_reader)
-            data["trailing_bytes"] = reader.byte_list(4)
-        case "PalMapObjectSignboardModel":
-            data["leading_bytes"] = reader.byte_list(4)
-            data["signboard_text"] = reader.fstring()
-            data["last_modified_player_uid"] = reader.guid()
-            data["trailing_bytes"] = reader.byte_list(4)
-        case "PalMapObjectTorchModel":
-            data["ignition_minutes"] = reader.i32()
-            data["extinction_date_time"] = reader.i64()
-            data["trailing_bytes"] = reader.byte_list(4)
-        case "PalMapObjectPalEggModel":
-            data["auto_picked_up"] = reader.u32() > 0
-            data["pickupdable_player_uid"] = reader.guid()
-            data["remove_pickup_guard_timer_handle"] = reader.i64()
-        case "PalMapObjectBaseCampPoint":
-            data["leading_bytes"] = reader.byte_list(4)
-            data["base_camp_id"] = reader.guid()
-            data["trailing_bytes"] = reader.byte_list(4)
-        case "PalMapObjectItemChestModel" | "PalMapObjectItemChest_AffectCorruption":
-            data["leading_bytes"] = reader.byte_list(4)
-            data["private_lock_player_uid"] = reader.guid()
-            data["trailing_bytes"] = reader.byte_list(4)
-        case "PalMapObjectDimensionPalStorageModel":
-            data["trailing_bytes"] = reader.byte_list(12)
-        case (
-            "PalMapObjectPlayerBedModel"
-            | "PalBuildObject"
-            | "PalMapObjectCharacterStatusOperatorModel"
-            | "PalMapObjectRankUpCharacterModel"
-            | "BlueprintGeneratedClass"
-            | "PalMapObjectMedicalPalBedModel"
-            | "PalMapObjectDoorModel"
-            | "PalMapObjectMonsterFarmModel"
-            | "PalMapObjectAmusementModel"
-            | "PalMapObjectLampModel"
-            | "PalMapObjectLabModel"
-            | "PalMapObjectRepairItemModel"
-            | "PalMapObjectBaseCampPassiveWorkHardModel"
-            | "PalMapObjectBaseCampPassiveEffectModel"
-            | "PalMapObjectBaseCampItemDispenserModel"
-            | "PalMapObjectGuildChestModel"
-            | "PalMapObjectCharacterMakeModel"
-            | "PalMapObjectPalFoodBoxModel"
-            | "PalMapObjectPlayerSitModel"
-            | "PalMapObjectBaseCampWorkerDirectorModel"
-            | "PalMapObjectPalMedicineBoxModel"
-            | "PalMapObjectDefenseWaitModel"
-            | "PalMapObjectHeatSourceModel"
-            | "PalMapObjectDisplayCharacterModel"
-            | "Default_PalMapObjectConcreteModelBase"
-            | "PalMapObjectDamagedScarecrowModel"
-            | "PalMapObjectGlobalPalStorageModel"
-        ):
-            data["trailing_bytes"] = reader.byte_list(4)
-        case _:
-            logger.debug(
-                f"Unknown map object concrete model {map_object_concrete_model}, skipping"
-            )
-            return {"values": m_bytes}
+            case "PalMapObjectBreedFarmModel":
+                data["leading_bytes"] = reader.byte_list(4)
+                data["spawned_egg_instance_ids"] = reader.tarray(uuid_reader)
+                data["trailing_bytes"] = reader.byte_list(4)
+            case _:
+                logger.debug(
+                    f"Unknown map object concrete model {map_object_concrete_model}, skipping"
+                )
+                return {"values": m_bytes}
 
     if not reader.eof():
         raise Exception(
-            f"Warning: EOF not reached for {object_id} {map_object_concrete_model}: ori: {''.join(f'{b:02x}' for b in m_bytes)} remaining: {reader.size - reader.data.tell()}"
+            f"Warning: EOF not reached for {object_id} {map_object_concrete_model}: ori: {''.join(f'{b:02x}' for b in m_bytes)} remaining: {reader.size - reader.tell()}"
         )
     return data
 
@@ -1069,170 +1144,36 @@ def encode_bytes(p: Optional[dict[str, Any]]) -> bytes:
     writer.guid(p["instance_id"])
     writer.guid(p["model_instance_id"])
 
-    match map_object_concrete_model:
-        case "PalMapObjectCharacterTeamMissionModel":
-            writer.fstring(p["mission_id"])
-            writer.byte(p["state"])
-            writer.i64(p["start_time"])
-            writer.write(coerce_bytes(p["unknown_bytes"]))
-        case "PalMapObjectFarmSkillFruitsModel":
-            writer.write(coerce_bytes(p["leading_bytes"]))
-            writer.fstring(p["skill_fruits_id"])
-            writer.byte(p["current_state"])
-            writer.float(p["progress_rate"])
-            writer.write(coerce_bytes(p["trailing_bytes"]))
-        case "PalMapObjectSupplyStorageModel":
-            writer.i64(p["created_at_real_time"])
-            writer.write(coerce_bytes(p["trailing_bytes"]))
-        case "PalMapObjectItemBoothModel":
-            writer.write(coerce_bytes(p["leading_bytes"]))
-            writer.guid(p["private_lock_player_uid"])
-            writer.tarray(pal_item_booth_trade_info_writer, p["trade_infos"])
-            writer.write(coerce_bytes(p["trailing_bytes"]))
-        case "PalMapObjectPalBoothModel":
-            writer.write(coerce_bytes(p["unknown_bytes"]))
-        case "PalMapObjectMultiHatchingEggModel":
-            writer.write(coerce_bytes(p["unknown_bytes"]))
-        case "PalMapObjectEnergyStorageModel":
-            writer.float(p["stored_energy_amount"])
-            writer.write(coerce_bytes(p["trailing_bytes"]))
-        case "PalMapObjectDeathDroppedCharacterModel":
-            writer.guid(p["stored_parameter_id"])
-            writer.guid(p["owner_player_uid"])
-            if "unknown_bytes" in p:
-                writer.write(coerce_bytes(p["unknown_bytes"]))
-        case "PalMapObjectConvertItemModel":
-            writer.write(coerce_bytes(p["leading_bytes"]))
-            writer.fstring(p["current_recipe_id"])
-            writer.i32(p["requested_product_num"])
-            writer.i32(p["remain_product_num"])
-            writer.float(p["work_speed_additional_rate"])
-            writer.write(coerce_bytes(p["trailing_bytes"]))
-        case "PalMapObjectPickupItemOnLevelModel":
-            writer.u32(1 if p["auto_picked_up"] else 0)
-        case "PalMapObjectDropItemModel":
-            writer.u32(1 if p["auto_picked_up"] else 0)
-            writer.guid(p["pickupdable_player_uid"])
-            writer.i64(p["remove_pickup_guard_timer_handle"])
-            writer.fstring(p["item_id"]["static_id"])
-            writer.guid(p["item_id"]["dynamic_id"]["created_world_id"])
-            writer.guid(p["item_id"]["dynamic_id"]["local_id_in_created_world"])
-            writer.write(coerce_bytes(p["trailing_bytes"]))
-        case "PalMapObjectItemDropOnDamagModel":
-            writer.tarray(pal_item_and_slot_writer, p["drop_item_infos"])
-            if "unknown_bytes" in p:
-                writer.write(coerce_bytes(p["unknown_bytes"]))
-        case "PalMapObjectDeathPenaltyStorageModel":
-            writer.u32(1 if p["auto_destroy_if_empty"] else 0)
-            writer.guid(p["owner_player_uid"])
-            writer.u64(p["created_at"])
-            if "trailing_bytes" in p:
+    schema = CONCRETE_MODEL_SCHEMAS.get(map_object_concrete_model)
+    if schema is not None:
+        schema.write(writer, p)
+    else:
+        match map_object_concrete_model:
+            case "PalMapObjectItemBoothModel":
+                writer.write(coerce_bytes(p["leading_bytes"]))
+                writer.guid(p["private_lock_player_uid"])
+                writer.tarray(pal_item_booth_trade_info_writer, p["trade_infos"])
+                writer.write(coerce_bytes(p["trailing_bytes"]))
+            case "PalMapObjectItemDropOnDamagModel":
+                writer.tarray(pal_item_and_slot_writer, p["drop_item_infos"])
+                if "unknown_bytes" in p:
+                    writer.write(coerce_bytes(p["unknown_bytes"]))
+            case "PalMapObjectShippingItemModel":
+                writer.tarray(lambda w, x: w.i32(x), p["shipping_hours"])
+            case "PalMapObjectHatchingEggModel":
+                writer.write(coerce_bytes(p["leading_bytes"]))
+                writer.properties(p["hatched_character_save_parameter"])
+                writer.i32(p["current_pal_egg_temp_diff"])
+                writer.guid(p["hatched_character_guid"])
+                writer.write(coerce_bytes(p["trailing_bytes"]))
+            case "PalMapObjectBreedFarmModel":
+                writer.write(coerce_bytes(p["leading_bytes"]))
+                writer.tarray(uuid_writer, p["spawned_egg_instance_ids"])
                 writer.write(coerce_bytes(p["trailing_bytes"]))
-        case "PalMapObjectDefenseBulletLauncherModel":
-            writer.write(coerce_bytes(p["leading_bytes"]))
-            writer.i32(p["remaining_bullets"])
-            writer.i32(p["magazine_size"])
-            writer.fstring(p["bullet_item_name"])
-            writer.write(coerce_bytes(p["trailing_bytes"]))
-        case "PalMapObjectGenerateEnergyModel":
-            writer.float(p["generate_energy_rate_by_worker"])
-            writer.float(p["stored_energy_amount"])
-            writer.float(p["consume_energy_speed"])
-        case "PalMapObjectFarmBlockV2Model":
-            writer.float(p["crop_progress_rate"])
-            writer.fstring(p["crop_data_id"])
-            writer.byte(p["current_state"])
-            writer.float(p["crop_progress_rate_value"])
-            writer.float(p["water_stack_rate_value"])
-            writer.float(p["state_machine"]["growup_required_time"])
-            writer.float(p["state_machine"]["growup_progress_time"])
-            writer.write(coerce_bytes(p["trailing_bytes"]))
-        case "PalMapObjectFastTravelPointModel":
-            writer.guid(p["location_instance_id"])
-            if "unknown_bytes" in p:
-                writer.write(coerce_bytes(p["unknown_bytes"]))
-        case "PalMapObjectShippingItemModel":
-            writer.tarray(lambda w, x: w.i32(x), p["shipping_hours"])
-        case "PalMapObjectProductItemModel":
-            writer.write(coerce_bytes(p["leading_bytes"]))
-            writer.float(p["work_speed_additional_rate"])
-            writer.fstring(p["product_item_id"])
-            writer.write(coerce_bytes(p["trailing_bytes"]))
-        case "PalMapObjectRecoverOtomoModel":
-            writer.float(p["recover_amount_by_sec"])
-        case "PalMapObjectHatchingEggModel":
-            writer.write(coerce_bytes(p["leading_bytes"]))
-            writer.properties(p["hatched_character_save_parameter"])
-            writer.i32(p["current_pal_egg_temp_diff"])
-            writer.guid(p["hatched_character_guid"])
-            writer.write(coerce_bytes(p["trailing_bytes"]))
-        case "PalMapObjectTreasureBoxModel":
-            writer.byte(p["treasure_grade_type"])
-            writer.byte(p["treasure_special_type"])
-            writer.byte(p["opened"])
-            writer.float(p["long_hold_interaction_duration"])
-            writer.byte(p["interact_player_action_type"])
-            writer.byte(p["is_lock_riding"])
-        case "PalMapObjectBreedFarmModel":
-            writer.write(coerce_bytes(p["leading_bytes"]))
-            writer.tarray(uuid_writer, p["spawned_egg_instance_ids"])
-            writer.write(coerce_bytes(p["trailing_bytes"]))
-        case "PalMapObjectSignboardModel":
-            writer.write(coerce_bytes(p["leading_bytes"]))
-            writer.fstring(p["signboard_text"])
-            writer.guid(p["last_modified_player_uid"])
-            writer.write(coerce_bytes(p["trailing_bytes"]))
-        case "PalMapObjectTorchModel":
-            writer.i32(p["ignition_minutes"])
-            writer.i64(p["extinction_date_time"])
-            writer.write(coerce_bytes(p["trailing_bytes"]))
-        case "PalMapObjectPalEggModel":
-            writer.u32(1 if p["auto_picked_up"] else 0)
-            writer.guid(p["pickupdable_player_uid"])
-            writer.i64(p["remove_pickup_guard_timer_handle"])
-        case "PalMapObjectBaseCampPoint":
-            writer.write(coerce_bytes(p["leading_bytes"]))
-            writer.guid(p["base_camp_id"])
-            writer.write(coerce_bytes(p["trailing_bytes"]))
-        case "PalMapObjectItemChestModel" | "PalMapObjectItemChest_AffectCorruption":
-            writer.write(coerce_bytes(p["leading_bytes"]))
-            writer.guid(p["private_lock_player_uid"])
-            writer.write(coerce_bytes(p["trailing_bytes"]))
-        case (
-            "PalMapObjectPlayerBedModel"
-            | "PalBuildObject"
-            | "PalMapObjectCharacterStatusOperatorModel"
-            | "PalMapObjectRankUpCharacterModel"
-            | "BlueprintGeneratedClass"
-            | "PalMapObjectMedicalPalBedModel"
-            | "PalMapObjectDoorModel"
-            | "PalMapObjectMonsterFarmModel"
-            | "PalMapObjectAmusementModel"
-            | "PalMapObjectLampModel"
-            | "PalMapObjectLabModel"
-            | "PalMapObjectRepairItemModel"
-            | "PalMapObjectBaseCampPassiveWorkHardModel"
-            | "PalMapObjectBaseCampPassiveEffectModel"
-            | "PalMapObjectBaseCampItemDispenserModel"
-            | "PalMapObjectGuildChestModel"
-            | "PalMapObjectCharacterMakeModel"
-            | "PalMapObjectPalFoodBoxModel"
-            | "PalMapObjectPlayerSitModel"
-            | "PalMapObjectDimensionPalStorageModel"
-            | "PalMapObjectBaseCampWorkerDirectorModel"
-            | "PalMapObjectPalMedicineBoxModel"
-            | "PalMapObjectDefenseWaitModel"
-            | "PalMapObjectHeatSourceModel"
-            | "PalMapObjectDisplayCharacterModel"
-            | "Default_PalMapObjectConcreteModelBase"
-            | "PalMapObjectDamagedScarecrowModel"
-            | "PalMapObjectGlobalPalStorageModel"
-        ):
-            writer.write(coerce_bytes(p["trailing_bytes"]))
-        case _:
-            raise Exception(
-                f"Unknown map object concrete model {map_object_concrete_model}"
-            )
+            case _:
+                raise Exception(
+                    f"Unknown map object concrete model {map_object_concrete_model}"
+                )
 
     encoded_bytes = writer.bytes()
     return encoded_bytes
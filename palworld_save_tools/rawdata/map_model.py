@@ -1,17 +1,42 @@
-from typing import Any, Sequence
+from typing import Any, Sequence, Union
 
 from loguru import logger
-from palworld_save_tools.archive import FArchiveReader, FArchiveWriter, coerce_bytes
+from palworld_save_tools.archive import (
+    DecodePlan,
+    FArchiveReader,
+    FArchiveWriter,
+    coerce_bytes,
+)
+from palworld_save_tools.rawdata.schema import IF_REMAINING, Schema
+
+SCHEMA = Schema(
+    [
+        ("instance_id", "guid"),
+        ("concrete_model_instance_id", "guid"),
+        ("base_camp_id_belong_to", "guid"),
+        ("group_id_belong_to", "guid"),
+        ("hp", [("current", "i32"), ("max", "i32")]),
+        ("initital_transform_cache", "ftransform"),
+        ("repair_work_id", "guid"),
+        ("owner_spawner_level_object_instance_id", "guid"),
+        ("owner_instance_id", "guid"),
+        ("build_player_uid", "guid"),
+        ("interact_restrict_type", "byte"),
+        ("deterioration_damage", "float"),
+        ("stage_instance_id_belong_to", [("id", "guid"), ("valid", "u32_bool")]),
+        ("unknown_bytes", "bytes[]", IF_REMAINING),
+    ]
+)
 
 
 def decode(
-    reader: FArchiveReader, type_name: str, size: int, path: str
+    reader: FArchiveReader,
+    type_name: str,
+    size: int,
+    path: Union[str, DecodePlan],
 ) -> dict[str, Any]:
-    if type_name != "ArrayProperty":
-        raise Exception(f"Expected ArrayProperty, got {type_name}")
-    value = reader.property(type_name, size, path, nested_caller_path=path)
-    data_bytes = value["value"]["values"]
-    value["value"] = decode_bytes(reader, data_bytes)
+    value, data_reader = reader.byte_array_reader(type_name, size, path)
+    value["value"] = read_raw_data(data_reader)
     return value
 
 
@@ -19,33 +44,16 @@ def decode_bytes(
     parent_reader: FArchiveReader, m_bytes: Sequence[int]
 ) -> dict[str, Any]:
     reader = parent_reader.internal_copy(coerce_bytes(m_bytes), debug=False)
-    data: dict[str, Any] = {}
-    data["instance_id"] = reader.guid()
-    data["concrete_model_instance_id"] = reader.guid()
-    data["base_camp_id_belong_to"] = reader.guid()
-    data["group_id_belong_to"] = reader.guid()
-    data["hp"] = {
-        "current": reader.i32(),
-        "max": reader.i32(),
-    }
-    data["initital_transform_cache"] = reader.ftransform()
-    data["repair_work_id"] = reader.guid()
-    data["owner_spawner_level_object_instance_id"] = reader.guid()
-    data["owner_instance_id"] = reader.guid()
-    data["build_player_uid"] = reader.guid()
-    data["interact_restrict_type"] = reader.byte()
-    data["deterioration_damage"] = reader.float()
-    data["stage_instance_id_belong_to"] = {
-        "id": reader.guid(),
-        "valid": reader.u32() > 0,
-    }
+    return read_raw_data(reader)
 
-    if not reader.eof():
-        unknown_bytes = reader.read_to_end()
+
+def read_raw_data(reader: FArchiveReader) -> dict[str, Any]:
+    data = SCHEMA.read(reader)
+    if "unknown_bytes" in data:
+        unknown_bytes = data["unknown_bytes"]
         logger.debug(
             f"Unknown data found in map model instance, length {len(unknown_bytes)}. Data: {' '.join(f'{b:02X}' for b in unknown_bytes)}"
         )
-        data["unknown_bytes"] = unknown_bytes
     return data
 
 
@@ -62,29 +70,6 @@ def encode(
 
 def encode_bytes(p: dict[str, Any]) -> bytes:
     writer = FArchiveWriter()
-
-    writer.guid(p["instance_id"])
-    writer.guid(p["concrete_model_instance_id"])
-    writer.guid(p["base_camp_id_belong_to"])
-    writer.guid(p["group_id_belong_to"])
-
-    writer.i32(p["hp"]["current"])
-    writer.i32(p["hp"]["max"])
-
-    writer.ftransform(p["initital_transform_cache"])
-
-    writer.guid(p["repair_work_id"])
-    writer.guid(p["owner_spawner_level_object_instance_id"])
-    writer.guid(p["owner_instance_id"])
-    writer.guid(p["build_player_uid"])
-
-    writer.byte(p["interact_restrict_type"])
-    writer.float(p["deterioration_damage"])
-    writer.guid(p["stage_instance_id_belong_to"]["id"])
-    writer.u32(1 if p["stage_instance_id_belong_to"]["valid"] else 0)
-
-    if "unknown_bytes" in p:
-        writer.write(coerce_bytes(p["unknown_bytes"]))
-
+    SCHEMA.write(writer, p)
     encoded_bytes = writer.bytes()
     return encoded_bytes
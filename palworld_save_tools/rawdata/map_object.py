@@ -1,6 +1,6 @@
-from typing import Any
+from typing import Any, Union
 
-from palworld_save_tools.archive import FArchiveReader, FArchiveWriter
+from palworld_save_tools.archive import DecodePlan, FArchiveReader, FArchiveWriter
 from palworld_save_tools.rawdata import (
     build_process,
     connector,
@@ -11,7 +11,10 @@ from palworld_save_tools.rawdata import (
 
 
 def decode(
-    reader: FArchiveReader, type_name: str, size: int, path: str
+    reader: FArchiveReader,
+    type_name: str,
+    size: int,
+    path: Union[str, DecodePlan],
 ) -> dict[str, Any]:
     if type_name != "ArrayProperty":
         raise Exception(f"Expected ArrayProperty, got {type_name}")
@@ -0,0 +1,366 @@
+import math
+import struct
+from typing import Any, Callable, Optional, Sequence, Union
+
+from palworld_save_tools.archive import (
+    UUID,
+    FArchiveReader,
+    FArchiveWriter,
+    coerce_bytes,
+    uuid_writer,
+)
+
+# Condition for fields that are only present when there is data left to read;
+# they are written when present in the decoded dict
+IF_REMAINING = "if_remaining"
+
+# Fixed-width field types: struct format and the number of values it unpacks
+_FIXED_TYPES: dict[str, tuple[str, int]] = {
+    "byte": ("B", 1),
+    "i16": ("h", 1),
+    "u16": ("H", 1),
+    "i32": ("i", 1),
+    "u32": ("I", 1),
+    "i64": ("q", 1),
+    "u64": ("Q", 1),
+    "float": ("f", 1),
+    "double": ("d", 1),
+    # u32 read as ``> 0`` and written as 1 or 0
+    "u32_bool": ("I", 1),
+    "guid": ("16s", 1),
+    "vector": ("3d", 3),
+    "quat": ("4d", 4),
+    "ftransform": ("10d", 10),
+}
+_FLOAT_TYPES = frozenset(("float", "double", "vector", "quat", "ftransform"))
+_DICT_KEYS = {
+    "vector": ("x", "y", "z"),
+    "quat": ("x", "y", "z", "w"),
+}
+# Reference implementations on the reader, used when a compiled read would
+# run past the end of the data so that short data is handled exactly as the
+# reader handles it
+_READER_METHODS: dict[str, Callable[[FArchiveReader], Any]] = {
+    "byte": FArchiveReader.byte,
+    "i16": FArchiveReader.i16,
+    "u16": FArchiveReader.u16,
+    "i32": FArchiveReader.i32,
+    "u32": FArchiveReader.u32,
+    "i64": FArchiveReader.i64,
+    "u64": FArchiveReader.u64,
+    "float": FArchiveReader.float,
+    "double": FArchiveReader.double,
+    "u32_bool": lambda reader: reader.u32() > 0,
+    "guid": FArchiveReader.guid,
+    "vector": FArchiveReader.vector_dict,
+    "quat": FArchiveReader.quat_dict,
+    "ftransform": FArchiveReader.ftransform,
+    "fstring": FArchiveReader.fstring,
+    "bytes[]": FArchiveReader.read_to_end,
+}
+
+# ``(name, type)`` or ``(name, type, condition)``, where ``type`` is a field type
+# name or a sequence of nested field specs
+FieldSpec = Union[
+    tuple[str, Union[str, Sequence[Any]]],
+    tuple[str, Union[str, Sequence[Any]], str],
+]
+
+
+def _finite(value: float) -> Optional[float]:
+    if math.isnan(value) or math.isinf(value):
+        return None
+    return value
+
+
+def _nan(value: Optional[float]) -> float:
+    return float("nan") if value is None else value
+
+
+def _guid_bytes(value: Any) -> bytes:
+    if type(value) is UUID:
+        return value.raw_bytes
+    writer = FArchiveWriter()
+    uuid_writer(writer, value)
+    return writer.bytes()
+
+
+class _Leaf:
+    __slots__ = ("keys", "type", "size", "condition")
+
+    def __init__(self, keys: tuple[str, ...], type: str, condition: Optional[str]):
+        self.keys = keys
+        self.type = type
+        self.size: Optional[int] = None
+        if type.startswith("bytes[") and type != "bytes[]":
+            self.size = int(type[6:-1])
+        elif type not in _FIXED_TYPES and type not in _READER_METHODS:
+            raise Exception(f"Unknown schema field type: {type}")
+        if condition not in (None, IF_REMAINING):
+            raise Exception(f"Unknown schema field condition: {condition}")
+        self.condition = condition
+
+    @property
+    def fixed(self) -> bool:
+        return self.condition is None and (
+            self.type in _FIXED_TYPES or self.size is not None
+        )
+
+    def format(self) -> tuple[str, int]:
+        if self.size is not None:
+            return f"{self.size}s", 1
+        return _FIXED_TYPES[self.type]
+
+    def read(self, reader: FArchiveReader) -> Any:
+        if self.size is not None:
+            return reader.byte_list(self.size)
+        return _READER_METHODS[self.type](reader)
+
+
+def _flatten(fields: Sequence[Any], keys: tuple[str, ...] = ()) -> list[_Leaf]:
+    leaves = []
+    for field in fields:
+        name, type = field[0], field[1]
+        condition = field[2] if len(field) > 2 else None
+        if isinstance(type, str):
+            leaves.append(_Leaf(keys + (name,), type, condition))
+        else:
+            if condition is not None:
+                raise Exception(f"Conditions are not supported on nested {name}")
+            leaves.extend(_flatten(type, keys + (name,)))
+    return leaves
+
+
+def _runs(leaves: list[_Leaf], fixed: Callable[[_Leaf], bool]) -> list[list[_Leaf]]:
+    """Group consecutive leaves for which ``fixed`` holds, others stand alone."""
+    runs: list[list[_Leaf]] = []
+    for leaf in leaves:
+        if fixed(leaf) and runs and fixed(runs[-1][-1]):
+            runs[-1].append(leaf)
+        else:
+            runs.append([leaf])
+    return runs
+
+
+class Schema:
+    """Declarative layout of a RawData blob, compiled into a reader and writer.
+
+    ``fields`` is a sequence of ``(name, type)`` or ``(name, type,
+    condition)`` tuples in serialized order. ``type`` is one of the reader
+    method names (``byte``, ``i32``, ``u64``, ``float``, ``guid``,
+    ``fstring``, ``ftransform``, ...), ``u32_bool``, ``bytes[N]`` for N raw
+    bytes, ``bytes[]`` for the rest of the data, or a nested sequence of
+    fields for a dict value. The only condition is ``IF_REMAINING``.
+
+    Both directions are generated from the same fields when the schema is
+    created, with every run of consecutive fixed-width fields read by one
+    ``struct.unpack_from`` and written by one ``pack``, so the encoder always
+    mirrors the decoder. With ``strict``, reading fails unless the whole
+    data was consumed.
+    """
+
+    def __init__(self, fields: Sequence[FieldSpec], strict: bool = False):
+        self.leaves = _flatten(fields)
+        self.strict = strict
+        self._struct_count = 0
+        self._namespace: dict[str, Any] = {
+            "UUID": UUID,
+            "_finite": _finite,
+            "_nan": _nan,
+            "_guid_bytes": _guid_bytes,
+            "coerce_bytes": coerce_bytes,
+        }
+        self.source = "\n".join(
+            [
+                self._reader_source("_read", allow_nan=True),
+                self._reader_source("_read_finite", allow_nan=False),
+                self._writer_source(),
+            ]
+        )
+        exec(compile(self.source, "<rawdata schema>", "exec"), self._namespace)
+        self._readers = {
+            True: self._namespace["_read"],
+            False: self._namespace["_read_finite"],
+        }
+        self._writer = self._namespace["_write"]
+
+    def _struct(self, format: str) -> str:
+        name = f"_s{self._struct_count}"
+        self._struct_count += 1
+        self._namespace[name] = struct.Struct("<" + format)
+        return name
+
+    def _reader_source(self, function: str, allow_nan: bool) -> str:
+        lines = [
+            f"def {function}(reader, data):",
+            "    buf = reader.data",
+            "    offset = reader.offset",
+            "    size = reader.size",
+        ]
+        containers: dict[tuple[str, ...], str] = {(): "data"}
+
+        def target(leaf: _Leaf) -> str:
+            for i in range(1, len(leaf.keys)):
+                prefix = leaf.keys[:i]
+                if prefix not in containers:
+                    name = f"d{len(containers)}"
+                    lines.append(
+                        f"    {name} = {containers[prefix[:-1]]}[{prefix[-1]!r}] = {{}}"
+                    )
+                    containers[prefix] = name
+            return f"{containers[leaf.keys[:-1]]}[{leaf.keys[-1]!r}]"
+
+        def float_value(name: str) -> str:
+            return name if allow_nan else f"_finite({name})"
+
+        def value(leaf: _Leaf, names: list[str]) -> str:
+            if leaf.type == "guid":
+                return f"UUID({names[0]})"
+            if leaf.type == "u32_bool":
+                return f"{names[0]} > 0"
+            if leaf.type in _FLOAT_TYPES:
+                values = [float_value(name) for name in names]
+                if leaf.type in _DICT_KEYS:
+                    return _dict_source(_DICT_KEYS[leaf.type], values)
+                if leaf.type == "ftransform":
+                    return (
+                        "{"
+                        f"'rotation': {_dict_source(_DICT_KEYS['quat'], values[:4])}, "
+                        f"'translation': {_dict_source(_DICT_KEYS['vector'], values[4:7])}, "
+                        f"'scale3d': {_dict_source(_DICT_KEYS['vector'], values[7:])}"
+                        "}"
+                    )
+                return values[0]
+            return names[0]
+
+        for run in _runs(self.leaves, lambda leaf: leaf.fixed):
+            leaf = run[0]
+            if not leaf.fixed:
+                indent = "    "
+                if leaf.condition == IF_REMAINING:
+                    lines.append("    if offset < size:")
+                    indent = "        "
+                if leaf.type == "bytes[]":
+                    lines.append(f"{indent}{target(leaf)} = buf[offset:size]")
+                    lines.append(f"{indent}offset = size")
+                elif leaf.fixed or leaf.type in _FIXED_TYPES or leaf.size:
+                    # A conditional fixed-width field
+                    format, count = leaf.format()
+                    unpack = self._struct(format)
+                    names = [f"v{i}" for i in range(count)]
+                    lines.append(
+                        f"{indent}if offset + {unpack}.size > size:\n"
+                        f"{indent}    return None"
+                    )
+                    lines.append(
+                        f"{indent}{', '.join(names)}, = {unpack}.unpack_from(buf, offset)"
+                    )
+                    lines.append(f"{indent}offset += {unpack}.size")
+                    lines.append(f"{indent}{target(leaf)} = {value(leaf, names)}")
+                else:
+                    lines.append(f"{indent}reader.offset = offset")
+                    lines.append(
+                        f"{indent}{target(leaf)} = reader.{_READER_METHODS[leaf.type].__name__}()"
+                    )
+                    lines.append(f"{indent}offset = reader.offset")
+                continue
+            formats = []
+            names_per_leaf = []
+            count = 0
+            for leaf in run:
+                format, n = leaf.format()
+                formats.append(format)
+                names_per_leaf.append([f"v{count + i}" for i in range(n)])
+                count += n
+            unpack = self._struct("".join(formats))
+            lines.append(f"    if offset + {unpack}.size > size:")
+            lines.append("        return None")
+            lines.append(
+                f"    {', '.join(f'v{i}' for i in range(count))}, = "
+                f"{unpack}.unpack_from(buf, offset)"
+            )
+            lines.append(f"    offset += {unpack}.size")
+            for leaf, names in zip(run, names_per_leaf):
+                lines.append(f"    {target(leaf)} = {value(leaf, names)}")
+        lines.append("    reader.offset = offset")
+        lines.append("    return data")
+        return "\n".join(lines) + "\n"
+
+    def _writer_source(self) -> str:
+        lines = ["def _write(writer, p):", "    out = writer.data"]
+
+        def source(keys: tuple[str, ...]) -> str:
+            return "p" + "".join(f"[{key!r}]" for key in keys)
+
+        def values(leaf: _Leaf) -> list[str]:
+            v = source(leaf.keys)
+            if leaf.type == "u32_bool":
+                return [f"1 if {v} else 0"]
+            if leaf.type in _DICT_KEYS:
+                return [f"_nan({v}[{key!r}])" for key in _DICT_KEYS[leaf.type]]
+            if leaf.type == "ftransform":
+                return (
+                    [f"_nan({v}['rotation'][{key!r}])" for key in _DICT_KEYS["quat"]]
+                    + [
+                        f"_nan({v}['translation'][{key!r}])"
+                        for key in _DICT_KEYS["vector"]
+                    ]
+                    + [f"_nan({v}['scale3d'][{key!r}])" for key in _DICT_KEYS["vector"]]
+                )
+            if leaf.type in _FLOAT_TYPES:
+                return [f"_nan({v})"]
+            return [v]
+
+        # GUIDs and raw bytes are appended as they are rather than packed,
+        # since their length is not checked on write
+        def packed(leaf: _Leaf) -> bool:
+            return leaf.fixed and leaf.type != "guid" and leaf.size is None
+
+        for run in _runs(self.leaves, packed):
+            leaf = run[0]
+            indent = "    "
+            if leaf.condition == IF_REMAINING:
+                lines.append(f"    if {leaf.keys[-1]!r} in {source(leaf.keys[:-1])}:")
+                indent = "        "
+            if leaf.type == "fstring":
+                lines.append(f"{indent}writer.fstring({source(leaf.keys)})")
+            elif leaf.type == "guid":
+                lines.append(f"{indent}out += _guid_bytes({source(leaf.keys)})")
+            elif leaf.type == "bytes[]" or leaf.size is not None:
+                lines.append(f"{indent}out += coerce_bytes({source(leaf.keys)})")
+            else:
+                format = "".join(leaf.format()[0] for leaf in run)
+                pack = self._struct(format)
+                args = ", ".join(v for leaf in run for v in values(leaf))
+                lines.append(f"{indent}out += {pack}.pack({args})")
+        return "\n".join(lines) + "\n"
+
+    def read(
+        self, reader: FArchiveReader, data: Optional[dict[str, Any]] = None
+    ) -> dict[str, Any]:
+        """Read the fields at the reader's offset into ``data`` (or a new dict)."""
+        if data is None:
+            data = {}
+        start = reader.offset
+        if self._readers[reader.allow_nan](reader, data) is None:
+            # Ran out of data, read field by field as the reader would
+            reader.offset = start
+            for leaf in self.leaves:
+                if leaf.condition == IF_REMAINING and reader.eof():
+                    continue
+                container = data
+                for key in leaf.keys[:-1]:
+                    container = container.setdefault(key, {})
+                container[leaf.keys[-1]] = leaf.read(reader)
+        if self.strict and not reader.eof():
+            raise Exception("Warning: EOF not reached")
+        return data
+
+    def write(self, writer: FArchiveWriter, p: dict[str, Any]) -> None:
+        self._writer(writer, p)
+
+
+def _dict_source(keys: Sequence[str], values: Sequence[str]) -> str:
+    return (
+        "{" + ", ".join(f"{key!r}: {value}" for key, value in zip(keys, values)) + "}"
+    )
@@ -1,4 +1,4 @@
-from typing import Any, Sequence
+from typing import Any, Sequence, Union
 
 from loguru import logger
 from palworld_save_tools.archive import *
@@ -26,7 +26,10 @@ WORK_BASE_TYPES = set(
 
 
 def decode(
-    reader: FArchiveReader, type_name: str, size: int, path: str
+    reader: FArchiveReader,
+    type_name: str,
+    size: int,
+    path: Union[str, DecodePlan],
 ) -> dict[str, Any]:
     if type_name != "ArrayProperty":
         raise Exception(f"Expected ArrayProperty, got {type_name}")
@@ -1,16 +1,29 @@
-from typing import Any, Sequence
+from typing import Any, Sequence, Union
 
 from palworld_save_tools.archive import *
+from palworld_save_tools.rawdata.schema import Schema
+
+SCHEMA = Schema(
+    [
+        ("id", "guid"),
+        ("spawn_transform", "ftransform"),
+        ("current_order_type", "byte"),
+        ("current_battle_type", "byte"),
+        ("container_id", "guid"),
+        ("trailing_bytes", "bytes[4]"),
+    ],
+    strict=True,
+)
 
 
 def decode(
-    reader: FArchiveReader, type_name: str, size: int, path: str
+    reader: FArchiveReader,
+    type_name: str,
+    size: int,
+    path: Union[str, DecodePlan],
 ) -> dict[str, Any]:
-    if type_name != "ArrayProperty":
-        raise Exception(f"Expected ArrayProperty, got {type_name}")
-    value = reader.property(type_name, size, path, nested_caller_path=path)
-    data_bytes = value["value"]["values"]
-    value["value"] = decode_bytes(reader, data_bytes)
+    value, data_reader = reader.byte_array_reader(type_name, size, path)
+    value["value"] = SCHEMA.read(data_reader)
     return value
 
 
@@ -18,16 +31,7 @@ def decode_bytes(
     parent_reader: FArchiveReader, b_bytes: Sequence[int]
 ) -> dict[str, Any]:
     reader = parent_reader.internal_copy(coerce_bytes(b_bytes), debug=False)
-    data: dict[str, Any] = {}
-    data["id"] = reader.guid()
-    data["spawn_transform"] = reader.ftransform()
-    data["current_order_type"] = reader.byte()
-    data["current_battle_type"] = reader.byte()
-    data["container_id"] = reader.guid()
-    data["trailing_bytes"] = reader.byte_list(4)
-    if not reader.eof():
-        raise Exception("Warning: EOF not reached")
-    return data
+    return SCHEMA.read(reader)
 
 
 def encode(
@@ -43,11 +47,6 @@ def encode(
 
 def encode_bytes(p: dict[str, Any]) -> bytes:
     writer = FArchiveWriter()
-    writer.guid(p["id"])
-    writer.ftransform(p["spawn_transform"])
-    writer.byte(p["current_order_type"])
-    writer.byte(p["current_battle_type"])
-    writer.guid(p["container_id"])
-    writer.write(coerce_bytes(p["trailing_bytes"]))
+    SCHEMA.write(writer, p)
     encoded_bytes = writer.bytes()
     return encoded_bytes
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# This script reports compression time against ratio for each zlib/Oodle setting
+# Usage: benchmark_compression.py [.sav files...] (default: tests/testdata saves)
+
+import glob
+import sys
+import time
+
+from loguru import logger
+from palworld_save_tools.compressor.oozlib import OodleCompressor, OodleLevel
+from palworld_save_tools.palsav import decompress_sav_to_gvas, oozlib, z_lib
+
+ZLIB_LEVELS = [1, 3, 6, 9]
+OODLE_COMPRESSORS = {
+    "Kraken": OodleCompressor.Kraken,
+    "Mermaid": OodleCompressor.Mermaid,
+    "Selkie": OodleCompressor.Selkie,
+    "Leviathan": OodleCompressor.Leviathan,
+}
+OODLE_LEVELS = {
+    "HyperFast1": OodleLevel.HyperFast1,
+    "SuperFast": OodleLevel.SuperFast,
+    "Fast": OodleLevel.Fast,
+    "Normal": OodleLevel.Normal,
+    "Optimal2": OodleLevel.Optimal2,
+}
+
+
+def settings():
+    for level in ZLIB_LEVELS:
+        yield f"zlib level {level}", z_lib.compress, 0x32, {"level": level}
+    for compressor_name, compressor in OODLE_COMPRESSORS.items():
+        for level_name, level in OODLE_LEVELS.items():
+            yield f"{compressor_name} {level_name}", oozlib.compress, 0x31, {
+                "compressor": compressor,
+                "level": level,
+            }
+
+
+def main():
+    paths = sys.argv[1:] or sorted(glob.glob("tests/testdata/**/*.sav", recursive=True))
+    gvas_files = []
+    for path in paths:
+        with open(path, "rb") as f:
+            gvas_files.append(decompress_sav_to_gvas(f.read())[0])
+    total_size = sum(len(gvas) for gvas in gvas_files)
+    # Silence the per-call compression logging from here on
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    print(f"{len(gvas_files)} saves, {total_size:,} bytes uncompressed")
+    print(f"{'setting':<24} {'seconds':>9} {'MB/s':>8} {'ratio':>7}")
+    for name, compress, save_type, kwargs in settings():
+        try:
+            start = time.perf_counter()
+            compressed_size = sum(
+                len(compress(gvas, save_type, **kwargs)) for gvas in gvas_files
+            )
+            elapsed = time.perf_counter() - start
+        except Exception as e:
+            print(f"{name:<24} unavailable: {e}")
+            continue
+        print(
+            f"{name:<24} {elapsed:>9.3f} {total_size / elapsed / 1e6:>8.1f} {total_size / compressed_size:>7.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,16 @@
+import random
+import struct
 import unittest
 import uuid
+from unittest import mock
 
 from parameterized import parameterized
 
-from palworld_save_tools.archive import UUID, FArchiveReader, FArchiveWriter
+from palworld_save_tools import archive
+from palworld_save_tools.archive import UUID, DecodePlan, FArchiveReader, FArchiveWriter
+from palworld_save_tools.gvas import GvasHeader
+from palworld_save_tools.palsav import decompress_sav_to_gvas
+from palworld_save_tools.paltypes import PALWORLD_TYPE_HINTS
 
 
 class TestArchive(unittest.TestCase):
@@ -93,3 +100,274 @@ class TestArchive(unittest.TestCase):
         wrapper = UUID.from_str(test_uuid)
         wrapper2 = UUID.from_str(test_uuid)
         self.assertEqual(hash(wrapper), hash(wrapper2))
+
+    @unittest.skipIf(not hasattr(UUID, "parsed_str"), "UUID does not equal strings")
+    def test_uuid_wrapper_hash_matches_str(self):
+        test_uuid = "c1b41f12-90d3-491f-be71-b34e8e0deb5a"
+        wrapper = UUID.from_str(test_uuid)
+        self.assertEqual(test_uuid, wrapper)
+        self.assertEqual(hash(test_uuid), hash(wrapper))
+        self.assertIn(test_uuid, {wrapper})
+        self.assertEqual("test", {wrapper: "test"}[test_uuid])
+
+    def test_uuid_wrapper_hash_ignores_buffer_type(self):
+        raw = UUID.from_str("c1b41f12-90d3-491f-be71-b34e8e0deb5a").raw_bytes
+        wrapper = UUID(memoryview(bytes(raw)))
+        wrapper2 = UUID(bytes(raw))
+        self.assertEqual(hash(wrapper), hash(wrapper2))
+        self.assertEqual("test", {wrapper: "test"}[wrapper2])
+
+    def test_format_guids(self):
+        data = random.Random(24).randbytes(16 * 64) + bytes(16) + b"\xff" * 16
+        expected = [str(UUID(data[i : i + 16])) for i in range(0, len(data), 16)]
+        for speedups in {archive._speedups, None}:
+            with mock.patch.object(archive, "_speedups", speedups):
+                self.assertEqual(expected, archive.format_guids(data))
+                self.assertEqual([], archive.format_guids(b""))
+                with self.assertRaises(ValueError):
+                    archive.format_guids(data[:-1])
+
+    @unittest.skipIf(archive._speedups is None, "C accelerator not built")
+    @unittest.skipIf(not hasattr(UUID, "parsed_str"), "UUID does not cache strings")
+    def test_cache_uuid_strings(self):
+        test_uuid = "c1b41f12-90d3-491f-be71-b34e8e0deb5a"
+        wrappers = [UUID.from_str(test_uuid) for _ in range(3)]
+        short = UUID(b"\x01")
+        data = {"a": [wrappers[0], {"b": (wrappers[1],)}], "c": short}
+        archive.cache_uuid_strings(data)
+        self.assertEqual(test_uuid, wrappers[0].parsed_str)
+        self.assertEqual(test_uuid, wrappers[1].parsed_str)
+        self.assertIsNone(wrappers[2].parsed_str)
+        # Left for __str__ to reject
+        self.assertIsNone(short.parsed_str)
+
+    def test_selective_reader_reads_sets_under_requested_paths(self):
+        element = {
+            "Name": {"type": "IntProperty", "id": None, "value": 7},
+        }
+        writer = FArchiveWriter()
+        writer.properties(
+            {
+                "Other": {"type": "IntProperty", "id": None, "value": 1},
+                "Items": {
+                    "type": "SetProperty",
+                    "set_type": "StructProperty",
+                    "id": None,
+                    "value": [element, element],
+                },
+            }
+        )
+        data = writer.bytes()
+        for speedups in {archive._speedups, None}:
+            with mock.patch.object(archive, "_speedups", speedups):
+                reader = archive.SelectiveFArchiveReader(data, [".Items"])
+                properties = reader.properties_until_end()
+                self.assertEqual(["Items"], list(properties))
+                self.assertEqual([element, element], properties["Items"]["value"])
+
+    def test_sub_reader_shares_buffer(self):
+        writer = FArchiveWriter()
+        writer.i32(1)
+        writer.fstring("window")
+        writer.u32(2)
+        data = writer.bytes()
+        reader = FArchiveReader(data)
+        self.assertEqual(1, reader.i32())
+        sub_reader = reader.sub_reader(11)
+        self.assertIs(data, sub_reader.data)
+        self.assertEqual("window", sub_reader.fstring())
+        self.assertTrue(sub_reader.eof())
+        self.assertEqual(b"", sub_reader.read_to_end())
+        self.assertEqual(2, reader.u32())
+        self.assertTrue(reader.eof())
+
+    def test_sub_reader_ends_at_its_size(self):
+        writer = FArchiveWriter()
+        writer.fstring("Int")
+        writer.property({"type": "IntProperty", "id": None, "value": 1})
+        writer.fstring("None")
+        data = writer.bytes()
+        for speedups in {archive._speedups, None}:
+            with mock.patch.object(archive, "_speedups", speedups):
+                # The bytes past the window are there, but not the sub-reader's
+                with self.assertRaises(struct.error):
+                    FArchiveReader(data).sub_reader(2).i32()
+                # GUIDs are read short at the end, as they always were
+                sub_reader = FArchiveReader(data).sub_reader(4)
+                self.assertEqual(data[:4], bytes(sub_reader.guid().raw_bytes))
+                self.assertTrue(sub_reader.eof())
+                sub_reader = FArchiveReader(data).sub_reader(len(data) - 12)
+                with self.assertRaises(struct.error):
+                    sub_reader.properties_until_end()
+                sub_reader = FArchiveReader(data).sub_reader(len(data))
+                self.assertEqual(1, sub_reader.properties_until_end()["Int"]["value"])
+
+    @parameterized.expand(
+        [
+            # The last byte read is dropped as if it were the terminator
+            (struct.pack("i", 10) + b"abc", "ab"),
+            (struct.pack("i", -5) + "abc".encode("utf-16-le"), "ab"),
+            (struct.pack("i", 10), ""),
+        ]
+    )
+    def test_truncated_fstring(self, data, expected):
+        reader = FArchiveReader(data)
+        self.assertEqual(expected, reader.fstring())
+        self.assertEqual(len(data), reader.tell())
+        self.assertTrue(reader.eof())
+
+    def test_writer_patches_property_sizes(self):
+        properties = {
+            "Name": {"id": None, "value": "value", "type": "StrProperty"},
+            "Count": {"id": None, "value": 7, "type": "IntProperty"},
+        }
+        writer = FArchiveWriter()
+        writer.properties(properties)
+        self.assertIs(writer.buffer(), writer.data)
+        self.assertEqual(writer.bytes(), bytes(writer.buffer()))
+        reader = FArchiveReader(writer.bytes())
+        self.assertEqual(properties, reader.properties_until_end())
+        self.assertTrue(reader.eof())
+
+    @parameterized.expand(
+        [
+            ("Vector", [{"x": 1.5, "y": -2.0, "z": float("inf")}] * 3),
+            ("Quat", [{"x": 0.0, "y": 1.0, "z": 2.0, "w": 3.0}] * 2),
+            ("LinearColor", [{"r": 0.25, "g": 1.0, "b": 0.0, "a": 1.0}]),
+            ("Color", [{"b": 1, "g": 2, "r": 3, "a": 255}] * 2),
+            ("DateTime", [638412345678901234, 0]),
+            ("Guid", [UUID(bytes(range(16))), UUID(bytes(16))]),
+            ("Vector", []),
+        ]
+    )
+    def test_fixed_struct_array_roundtrip(self, type_name, values):
+        def write(values, bulk):
+            writer = FArchiveWriter()
+            if not bulk:
+                writer.fixed_struct_values = lambda struct_type, values: False
+            writer.array_property(
+                "StructProperty",
+                {
+                    "prop_name": "Values",
+                    "prop_type": "StructProperty",
+                    "type_name": type_name,
+                    "id": UUID(bytes(16)),
+                    "values": values,
+                },
+            )
+            return writer.bytes()
+
+        data = write(values, bulk=True)
+        self.assertEqual(write(values, bulk=False), data)
+        reader = FArchiveReader(data)
+        value = reader.array_property("StructProperty", len(data), "")
+        self.assertTrue(reader.eof())
+        self.assertEqual(values, value["values"])
+        reader = FArchiveReader(data)
+        reader.fixed_struct_values = lambda struct_type, count: None
+        self.assertEqual(value, reader.array_property("StructProperty", len(data), ""))
+
+    def test_fixed_struct_array_falls_back_for_unconverted_values(self):
+        writer = FArchiveWriter()
+        self.assertFalse(
+            writer.fixed_struct_values("Guid", ["c1b41f12-90d3-491f-be71-b34e8e0deb5a"])
+        )
+        self.assertFalse(
+            writer.fixed_struct_values("Vector", [{"x": None, "y": 0.0, "z": 0.0}])
+        )
+        self.assertFalse(writer.fixed_struct_values("PalItemId", [{}]))
+        self.assertFalse(
+            writer.fixed_struct_values("Color", [{"b": 256, "g": 0, "r": 0, "a": 0}])
+        )
+        self.assertFalse(writer.fixed_struct_values("DateTime", [-1]))
+        self.assertEqual(b"", writer.bytes())
+        reader = FArchiveReader(writer.bytes(), allow_nan=False)
+        self.assertIsNone(reader.fixed_struct_values("Vector", 0))
+
+    def test_decode_plan(self):
+        def decode(reader, type_name, size, path):
+            value = reader.property(type_name, size, path, nested_caller_path=path)
+            value["value"] += 1
+            return value
+
+        custom_properties = {".Root.Map.Value.Count": (decode, None)}
+        plan = DecodePlan.compile({".Root.Map.Value": "Entry"}, custom_properties)
+        node = plan.lookup(".Root.Map.Value")
+        self.assertIs(node, plan.child("Root").child("Map").child("Value"))
+        self.assertEqual("Entry", node.type_hint)
+        self.assertEqual(".Root.Map.Value.Count", str(node.child("Count")))
+        self.assertIsNone(node.child("Other").custom)
+        writer = FArchiveWriter()
+        writer.fstring("Count")
+        writer.property({"type": "IntProperty", "id": None, "value": 41})
+        writer.fstring("None")
+        reader = FArchiveReader(writer.bytes(), custom_properties=custom_properties)
+        # Paths can be passed as nodes or dotted strings
+        for path in (".Root.Map.Value", node):
+            reader.offset = 0
+            self.assertEqual(
+                {
+                    "Count": {
+                        "id": None,
+                        "value": 42,
+                        "custom_type": ".Root.Map.Value.Count",
+                        "type": "IntProperty",
+                    }
+                },
+                reader.properties_until_end(path),
+            )
+
+    def test_fstring_cache(self):
+        writer = FArchiveWriter()
+        name = "FStringCacheTest"
+        for string in (name, name, "a" * 100, "ü", name):
+            writer.fstring(string)
+        reader = FArchiveReader(writer.bytes(), debug=True)
+        hits, misses = archive.fstring_cache_stats
+        first = reader.fstring()
+        self.assertIs(first, reader.fstring())
+        # Long and non-ASCII strings are not cached
+        self.assertEqual("a" * 100, reader.fstring())
+        self.assertEqual("ü", reader.fstring())
+        self.assertIs(first, reader.fstring())
+        self.assertNotIn(b"a" * 100, archive._fstring_cache)
+        self.assertEqual(2, archive.fstring_cache_stats[0] - hits)
+        self.assertEqual(1, archive.fstring_cache_stats[1] - misses)
+
+    @unittest.skipIf(archive._speedups is None, "C accelerator not built")
+    def test_speedups_match_python(self):
+        with open("tests/testdata/Level.sav", "rb") as f:
+            gvas_data, _ = decompress_sav_to_gvas(f.read())
+        writer = FArchiveWriter()
+        writer.fstring("Float")
+        writer.property({"type": "FloatProperty", "id": None, "value": None})
+        writer.fstring("Struct")
+        writer.property(
+            {
+                "type": "StructProperty",
+                "struct_type": "Vector",
+                "struct_id": UUID.from_str("00000000-0000-0000-0000-000000000000"),
+                "id": None,
+                "value": {"x": 1.0, "y": float("inf"), "z": 3.0},
+            }
+        )
+        writer.fstring("None")
+        # A non-finite float is handed back to the Python loop, as is data
+        # cut off in the middle of a property
+        for data in (gvas_data, writer.bytes(), writer.bytes()[:-12]):
+            results = []
+            for speedups in (archive._speedups, None):
+                with mock.patch.object(archive, "_speedups", speedups):
+                    reader = FArchiveReader(data, PALWORLD_TYPE_HINTS)
+                    try:
+                        if data is gvas_data:
+                            GvasHeader.read(reader)
+                        properties = reader.properties_until_end()
+                    except Exception as e:
+                        results.append((type(e), reader.offset))
+                        continue
+                    writer = FArchiveWriter()
+                    writer.properties(properties)
+                    # repr, as NaN never compares equal to itself
+                    results.append((repr(properties), writer.bytes()))
+            self.assertEqual(results[0], results[1])
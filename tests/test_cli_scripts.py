@@ -1,6 +1,8 @@
 import contextlib
 import os
+import shutil
 import subprocess
+import tempfile
 import unittest
 
 from parameterized import parameterized
@@ -123,3 +125,47 @@ class TestCliScripts(unittest.TestCase):
                 os.remove(f"tests/testdata/{dir_name}/roundtrip-{base_name}")
             with contextlib.suppress(FileNotFoundError):
                 os.remove(f"tests/testdata/{dir_name}/roundtrip-{base_name}.json")
+
+    @parameterized.expand(
+        [
+            (["--library", "zlib", "--compression-level", "HyperFast1"],),
+            (["--library", "zlib", "--compression-level", "10"],),
+            (["--library", "libooz", "--compression-level", "12"],),
+        ]
+    )
+    def test_rejects_invalid_compression_level(self, args):
+        run = subprocess.run(
+            [
+                "python",
+                "-m",
+                "palworld_save_tools.commands.convert",
+                "tests/testdata/Level.sav.json",
+                *args,
+            ],
+            capture_output=True,
+        )
+        self.assertEqual(run.returncode, 2)
+        self.assertIn(b"invalid", run.stderr)
+
+    def test_world_save_compression_level_uses_zlib(self):
+        # World saves are compressed with zlib even with the default libooz,
+        # so an Oodle-only level is rejected instead of reaching zlib
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            sav_path = os.path.join(tmp_dir, "LocalData.sav")
+            shutil.copy("tests/testdata/LocalData.sav", sav_path)
+            convert = ["python", "-m", "palworld_save_tools.commands.convert"]
+            run = subprocess.run([*convert, sav_path, "--force"])
+            self.assertEqual(run.returncode, 0)
+            os.remove(sav_path)
+            run = subprocess.run(
+                [*convert, f"{sav_path}.json", "--compression-level", "HyperFast4"],
+                capture_output=True,
+            )
+            self.assertEqual(run.returncode, 1)
+            self.assertIn(b"invalid zlib compression level", run.stdout)
+            self.assertFalse(os.path.exists(sav_path))
+            run = subprocess.run(
+                [*convert, f"{sav_path}.json", "--compression-level", "1"]
+            )
+            self.assertEqual(run.returncode, 0)
+            self.assertTrue(os.path.exists(sav_path))
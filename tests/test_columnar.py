@@ -0,0 +1,175 @@
+import unittest
+
+from parameterized import parameterized
+
+from palworld_save_tools import columnar
+from palworld_save_tools.archive import UUID
+from palworld_save_tools.gvas import GvasFile
+from palworld_save_tools.palsav import decompress_sav_to_gvas
+from palworld_save_tools.paltypes import PALWORLD_CUSTOM_PROPERTIES, PALWORLD_TYPE_HINTS
+
+
+class TestColumnar(unittest.TestCase):
+    def read_tables(self, file_name="Level.sav"):
+        with open("tests/testdata/" + file_name, "rb") as f:
+            gvas_data, _ = decompress_sav_to_gvas(f.read())
+        # The group decoder does not match the test saves' version
+        gvas_file = GvasFile.extract(
+            gvas_data,
+            columnar.TABLE_PATHS,
+            PALWORLD_TYPE_HINTS,
+            {
+                path: PALWORLD_CUSTOM_PROPERTIES[path]
+                for path in columnar.TABLE_CUSTOM_PROPERTIES
+                if path != ".worldSaveData.GroupSaveDataMap"
+            },
+        )
+        return columnar.export_tables(gvas_file.properties)
+
+    def test_export_tables(self):
+        tables = self.read_tables()
+        for table, columns in tables.items():
+            self.assertEqual(list(columnar.TABLE_SCHEMAS[table]), list(columns))
+            self.assertEqual(1, len({len(column) for column in columns.values()}))
+        characters = tables["characters"]
+        self.assertEqual(3, len(characters["instance_id"]))
+        player = characters["is_player"].index(True)
+        self.assertEqual("Deathsnacks", characters["nickname"][player])
+        self.assertEqual(3, characters["level"][player])
+        self.assertEqual(
+            "03836afe-4ba7-6a9d-e7d7-7d891b70b1a2", characters["group_id"][player]
+        )
+        items = tables["items"]
+        money = sum(
+            count
+            for static_id, count in zip(items["static_id"], items["count"])
+            if static_id == "Money"
+        )
+        self.assertEqual(2110, money)
+        groups = tables["groups"]
+        self.assertEqual(31, len(groups["group_id"]))
+        # GroupSaveDataMap was not decoded, so its RawData columns are defaults
+        self.assertEqual([0] * 31, groups["base_camp_level"])
+
+    @parameterized.expand(
+        [
+            ("Level.sav",),
+            ("v0.3.2/Level-2.sav",),
+            ("unicode-saves/Level.sav",),
+        ]
+    )
+    def test_export_item_static_ids(self, file_name):
+        items = self.read_tables(file_name)["items"]
+        self.assertTrue(items["static_id"])
+        self.assertNotIn("", items["static_id"])
+
+    def test_export_decoded_slots(self):
+        # Current saves only store slots in RawData
+        created_world_id = UUID(bytes(range(16)))
+        local_id = UUID(bytes(range(16, 32)))
+        properties = {
+            "worldSaveData": {
+                "value": {
+                    "ItemContainerSaveData": {
+                        "value": [
+                            {
+                                "key": {"ID": {"value": created_world_id}},
+                                "value": {
+                                    "Slots": {
+                                        "value": {
+                                            "values": [
+                                                {
+                                                    "RawData": {
+                                                        "value": {
+                                                            "slot_index": 2,
+                                                            "count": 5,
+                                                            "item": {
+                                                                "static_id": "Wood",
+                                                                "dynamic_id": {
+                                                                    "created_world_id": created_world_id,
+                                                                    "local_id_in_created_world": local_id,
+                                                                },
+                                                            },
+                                                            "trailing_bytes": b"",
+                                                        }
+                                                    }
+                                                },
+                                                {"RawData": {"value": None}},
+                                            ]
+                                        }
+                                    }
+                                },
+                            }
+                        ]
+                    }
+                }
+            }
+        }
+        items = columnar.export_tables(properties)["items"]
+        self.assertEqual([2, 0], items["slot_index"])
+        self.assertEqual(["Wood", ""], items["static_id"])
+        self.assertEqual([5, 0], items["count"])
+        self.assertEqual([str(created_world_id), ""], items["created_world_id"])
+        self.assertEqual([str(local_id), ""], items["local_id_in_created_world"])
+
+    def test_export_decoded_group(self):
+        group_id = UUID(bytes(range(16)))
+        properties = {
+            "worldSaveData": {
+                "value": {
+                    "GroupSaveDataMap": {
+                        "value": [
+                            {
+                                "key": group_id,
+                                "value": {
+                                    "GroupType": {
+                                        "value": {
+                                            "type": "EPalGroupType",
+                                            "value": "EPalGroupType::Guild",
+                                        }
+                                    },
+                                    "RawData": {
+                                        "value": {
+                                            "group_type": "EPalGroupType::Guild",
+                                            "group_name": "Group",
+                                            "guild_name": "Guild",
+                                            "admin_player_uid": group_id,
+                                            "base_camp_level": 4,
+                                            "individual_character_handle_ids": [
+                                                {},
+                                                {},
+                                            ],
+                                            "players": [{}],
+                                        }
+                                    },
+                                },
+                            }
+                        ]
+                    }
+                }
+            }
+        }
+        groups = columnar.export_tables(properties)["groups"]
+        self.assertEqual(
+            {
+                "group_id": [str(group_id)],
+                "group_type": ["EPalGroupType::Guild"],
+                "group_name": ["Group"],
+                "guild_name": ["Guild"],
+                "admin_player_uid": [str(group_id)],
+                "base_camp_level": [4],
+                "character_count": [2],
+                "player_count": [1],
+            },
+            groups,
+        )
+
+    @unittest.skipIf(columnar.numpy is None, "numpy is not installed")
+    def test_to_numpy(self):
+        arrays = columnar.to_numpy(self.read_tables())
+        self.assertEqual("int64", arrays["items"]["count"].dtype.name)
+        self.assertEqual("bool", arrays["characters"]["is_player"].dtype.name)
+        self.assertEqual(
+            2110,
+            arrays["items"]["count"][arrays["items"]["static_id"] == "Money"].sum(),
+        )
@@ -0,0 +1,34 @@
+import unittest
+import zlib
+
+from parameterized import parameterized
+
+from palworld_save_tools.compressor.zlib import Zlib, parallel_compress
+from palworld_save_tools.palsav import compress_gvas_to_sav, decompress_sav_to_gvas
+
+
+class TestCompressor(unittest.TestCase):
+    @parameterized.expand(
+        [
+            (0, 1),
+            (1, 4),
+            ((1 << 20) + 1, 4),
+            (3 << 20, 2),
+        ]
+    )
+    def test_parallel_compress_roundtrip(self, size, workers):
+        data = bytes(i * 7 % 251 for i in range(size))
+        compressed = parallel_compress(data, 6, workers, chunk_size=1 << 20)
+        self.assertEqual(data, zlib.decompress(compressed))
+
+    def test_zlib_parallel_sav_roundtrip(self):
+        with open("tests/testdata/Level.sav", "rb") as f:
+            gvas_data, _ = decompress_sav_to_gvas(f.read())
+        sav_data = Zlib().compress(gvas_data, 0x32, level=1, workers=4)
+        self.assertEqual(gvas_data, decompress_sav_to_gvas(sav_data)[0])
+
+    def test_compress_gvas_to_sav_roundtrip(self):
+        with open("tests/testdata/Level.sav", "rb") as f:
+            gvas_data, save_type = decompress_sav_to_gvas(f.read())
+        sav_data = compress_gvas_to_sav(gvas_data, save_type, level=1)
+        self.assertEqual((gvas_data, save_type), decompress_sav_to_gvas(sav_data))
@@ -7,7 +7,8 @@ from parameterized import parameterized
 from palworld_save_tools.archive import UUID, FArchiveReader, FArchiveWriter
 from palworld_save_tools.gvas import GvasFile, GvasHeader
 from palworld_save_tools.json_tools import CustomEncoder
-from palworld_save_tools.palsav import decompress_sav_to_gvas
+from palworld_save_tools.nodes import Node
+from palworld_save_tools.palsav import decompress_sav_file, decompress_sav_to_gvas
 from palworld_save_tools.paltypes import PALWORLD_CUSTOM_PROPERTIES, PALWORLD_TYPE_HINTS
 
 
@@ -160,3 +161,189 @@ class TestGvas(unittest.TestCase):
             new_gvas_data,
             "sav does not match expected after roundtrip",
         )
+
+    @parameterized.expand(
+        [
+            ("Level.sav",),
+            ("LevelMeta.sav",),
+            ("unicode-saves/LocalData.sav",),
+        ]
+    )
+    def test_read_path_matches_read(self, file_name):
+        with open("tests/testdata/" + file_name, "rb") as f:
+            gvas_data, save_type = decompress_sav_to_gvas(f.read())
+        mapped_data, mapped_save_type = decompress_sav_file(
+            "tests/testdata/" + file_name
+        )
+        self.assertEqual(save_type, mapped_save_type)
+        self.assertEqual(gvas_data, mapped_data[:])
+        gvas_file = GvasFile.read_path(
+            "tests/testdata/" + file_name, PALWORLD_TYPE_HINTS
+        )
+        self.assertEqual(gvas_data, gvas_file.write())
+
+    @parameterized.expand(
+        [
+            ("Level.sav",),
+            ("LevelMeta.sav",),
+            ("unicode-saves/LocalData.sav",),
+        ]
+    )
+    def test_lazy_read_matches_read(self, file_name):
+        with open("tests/testdata/" + file_name, "rb") as f:
+            gvas_data, _ = decompress_sav_to_gvas(f.read())
+        gvas_file = GvasFile.read(gvas_data, PALWORLD_TYPE_HINTS)
+        lazy_gvas_file = GvasFile.read(gvas_data, PALWORLD_TYPE_HINTS, lazy=True)
+        first_key = next(iter(lazy_gvas_file.properties))
+        self.assertFalse(lazy_gvas_file.properties.is_loaded(first_key))
+        self.assertEqual(gvas_data, lazy_gvas_file.write())
+        lazy_gvas_file = GvasFile.read(gvas_data, PALWORLD_TYPE_HINTS, lazy=True)
+        self.assertEqual(
+            json.dumps(gvas_file.dump(), cls=CustomEncoder),
+            json.dumps(lazy_gvas_file.dump(), cls=CustomEncoder),
+        )
+
+    @parameterized.expand(
+        [
+            ("Level.sav", 1),
+            ("Level.sav", 2),
+            ("00000000000000000000000000000001.sav", 1),
+            ("unicode-saves/LocalData.sav", 1),
+        ]
+    )
+    def test_compact_read_matches_read(self, file_name, workers):
+        with open("tests/testdata/" + file_name, "rb") as f:
+            gvas_data, _ = decompress_sav_to_gvas(f.read())
+        custom_properties = {
+            path: PALWORLD_CUSTOM_PROPERTIES[path]
+            for path in [
+                ".worldSaveData.CharacterSaveParameterMap.Value.RawData",
+                ".worldSaveData.ItemContainerSaveData.Value.RawData",
+            ]
+        }
+        gvas_file = GvasFile.read(gvas_data, PALWORLD_TYPE_HINTS, custom_properties)
+        compact_gvas_file = GvasFile.read(
+            gvas_data,
+            PALWORLD_TYPE_HINTS,
+            custom_properties,
+            workers=workers,
+            compact=True,
+        )
+        first = next(iter(compact_gvas_file.properties.values()))
+        self.assertIsInstance(first, Node)
+        self.assertEqual(gvas_file.properties, compact_gvas_file.properties)
+        self.assertEqual(
+            json.dumps(gvas_file.dump(), cls=CustomEncoder),
+            json.dumps(compact_gvas_file.dump(), cls=CustomEncoder),
+        )
+        self.assertEqual(gvas_data, compact_gvas_file.write(custom_properties))
+
+    def test_lazy_read_rejects_workers(self):
+        with self.assertRaises(ValueError):
+            GvasFile.read_path(
+                "tests/testdata/LevelMeta.sav",
+                PALWORLD_TYPE_HINTS,
+                lazy=True,
+                workers=2,
+            )
+
+    def test_extract_matches_read(self):
+        with open("tests/testdata/Level.sav", "rb") as f:
+            gvas_data, _ = decompress_sav_to_gvas(f.read())
+        gvas_file = GvasFile.read(gvas_data, PALWORLD_TYPE_HINTS)
+        extracted = GvasFile.extract(
+            gvas_data,
+            [
+                ".worldSaveData.CharacterSaveParameterMap",
+                ".worldSaveData.ItemContainerSaveData.Value.RawData",
+            ],
+            PALWORLD_TYPE_HINTS,
+        )
+        world = gvas_file.properties["worldSaveData"]["value"]
+        extracted_world = extracted.properties["worldSaveData"]["value"]
+        self.assertEqual(
+            ["CharacterSaveParameterMap", "ItemContainerSaveData"],
+            list(extracted_world),
+        )
+        self.assertEqual(
+            world["CharacterSaveParameterMap"],
+            extracted_world["CharacterSaveParameterMap"],
+        )
+        for container, extracted_container in zip(
+            world["ItemContainerSaveData"]["value"],
+            extracted_world["ItemContainerSaveData"]["value"],
+        ):
+            self.assertEqual(container["key"], extracted_container["key"])
+            self.assertEqual(
+                {"RawData": container["value"]["RawData"]},
+                extracted_container["value"],
+            )
+
+    def test_lazy_write_passes_through_untouched_properties(self):
+        with open("tests/testdata/Level.sav", "rb") as f:
+            gvas_data, _ = decompress_sav_to_gvas(f.read())
+        custom_properties = {
+            path: PALWORLD_CUSTOM_PROPERTIES[path]
+            for path in [".worldSaveData.CharacterSaveParameterMap.Value.RawData"]
+        }
+        written = []
+        for lazy in (False, True):
+            gvas_file = GvasFile.read(
+                gvas_data, PALWORLD_TYPE_HINTS, custom_properties, lazy=lazy
+            )
+            world = gvas_file.properties["worldSaveData"]["value"]
+            character = world["CharacterSaveParameterMap"]["value"][0]["value"]
+            save_parameter = character["RawData"]["value"]["object"]["SaveParameter"]
+            save_parameter["value"]["Level"]["value"] += 1
+            written.append(gvas_file.write(custom_properties))
+        self.assertNotEqual(gvas_data, written[0])
+        self.assertEqual(written[0], written[1])
+
+    def test_parallel_read_matches_read(self):
+        with open("tests/testdata/Level.sav", "rb") as f:
+            gvas_data, _ = decompress_sav_to_gvas(f.read())
+        custom_properties = {
+            path: PALWORLD_CUSTOM_PROPERTIES[path]
+            for path in [
+                ".worldSaveData.CharacterSaveParameterMap.Value.RawData",
+                ".worldSaveData.ItemContainerSaveData.Value.RawData",
+                ".worldSaveData.DynamicItemSaveData.DynamicItemSaveData.RawData",
+            ]
+        }
+        gvas_file = GvasFile.read(gvas_data, PALWORLD_TYPE_HINTS, custom_properties)
+        parallel_gvas_file = GvasFile.read(
+            gvas_data, PALWORLD_TYPE_HINTS, custom_properties, workers=2
+        )
+        self.assertEqual(gvas_file.properties, parallel_gvas_file.properties)
+        world = parallel_gvas_file.properties["worldSaveData"]["value"]
+        character = world["CharacterSaveParameterMap"]["value"][0]["value"]
+        self.assertEqual(
+            ".worldSaveData.CharacterSaveParameterMap.Value.RawData",
+            character["RawData"]["custom_type"],
+        )
+        self.assertEqual(
+            gvas_file.write(custom_properties),
+            parallel_gvas_file.write(custom_properties),
+        )
+
+    def test_parallel_write_matches_write(self):
+        with open("tests/testdata/Level.sav", "rb") as f:
+            gvas_data, _ = decompress_sav_to_gvas(f.read())
+        custom_properties = {
+            path: PALWORLD_CUSTOM_PROPERTIES[path]
+            for path in [
+                ".worldSaveData.CharacterSaveParameterMap.Value.RawData",
+                ".worldSaveData.ItemContainerSaveData.Value.RawData",
+                ".worldSaveData.DynamicItemSaveData.DynamicItemSaveData.RawData",
+            ]
+        }
+        written = []
+        for workers in (1, 2):
+            gvas_file = GvasFile.read(gvas_data, PALWORLD_TYPE_HINTS, custom_properties)
+            world = gvas_file.properties["worldSaveData"]["value"]
+            character = world["CharacterSaveParameterMap"]["value"][0]["value"]
+            save_parameter = character["RawData"]["value"]["object"]["SaveParameter"]
+            save_parameter["value"]["Level"]["value"] += 1
+            written.append(gvas_file.write(custom_properties, workers=workers))
+        self.assertNotEqual(gvas_data, written[0])
+        self.assertEqual(written[0], written[1])
@@ -0,0 +1,85 @@
+import unittest
+
+from palworld_save_tools.archive import UUID
+from palworld_save_tools.gvas import GvasFile
+from palworld_save_tools.index import (
+    INDEX_CUSTOM_PROPERTIES,
+    INDEX_PATHS,
+    EntityIndex,
+)
+from palworld_save_tools.palsav import decompress_sav_to_gvas
+from palworld_save_tools.paltypes import PALWORLD_CUSTOM_PROPERTIES, PALWORLD_TYPE_HINTS
+
+PLAYER_UID = "00000000-0000-0000-0000-000000000001"
+PLAYER_INSTANCE_ID = "ccc7aae6-40f4-f0bb-87d8-fb8448ee911a"
+GROUP_ID = "03836afe-4ba7-6a9d-e7d7-7d891b70b1a2"
+BASE_CAMP_ID = "b3f7a36d-46d2-a101-7cea-23bc86209307"
+WORKER_CONTAINER_ID = "22180a70-4933-45b8-3983-21a0794ba71d"
+OTHER_ID = "11111111-2222-3333-4444-555555555555"
+
+
+class TestIndex(unittest.TestCase):
+    def read_index(self):
+        with open("tests/testdata/Level.sav", "rb") as f:
+            gvas_data, _ = decompress_sav_to_gvas(f.read())
+        gvas_file = GvasFile.extract(
+            gvas_data,
+            INDEX_PATHS,
+            PALWORLD_TYPE_HINTS,
+            {
+                path: PALWORLD_CUSTOM_PROPERTIES[path]
+                for path in INDEX_CUSTOM_PROPERTIES
+            },
+        )
+        return gvas_file.properties, EntityIndex(gvas_file.properties)
+
+    def test_lookups(self):
+        _, index = self.read_index()
+        player = index.player(PLAYER_UID)
+        self.assertEqual(PLAYER_INSTANCE_ID, str(player["key"]["InstanceId"]["value"]))
+        self.assertIs(player, index.character(UUID.from_str(PLAYER_INSTANCE_ID)))
+        pals = index.characters_owned_by(PLAYER_UID)
+        self.assertEqual(2, len(pals))
+        self.assertNotIn(player, pals)
+        self.assertEqual(3, len(index.characters_in_group(GROUP_ID)))
+        self.assertIsNotNone(index.group(GROUP_ID))
+        self.assertIsNotNone(
+            index.item_container("7c46321f-492b-84da-6c57-158aff301e12")
+        )
+        base_camp = index.base_camp(BASE_CAMP_ID)
+        self.assertEqual([base_camp], index.base_camps_in_group(GROUP_ID))
+        self.assertIs(base_camp, index.base_camp_of_container(WORKER_CONTAINER_ID))
+        self.assertIs(
+            index.character_container(WORKER_CONTAINER_ID),
+            index.base_camp_container(BASE_CAMP_ID),
+        )
+        self.assertIsNone(index.character(OTHER_ID))
+        self.assertEqual([], index.characters_owned_by(OTHER_ID))
+
+    def test_edits(self):
+        properties, index = self.read_index()
+        characters = properties["worldSaveData"]["value"]["CharacterSaveParameterMap"]
+        pal = index.characters_owned_by(PLAYER_UID)[0]
+        instance_id = pal["key"]["InstanceId"]["value"]
+        index.set_owner(instance_id, OTHER_ID)
+        self.assertEqual([pal], index.characters_owned_by(OTHER_ID))
+        self.assertEqual(1, len(index.characters_owned_by(PLAYER_UID)))
+        index.set_owner(instance_id, None)
+        self.assertEqual([], index.characters_owned_by(OTHER_ID))
+        index.set_character_group(instance_id, OTHER_ID)
+        self.assertEqual([pal], index.characters_in_group(OTHER_ID))
+        self.assertEqual(2, len(index.characters_in_group(GROUP_ID)))
+        self.assertIs(pal, index.remove_character(instance_id))
+        self.assertEqual(2, len(characters["value"]))
+        self.assertIsNone(index.character(instance_id))
+        self.assertEqual([], index.characters_in_group(OTHER_ID))
+        with self.assertRaises(KeyError):
+            index.remove_character(instance_id)
+        index.add_character(pal)
+        self.assertIs(pal, characters["value"][-1])
+        self.assertEqual([pal], index.characters_in_group(OTHER_ID))
+        with self.assertRaises(ValueError):
+            index.add_character(pal)
+        # The edits are in the tree, and a new index agrees with the old one
+        self.assertEqual([pal], EntityIndex(properties).characters_in_group(OTHER_ID))
+        self.assertEqual([], EntityIndex(properties).characters_owned_by(OTHER_ID))
@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+
+from parameterized import parameterized
+
+from palworld_save_tools import json_tools
+from palworld_save_tools.gvas import GvasFile
+from palworld_save_tools.palsav import decompress_sav_to_gvas
+from palworld_save_tools.paltypes import PALWORLD_CUSTOM_PROPERTIES, PALWORLD_TYPE_HINTS
+
+
+class TestJsonTools(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def read_dump(self, path):
+        with open(path, "rb") as f:
+            return f.read()
+
+    @parameterized.expand(
+        [
+            ("Level.sav", False, True),
+            ("Level.sav", True, True),
+            ("Level.sav", False, False),
+            ("LocalData.sav", False, True),
+            ("WorldOption.sav", True, False),
+        ]
+    )
+    def test_dump_stream_matches_dump(self, file_name, minify, allow_nan):
+        with open("tests/testdata/" + file_name, "rb") as f:
+            gvas_data, _ = decompress_sav_to_gvas(f.read())
+        data = GvasFile.read(gvas_data, PALWORLD_TYPE_HINTS).dump()
+        path = os.path.join(self.tmp_dir.name, "dump.json")
+        stream_path = os.path.join(self.tmp_dir.name, "dump_stream.json")
+        json_tools.dump(data, path, minify=minify, allow_nan=allow_nan)
+        json_tools.dump_stream(data, stream_path, minify=minify, allow_nan=allow_nan)
+        self.assertEqual(self.read_dump(path), self.read_dump(stream_path))
+
+    def test_dump_stream_edge_values(self):
+        data = {
+            "empty_dict": {},
+            "empty_list": [],
+            "nested": [[1, 2.5, None], {"a": float("nan"), 3: "x"}],
+            "tuple": (1, 2),
+            "bytes": b"\x00\x01",
+        }
+        for max_depth in range(4):
+            for minify in (False, True):
+                path = os.path.join(self.tmp_dir.name, "dump.json")
+                stream_path = os.path.join(self.tmp_dir.name, "dump_stream.json")
+                json_tools.dump(data, path, minify=minify)
+                json_tools.dump_stream(
+                    data, stream_path, minify=minify, max_depth=max_depth
+                )
+                self.assertEqual(self.read_dump(path), self.read_dump(stream_path))
+
+    @parameterized.expand(
+        [
+            ("Level.sav", False, 1 << 20),
+            ("Level.sav", True, 1 << 12),
+            ("Level-tricky-unicode-player-name.sav", False, 1 << 10),
+            ("LocalData.sav", True, 1 << 16),
+            ("LevelMeta.sav", False, 1 << 20),
+        ]
+    )
+    def test_load_gvas_stream_matches_write(self, file_name, minify, window_size):
+        custom_properties = {
+            path: PALWORLD_CUSTOM_PROPERTIES[path]
+            for path in [
+                ".worldSaveData.CharacterSaveParameterMap.Value.RawData",
+                ".worldSaveData.ItemContainerSaveData.Value.RawData",
+            ]
+        }
+        with open("tests/testdata/" + file_name, "rb") as f:
+            gvas_data, _ = decompress_sav_to_gvas(f.read())
+        gvas_file = GvasFile.read(gvas_data, PALWORLD_TYPE_HINTS, custom_properties)
+        path = os.path.join(self.tmp_dir.name, "dump.json")
+        json_tools.dump(gvas_file.dump(), path, minify=minify)
+        header, written = json_tools.load_gvas_stream(
+            path, custom_properties, window_size=window_size
+        )
+        self.assertEqual(gvas_data, written)
+        self.assertEqual(
+            gvas_file.header.save_game_class_name, header.save_game_class_name
+        )
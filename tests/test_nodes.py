@@ -0,0 +1,36 @@
+import unittest
+
+from palworld_save_tools.nodes import ArrayValue, IntProp, MapEntry, Vector
+
+
+class TestNodes(unittest.TestCase):
+    def test_dict_access(self):
+        node = IntProp(None, 42, "IntProperty")
+        self.assertEqual({"id": None, "value": 42, "type": "IntProperty"}, node)
+        self.assertEqual(["id", "value", "type"], list(node))
+        node["value"] += 1
+        node["custom_type"] = ".Root.Count"
+        del node["id"]
+        self.assertEqual(43, node.value)
+        self.assertNotIn("id", node)
+        self.assertIsNone(node.get("id"))
+        self.assertEqual(
+            {"value": 43, "type": "IntProperty", "custom_type": ".Root.Count"},
+            node.to_dict(),
+        )
+        self.assertEqual(3, len(node))
+        with self.assertRaises(KeyError):
+            node["id"]
+        with self.assertRaises(KeyError):
+            del node["other"]
+
+    def test_keys_shadowing_methods(self):
+        node = ArrayValue([1, 2])
+        self.assertEqual([1, 2], node["values"])
+        self.assertEqual([[1, 2]], list(node.values()))
+        self.assertEqual(ArrayValue(values=[1, 2]), {"values": [1, 2]})
+
+    def test_nested(self):
+        entry = MapEntry(1, Vector(1.0, 2.0, 3.0))
+        self.assertEqual({"key": 1, "value": {"x": 1.0, "y": 2.0, "z": 3.0}}, entry)
+        self.assertNotEqual(entry, MapEntry(1, Vector(1.0, 2.0, 4.0)))
@@ -0,0 +1,79 @@
+import math
+import os
+import pickle
+import tempfile
+import unittest
+
+from parameterized import parameterized
+
+from palworld_save_tools import pickle_tools
+from palworld_save_tools.archive import UUID
+from palworld_save_tools.gvas import GvasFile
+from palworld_save_tools.palsav import decompress_sav_to_gvas
+from palworld_save_tools.paltypes import PALWORLD_CUSTOM_PROPERTIES, PALWORLD_TYPE_HINTS
+
+
+class TestPickleTools(unittest.TestCase):
+    @parameterized.expand(
+        [
+            ("Level.sav",),
+            ("Level-tricky-unicode-player-name.sav",),
+            ("LocalData.sav",),
+            ("LevelMeta.sav",),
+        ]
+    )
+    def test_roundtrip_matches_write(self, file_name):
+        custom_properties = {
+            path: PALWORLD_CUSTOM_PROPERTIES[path]
+            for path in [
+                ".worldSaveData.CharacterSaveParameterMap.Value.RawData",
+                ".worldSaveData.ItemContainerSaveData.Value.RawData",
+            ]
+        }
+        with open("tests/testdata/" + file_name, "rb") as f:
+            gvas_data, _ = decompress_sav_to_gvas(f.read())
+        gvas_file = GvasFile.read(gvas_data, PALWORLD_TYPE_HINTS, custom_properties)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "dump.pickle")
+            pickle_tools.dump(gvas_file.dump(), path)
+            loaded = GvasFile.load(pickle_tools.load(path))
+        self.assertEqual(gvas_data, loaded.write(custom_properties))
+
+    def test_native_values(self):
+        guid = UUID(bytes(range(16)))
+        data = {
+            "guid": guid,
+            "bytes": b"\x00\xff",
+            "floats": [float("inf"), float("-inf"), 1.5],
+            "nan": float("nan"),
+            "tuple": (1, "a"),
+        }
+        loaded = pickle_tools.loads(pickle_tools.dumps(data))
+        self.assertIsInstance(loaded["guid"], UUID)
+        self.assertEqual(guid.raw_bytes, loaded["guid"].raw_bytes)
+        self.assertEqual(b"\x00\xff", loaded["bytes"])
+        self.assertEqual([float("inf"), float("-inf"), 1.5], loaded["floats"])
+        self.assertTrue(math.isnan(loaded["nan"]))
+        self.assertEqual((1, "a"), loaded["tuple"])
+
+    def test_lazy_properties_load_as_dict(self):
+        with open("tests/testdata/LevelMeta.sav", "rb") as f:
+            gvas_data, _ = decompress_sav_to_gvas(f.read())
+        lazy = GvasFile.read(gvas_data, PALWORLD_TYPE_HINTS, lazy=True)
+        eager = GvasFile.read(gvas_data, PALWORLD_TYPE_HINTS)
+        loaded = pickle_tools.loads(pickle_tools.dumps(lazy.properties))
+        self.assertIs(type(loaded), dict)
+        self.assertEqual(eager.properties, loaded)
+
+    def test_compact_nodes_load_as_dict(self):
+        with open("tests/testdata/LevelMeta.sav", "rb") as f:
+            gvas_data, _ = decompress_sav_to_gvas(f.read())
+        compact = GvasFile.read(gvas_data, PALWORLD_TYPE_HINTS, compact=True)
+        eager = GvasFile.read(gvas_data, PALWORLD_TYPE_HINTS)
+        loaded = pickle_tools.loads(pickle_tools.dumps(compact.properties))
+        self.assertIs(type(next(iter(loaded.values()))), dict)
+        self.assertEqual(eager.properties, loaded)
+
+    def test_load_rejects_other_globals(self):
+        with self.assertRaises(pickle.UnpicklingError):
+            pickle_tools.loads(pickle.dumps(os.getcwd))
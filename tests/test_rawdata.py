@@ -4,9 +4,10 @@ import unittest
 
 from parameterized import parameterized
 
-from palworld_save_tools.archive import FArchiveReader
+from palworld_save_tools.archive import UUID, FArchiveReader, FArchiveWriter
 from palworld_save_tools.json_tools import CustomEncoder
 from palworld_save_tools.rawdata import character, foliage_model_instance, group
+from palworld_save_tools.rawdata.schema import IF_REMAINING, Schema
 
 
 class TestRawData(unittest.TestCase):
@@ -73,3 +74,59 @@ class TestRawData(unittest.TestCase):
         reparsed_properties = json.loads(json_str)
         reconverted_data = foliage_model_instance.encode_bytes(reparsed_properties)
         self.assertEqual(test_data, reconverted_data)
+
+    def test_schema(self):
+        schema = Schema(
+            [
+                ("id", "guid"),
+                ("name", "fstring"),
+                ("hp", [("current", "i32"), ("max", "i32")]),
+                ("transform", "ftransform"),
+                ("valid", "u32_bool"),
+                ("rate", "float"),
+                ("trailing_bytes", "bytes[4]"),
+                ("unknown_bytes", "bytes[]", IF_REMAINING),
+            ]
+        )
+        writer = FArchiveWriter()
+        writer.guid("d5c1b4a0-2b8e-4f0c-9e3a-0123456789ab")
+        writer.fstring("ボックス")
+        writer.i32(100)
+        writer.i32(200)
+        writer.ftransform(
+            {
+                "rotation": {"x": 0.0, "y": 0.0, "z": 0.5, "w": 1.0},
+                "translation": {"x": 1.0, "y": 2.0, "z": 3.0},
+                "scale3d": {"x": 1.0, "y": 1.0, "z": 1.0},
+            }
+        )
+        writer.u32(1)
+        writer.float(float("nan"))
+        writer.write(b"\x01\x02\x03\x04")
+        data = writer.bytes()
+        for allow_nan in (True, False):
+            reader = FArchiveReader(data, allow_nan=allow_nan)
+            properties = schema.read(reader)
+            self.assertTrue(reader.eof())
+            self.assertEqual(
+                properties["id"], UUID.from_str("d5c1b4a0-2b8e-4f0c-9e3a-0123456789ab")
+            )
+            self.assertEqual(properties["name"], "ボックス")
+            self.assertEqual(properties["hp"], {"current": 100, "max": 200})
+            self.assertEqual(properties["transform"]["rotation"]["z"], 0.5)
+            self.assertTrue(properties["valid"])
+            self.assertNotIn("unknown_bytes", properties)
+            writer = FArchiveWriter()
+            schema.write(writer, properties)
+            self.assertEqual(data, writer.bytes())
+        self.assertIsNone(schema.read(FArchiveReader(data, allow_nan=False))["rate"])
+        properties = schema.read(FArchiveReader(data + b"\xff"))
+        self.assertEqual(properties["unknown_bytes"], b"\xff")
+        writer = FArchiveWriter()
+        schema.write(writer, properties)
+        self.assertEqual(data + b"\xff", writer.bytes())
+        # Short data is read as the reader reads it, field by field
+        reader = FArchiveReader(data[:-2])
+        properties = schema.read(reader)
+        self.assertEqual(properties["trailing_bytes"], b"\x01\x02")
+        self.assertTrue(reader.eof())